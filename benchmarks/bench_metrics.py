@@ -0,0 +1,81 @@
+"""Per-request cost of MetricsMiddleware and raw metric updates.
+
+Run from the repo root:  PYTHONPATH=src python benchmarks/bench_metrics.py [--requests N]
+The ASGI app is called directly (no HTTP client) so the delta is the middleware itself.
+"""
+import argparse
+import asyncio
+import threading
+import time
+import timeit
+
+from app.metrics import Counter, Histogram, MetricsMiddleware
+
+
+async def bare_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+class _Route:
+    path = "/api/v1/workouts/{workout_id}"
+    path_format = "/api/v1/workouts/{workout_id}"
+
+
+async def _drive(app, n: int) -> float:
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for i in range(n):
+        scope = {
+            "type": "http", "method": "GET", "path": f"/api/v1/workouts/{i}",
+            "route": _Route, "path_params": {"workout_id": i},
+        }
+        await app(scope, receive, send)
+    return time.perf_counter() - start
+
+
+def bench_middleware(n: int) -> None:
+    base = min(asyncio.run(_drive(bare_app, n)) for _ in range(3))
+    wrapped = min(asyncio.run(_drive(MetricsMiddleware(bare_app), n)) for _ in range(3))
+    print(f"ASGI call, no middleware:      {base / n * 1e6:8.2f} us/request")
+    print(f"ASGI call, MetricsMiddleware:  {wrapped / n * 1e6:8.2f} us/request")
+    print(f"middleware overhead:           {(wrapped - base) / n * 1e6:8.2f} us/request")
+
+
+def bench_primitives(n: int) -> None:
+    h, c = Histogram(), Counter()
+    print(f"Histogram.observe:             {min(timeit.repeat(lambda: h.observe(0.042), number=n, repeat=3)) / n * 1e9:8.0f} ns")
+    print(f"Counter.inc:                   {min(timeit.repeat(c.inc, number=n, repeat=3)) / n * 1e9:8.0f} ns")
+
+
+def bench_contended(n: int, threads: int) -> None:
+    h = Histogram()
+
+    def work():
+        for _ in range(n):
+            h.observe(0.042)
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    start = time.perf_counter()
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    _, count, _ = h.snapshot()
+    assert count == n * threads
+    print(f"Histogram.observe, {threads} threads:  {elapsed / (n * threads) * 1e9:8.0f} ns (no lost updates)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=50_000)
+    args = parser.parse_args()
+    bench_middleware(args.requests)
+    bench_primitives(args.requests * 4)
+    bench_contended(args.requests, 4)
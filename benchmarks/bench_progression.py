@@ -0,0 +1,124 @@
+"""Exercise progression over a long history: ORM loop vs columnar NumPy.
+
+Run from the repo root:  PYTHONPATH=src python benchmarks/bench_progression.py [--sets N] [--number N]
+The "ORM loop" variant loads Set entities with their workouts and builds the same series in
+Python, as a straightforward implementation would; "numpy" is services.progression. The
+"compute only" rows time just the series math on already-fetched data, without the query.
+"""
+import argparse
+import random
+import timeit
+from collections import defaultdict
+from datetime import date, timedelta
+
+import numpy as np
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.pool import StaticPool
+
+from app.dependencies.db import Base
+from adapters.sqlalchemy.models import Exercise, Set, User, Workout
+from services.progression import estimated_1rm, exercise_progression
+
+SETS_PER_SESSION = 5
+
+
+def orm_progression(db: Session, user_id: int, exercise_id: int) -> dict:
+    sets = db.scalars(
+        select(Set).options(joinedload(Set.workout)).join(Workout)
+        .where(Set.exercise_id == exercise_id, Workout.user_id == user_id)
+        .order_by(Workout.date, Workout.id, Set.id)
+    ).all()
+    return _loop_series([(s.workout_id, s.workout.date, s.reps, s.weight_kg) for s in sets])
+
+
+def _loop_series(rows) -> dict:
+    sessions: dict[int, dict] = defaultdict(lambda: {"volume": 0.0, "top": 0.0, "epley": 0.0, "brzycki": 0.0})
+    dates = {}
+    for workout_id, day, reps, weight in rows:
+        s = sessions[workout_id]
+        dates[workout_id] = day
+        s["volume"] += reps * weight
+        s["top"] = max(s["top"], weight)
+        epley = weight if reps == 1 else 0.0 if reps == 0 else weight * (1 + reps / 30)
+        brzycki = weight if reps == 1 else 0.0 if reps == 0 else weight * 36 / (37 - reps) if reps < 37 else 0.0
+        s["epley"] = max(s["epley"], epley)
+        s["brzycki"] = max(s["brzycki"], brzycki)
+    best, rolling, is_pr = float("-inf"), [], []
+    for s in sessions.values():
+        is_pr.append(s["epley"] > best)
+        best = max(best, s["epley"])
+        rolling.append(best)
+    return {"dates": [d.isoformat() for d in dates.values()], "rolling": rolling, "is_pr": is_pr}
+
+
+def _numpy_series(workout_ids, reps, weight) -> None:
+    starts = np.flatnonzero(np.diff(workout_ids, prepend=np.nan))
+    epley, brzycki = estimated_1rm(reps, weight)
+    np.add.reduceat(reps * weight, starts)
+    best = np.fmax.reduceat(epley, starts)
+    np.fmax.reduceat(brzycki, starts)
+    np.maximum.reduceat(weight, starts)
+    np.maximum.accumulate(best)
+
+
+def _seed(engine, total_sets: int) -> tuple[int, int]:
+    rng = random.Random(7)
+    with Session(engine) as db:
+        user = User(email="bench@test.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        exercise = Exercise(user_id=user.id, name="Squat")
+        db.add(exercise)
+        db.flush()
+        sessions = total_sets // SETS_PER_SESSION
+        workout_ids = db.scalars(
+            insert(Workout).returning(Workout.id),
+            [{"user_id": user.id, "date": date(2000, 1, 1) + timedelta(days=i)} for i in range(sessions)],
+        ).all()
+        db.execute(insert(Set), [
+            {"workout_id": wid, "exercise_id": exercise.id, "reps": rng.randint(1, 12),
+             "weight_kg": round(rng.uniform(40, 200), 1)}
+            for wid in sorted(workout_ids) for _ in range(SETS_PER_SESSION)
+        ])
+        db.commit()
+        return user.id, exercise.id
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sets", type=int, default=100_000)
+    parser.add_argument("--number", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    user_id, exercise_id = _seed(engine, args.sets)
+
+    with Session(engine) as db:
+        rows = db.execute(
+            select(Workout.id, Workout.date, Set.reps, Set.weight_kg).join(Workout)
+            .where(Set.exercise_id == exercise_id).order_by(Workout.date, Workout.id, Set.id)
+        ).all()
+    columns = [np.array(c, dtype=np.float64) for c in zip(*((r[0], r[2], r[3]) for r in rows))]
+
+    cases = [
+        ("ORM loop", lambda db: orm_progression(db, user_id, exercise_id)),
+        ("numpy", lambda db: exercise_progression(db, user_id, exercise_id)),
+        ("compute only, loop", lambda db: _loop_series(rows)),
+        ("compute only, numpy", lambda db: _numpy_series(*columns)),
+    ]
+    print(f"{args.sets} sets in {args.sets // SETS_PER_SESSION} sessions")
+    print(f"{'':24s} {'time':>10s}")
+    for name, fn in cases:
+        def call():
+            with Session(engine) as db:
+                fn(db)
+
+        call()
+        seconds = min(timeit.repeat(call, number=args.number, repeat=3)) / args.number
+        print(f"{name:24s} {seconds * 1e3:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
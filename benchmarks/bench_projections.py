@@ -0,0 +1,95 @@
+"""CPU and peak memory of a 100-item list page: ORM entities vs column projections.
+
+Run from the repo root:  PYTHONPATH=src python benchmarks/bench_projections.py [--number N]
+The "entities" variants load full ORM instances (identity map, attribute state, selectin-loaded
+relationship) before validating, as the list/read endpoints did before; the "projection" variants
+are the current service functions.
+"""
+import argparse
+import timeit
+import tracemalloc
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.pool import StaticPool
+
+from app.dependencies.db import Base
+from adapters.sqlalchemy.models import Exercise, Set, User, Workout
+from domain.schemas import ExerciseRead, PaginatedResponse, WorkoutRead
+from services.exercises import list_exercises
+from services.workouts import list_workouts
+
+PAGE = 100
+
+
+def entity_workouts(db: Session, user_id: int):
+    rows = db.scalars(
+        select(Workout).options(selectinload(Workout.sets)).where(Workout.user_id == user_id)
+        .order_by(Workout.date.desc(), Workout.id.desc()).limit(PAGE + 1)
+    ).all()
+    page = {"items": rows[:PAGE], "limit": PAGE, "offset": 0, "total": None, "next_cursor": None}
+    return PaginatedResponse[WorkoutRead].model_validate(page, from_attributes=True)
+
+
+def entity_exercises(db: Session, user_id: int):
+    rows = db.scalars(
+        select(Exercise).where(Exercise.user_id == user_id).order_by(Exercise.name, Exercise.id).limit(PAGE + 1)
+    ).all()
+    page = {"items": rows[:PAGE], "limit": PAGE, "offset": 0, "total": None, "next_cursor": None}
+    return PaginatedResponse[ExerciseRead].model_validate(page, from_attributes=True)
+
+
+def _seed(engine) -> int:
+    with Session(engine) as db:
+        user = User(email="bench@test.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        exercises = [Exercise(user_id=user.id, name=f"Exercise {i:03d}") for i in range(PAGE)]
+        db.add_all(exercises)
+        db.flush()
+        for i in range(PAGE):
+            w = Workout(user_id=user.id, date=date(2020, 1, 1) + timedelta(days=i), note="tempo")
+            w.sets = [Set(exercise_id=exercises[j].id, reps=5, weight_kg=100.0) for j in range(5)]
+            db.add(w)
+        db.commit()
+        return user.id
+
+
+def _peak_kib(fn, engine) -> float:
+    with Session(engine) as db:
+        tracemalloc.start()
+        fn(db)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    user_id = _seed(engine)
+
+    cases = [
+        ("workouts, entities", lambda db: entity_workouts(db, user_id)),
+        ("workouts, projection", lambda db: list_workouts(db, user_id, PAGE, include_total=False)),
+        ("exercises, entities", lambda db: entity_exercises(db, user_id)),
+        ("exercises, projection", lambda db: list_exercises(db, user_id, PAGE, include_total=False)),
+    ]
+    print(f"{'100-item page':24s} {'time':>10s} {'peak mem':>12s}")
+    for name, fn in cases:
+        def call():
+            with Session(engine) as db:
+                fn(db)
+
+        call()
+        seconds = min(timeit.repeat(call, number=args.number, repeat=3)) / args.number
+        print(f"{name:24s} {seconds * 1e3:7.2f} ms {_peak_kib(fn, engine):9.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Cost of serializing a 100-workout list page: per-item model_validate + response_model vs one pass.
+
+Run from the repo root:  PYTHONPATH=src python benchmarks/bench_serialization.py [--items N]
+The "before" path mirrors FastAPI's response_model handling: dump each validated item back to a
+dict, run jsonable_encoder over the page and render with json.dumps.
+"""
+import argparse
+import json
+import timeit
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+from fastapi.encoders import jsonable_encoder
+
+from app.responses import FastJSONResponse
+from domain.schemas import PaginatedResponse, WorkoutRead
+
+
+def _rows(n: int, sets_per_workout: int = 5) -> list:
+    start = date(2020, 1, 1)
+    return [
+        SimpleNamespace(
+            id=i, user_id=1, date=start + timedelta(days=i), note="tempo work",
+            sets=[
+                SimpleNamespace(id=i * 10 + j, workout_id=i, exercise_id=j, reps=5, weight_kg=100.0 + j)
+                for j in range(sets_per_workout)
+            ],
+        )
+        for i in range(n)
+    ]
+
+
+def before(rows: list) -> bytes:
+    items = [WorkoutRead.model_validate(r) for r in rows]
+    page = {"items": items, "limit": len(rows), "offset": 0, "total": len(rows), "next_cursor": None}
+    content = jsonable_encoder({**page, "items": [i.model_dump() for i in items]})
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def after(rows: list) -> bytes:
+    page = {"items": rows, "limit": len(rows), "offset": 0, "total": len(rows), "next_cursor": None}
+    model = PaginatedResponse[WorkoutRead].model_validate(page, from_attributes=True)
+    return model.__pydantic_serializer__.to_json(model)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = _rows(args.items)
+    assert json.loads(before(rows)) == json.loads(after(rows))
+    dict_page = json.loads(after(rows))
+    for name, fn in [
+        ("validate + response_model + json", lambda: before(rows)),
+        ("validate once + pydantic to_json", lambda: after(rows)),
+        ("orjson default class, dict body", lambda: FastJSONResponse(dict_page).body),
+    ]:
+        best = min(timeit.repeat(fn, number=args.number, repeat=5)) / args.number
+        print(f"{name:36s} {best * 1e3:8.3f} ms/page")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Write throughput under concurrency: stock SQLite settings vs the WAL profile with a writer lane.
+
+Run from the repo root:  PYTHONPATH=src python benchmarks/bench_sqlite_profile.py [--writers N]
+Writer threads create workouts through the service layer (insert + stats + data version in one
+transaction) while reader threads page through the same user's list; both share one file DB.
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from datetime import date
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.dependencies.db import Base
+from adapters.sqlalchemy.models import Exercise, User
+from adapters.sqlalchemy.sqlite import WRITER_OPTION, apply_sqlite_profile
+from domain.schemas import SetCreate, WorkoutCreate
+from services.workouts import create_workout, list_workouts
+
+
+def _run(profile: bool, writers: int, readers: int, seconds: float) -> dict:
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False}, pool_size=32)
+    writer_engine = engine
+    if profile:
+        apply_sqlite_profile(engine, writer_lane=threading.Lock())
+        writer_engine = engine.execution_options(**{WRITER_OPTION: True})
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        user = User(email="bench@test.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        exercise = Exercise(user_id=user.id, name="Squat")
+        db.add(exercise)
+        db.commit()
+        user_id, exercise_id = user.id, exercise.id
+
+    payload = WorkoutCreate(date=date(2024, 1, 1), sets=[SetCreate(exercise_id=exercise_id, reps=5, weight_kg=100)])
+    counts = {"writes": 0, "reads": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def work(bind, fn) -> None:
+        while time.perf_counter() < deadline:
+            try:
+                with Session(bind) as db:
+                    key = fn(db)
+            except OperationalError:
+                key = "errors"
+            with lock:
+                counts[key] += 1
+
+    def write(db):
+        create_workout(db, user_id, payload)
+        return "writes"
+
+    def read(db):
+        list_workouts(db, user_id, 20)
+        return "reads"
+
+    threads = [threading.Thread(target=work, args=(writer_engine, write)) for _ in range(writers)]
+    threads += [threading.Thread(target=work, args=(engine, read)) for _ in range(readers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    engine.dispose()
+    return {k: v / seconds for k, v in counts.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{args.writers} writer / {args.readers} reader threads, {args.seconds:.0f}s each")
+    print(f"{'profile':10s} {'writes/s':>10s} {'reads/s':>10s} {'errors/s':>10s}")
+    for name, profile in (("default", False), ("wal", True)):
+        r = _run(profile, args.writers, args.readers, args.seconds)
+        print(f"{name:10s} {r['writes']:10.0f} {r['reads']:10.0f} {r['errors']:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Per-call overhead of the hot read paths: legacy Query API vs cached select()/lambda statements.
+
+Run from the repo root:  PYTHONPATH=src python benchmarks/bench_statements.py [--number N]
+Uses an in-memory SQLite database so the numbers are dominated by statement construction,
+compilation-cache lookups and ORM loading rather than I/O. The legacy variants reproduce the
+pre-migration service code.
+"""
+import argparse
+import timeit
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy.pool import StaticPool
+
+from app.dependencies.db import Base
+from adapters.sqlalchemy.models import Exercise, Set, User, Workout
+from domain.schemas import PaginatedResponse, WorkoutRead
+from services.auth import get_user
+from services.workouts import get_workout, list_workouts
+
+
+def legacy_get_user(db: Session, user_id: int):
+    return db.query(User).filter(User.id == user_id).first()
+
+
+def legacy_get_workout(db: Session, user_id: int, workout_id: int):
+    return (
+        db.query(Workout)
+        .options(selectinload(Workout.sets))
+        .filter(Workout.id == workout_id, Workout.user_id == user_id)
+        .first()
+    )
+
+
+def legacy_list_workouts(db: Session, user_id: int, limit: int):
+    q = db.query(Workout).options(selectinload(Workout.sets)).filter(Workout.user_id == user_id)
+    total = q.count()
+    rows = q.order_by(Workout.date.desc(), Workout.id.desc()).offset(0).limit(limit + 1).all()
+    page = {"items": rows[:limit], "limit": limit, "offset": 0, "total": total, "next_cursor": None}
+    return PaginatedResponse[WorkoutRead].model_validate(page, from_attributes=True)
+
+
+def _seed(engine) -> tuple[int, int]:
+    with Session(engine) as db:
+        user = User(email="bench@test.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        exercise = Exercise(user_id=user.id, name="Squat")
+        db.add(exercise)
+        db.flush()
+        for i in range(200):
+            w = Workout(user_id=user.id, date=date(2020, 1, 1) + timedelta(days=i))
+            w.sets = [Set(exercise_id=exercise.id, reps=5, weight_kg=100.0) for _ in range(3)]
+            db.add(w)
+        db.commit()
+        return user.id, w.id
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    user_id, workout_id = _seed(engine)
+
+    cases = [
+        ("get_current_user lookup", lambda db: legacy_get_user(db, user_id), lambda db: get_user(db, user_id)),
+        ("get_workout", lambda db: legacy_get_workout(db, user_id, workout_id),
+         lambda db: get_workout(db, user_id, workout_id)),
+        ("list_workouts (limit=10)", lambda db: legacy_list_workouts(db, user_id, 10),
+         lambda db: list_workouts(db, user_id, 10)),
+    ]
+    print(f"{'path':28s} {'legacy':>12s} {'2.0 style':>12s}")
+    for name, legacy, current in cases:
+        timings = []
+        for fn in (legacy, current):
+            def call():
+                # a fresh session per call, as in a request, so the identity map never short-circuits
+                with Session(engine) as db:
+                    fn(db)
+
+            call()
+            timings.append(min(timeit.repeat(call, number=args.number, repeat=3)) / args.number)
+        print(f"{name:28s} {timings[0] * 1e6:9.1f} us {timings[1] * 1e6:9.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
-from sqlalchemy import Column, Integer, String, Date, Float, ForeignKey, UniqueConstraint
+from datetime import datetime
+
+from sqlalchemy import JSON, Column, Integer, String, Date, DateTime, Float, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
 from app.dependencies.db import Base
@@ -19,12 +21,13 @@ class User(Base):
 class Exercise(Base):
     __tablename__ = "exercises"
     __table_args__ = (
+        # Also serves list_exercises: WHERE user_id = ? ORDER BY name, id
         UniqueConstraint("user_id", "name", name="uq_user_exercise_name"),
     )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     name: Mapped[str] = mapped_column(String(100), nullable=False)
-    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
 
     user = relationship("User", back_populates="exercises")
     sets = relationship("Set", back_populates="exercise")
@@ -32,11 +35,22 @@ class Exercise(Base):
 
 class Workout(Base):
     __tablename__ = "workouts"
+    __table_args__ = (
+        # list_workouts: WHERE user_id = ? ORDER BY date DESC, id DESC, keyset on (date, id)
+        Index("ix_workouts_user_date_id", "user_id", "date", "id"),
+        # list_all_workouts (admin): ORDER BY date DESC, id DESC across all users
+        Index("ix_workouts_date_id", "date", "id"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
     date: Mapped[str] = mapped_column(Date, nullable=False)
     note: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    # Summary of the workout's sets, maintained by every set write path in services.workouts
+    set_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    total_reps: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    total_volume_kg: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    exercise_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
 
     user = relationship("User", back_populates="workouts")
     sets = relationship("Set", back_populates="workout", cascade="all, delete-orphan")
@@ -44,9 +58,13 @@ class Workout(Base):
 
 class Set(Base):
     __tablename__ = "sets"
+    __table_args__ = (
+        # Covers the per-page set projection and the stats aggregate without touching the table
+        Index("ix_sets_workout_covering", "workout_id", "id", "exercise_id", "reps", "weight_kg"),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    workout_id: Mapped[int] = mapped_column(Integer, ForeignKey("workouts.id", ondelete="CASCADE"), index=True)
+    workout_id: Mapped[int] = mapped_column(Integer, ForeignKey("workouts.id", ondelete="CASCADE"))
     exercise_id: Mapped[int] = mapped_column(Integer, ForeignKey("exercises.id", ondelete="RESTRICT"), index=True)
     reps: Mapped[int] = mapped_column(Integer, nullable=False)
     weight_kg: Mapped[float] = mapped_column(Float, nullable=False)
@@ -55,3 +73,99 @@ class Set(Base):
     exercise = relationship("Exercise", back_populates="sets")
 
 
+
+class UserStats(Base):
+    """Per-user running totals maintained by the workout write path; see services.stats."""
+
+    __tablename__ = "user_stats"
+
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    workout_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    set_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    reps_sum: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    volume_kg: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+
+
+class UserDataVersion(Base):
+    """Per-user counter bumped by every workout/exercise write; backs conditional GETs."""
+
+    __tablename__ = "user_data_versions"
+
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
+class ExerciseRollup(Base):
+    """Per-exercise training totals per day/week/month bucket, maintained by the workout write
+    path; see services.rollups. The primary key doubles as the timeseries range-scan index."""
+
+    __tablename__ = "exercise_rollups"
+
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    granularity: Mapped[str] = mapped_column(String(5), primary_key=True)
+    bucket_start: Mapped[str] = mapped_column(Date, primary_key=True)
+    exercise_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("exercises.id", ondelete="CASCADE"), primary_key=True
+    )
+    set_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    reps_sum: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    volume_kg: Mapped[float] = mapped_column(Float, default=0.0, nullable=False)
+    workout_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
+class PersonalRecord(Base):
+    """A user's best result per exercise and record kind, maintained by the workout write path;
+    see services.records. `weight_kg` is the load a reps_at_weight record is for and 0 for the
+    other kinds, so the primary key also serves the per-user records read."""
+
+    __tablename__ = "personal_records"
+
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    exercise_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("exercises.id", ondelete="CASCADE"), primary_key=True
+    )
+    kind: Mapped[str] = mapped_column(String(16), primary_key=True)
+    weight_kg: Mapped[float] = mapped_column(Float, primary_key=True)
+    value: Mapped[float] = mapped_column(Float, nullable=False)
+    workout_id: Mapped[int] = mapped_column(Integer, ForeignKey("workouts.id", ondelete="CASCADE"), nullable=False)
+    achieved_on: Mapped[str] = mapped_column(Date, nullable=False)
+
+
+class QuantileSketchBucket(Base):
+    """One bucket count of a population-wide quantile sketch; see services.sketches."""
+
+    __tablename__ = "quantile_sketch_buckets"
+
+    exercise_name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    metric: Mapped[str] = mapped_column(String(20), primary_key=True)
+    bucket: Mapped[int] = mapped_column(Integer, primary_key=True)
+    count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
+class Job(Base):
+    """A background job and, once it finished, where its result is; see services.jobs."""
+
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Per-user active-job count on submit; also the owner's listing
+        Index("ix_jobs_user_status", "user_id", "status"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    kind: Mapped[str] = mapped_column(String(32), nullable=False)
+    params: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    status: Mapped[str] = mapped_column(String(10), nullable=False, default="queued")
+    # Token of the process that will run (queued) or is running the job; see services.jobs
+    worker_token: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    worker_pid: Mapped[int | None] = mapped_column(Integer, nullable=True)  # for operators only
+    progress_done: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    progress_total: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    error: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    result_path: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    result_name: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    result_media_type: Mapped[str | None] = mapped_column(String(50), nullable=True)
+    result_size: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
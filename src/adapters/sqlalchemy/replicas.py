@@ -0,0 +1,116 @@
+"""Read-replica routing for read-only sessions.
+
+A `RoutingSession` whose `info["read_only"]` is set sends its statements to one replica picked
+round-robin from the `ReplicaSet` in `info["replicas"]`, and keeps that replica for the rest of
+the session so a request sees one consistent snapshot. Flushes, DML and sessions pinned with
+`pin_primary` go to the session's own bind (the primary). Replicas whose connections fail are
+ejected for `eject_seconds`; with none healthy, reads fall back to the primary.
+
+Read-your-writes across requests comes from `RecentWriters`: a user whose write committed less
+than its `window_seconds` ago has their read-only sessions pinned to the primary, so a GET right
+after a POST sees the POST even while replicas lag.
+"""
+import itertools
+from collections import OrderedDict
+import threading
+import time
+
+from sqlalchemy import Delete, Insert, Update, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+
+class ReplicaSet:
+    def __init__(self, engines: list[Engine], eject_seconds: float = 30.0):
+        self.engines = list(engines)
+        self.eject_seconds = eject_seconds
+        self._ejected_until: dict[Engine, float] = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        for engine in self.engines:
+            event.listen(engine, "handle_error", self._on_error)
+
+    def choose(self) -> Engine | None:
+        """Next healthy replica in round-robin order, or None when all are ejected."""
+        now = time.monotonic()
+        n = len(self.engines)
+        for _ in range(n):
+            engine = self.engines[next(self._counter) % n]
+            if self._ejected_until.get(engine, 0.0) <= now:
+                return engine
+        return None
+
+    def eject(self, engine: Engine) -> None:
+        with self._lock:
+            self._ejected_until[engine] = time.monotonic() + self.eject_seconds
+
+    def _on_error(self, context) -> None:
+        # Lost connections and failed connects mean the replica is down or unreachable;
+        # statement-level errors (bad SQL, constraint violations) say nothing about its health
+        if context.is_disconnect or context.connection is None:
+            self.eject(context.engine)
+
+    def stats(self) -> list[dict]:
+        now = time.monotonic()
+        return [
+            {
+                "url": e.url.render_as_string(hide_password=True),
+                "healthy": self._ejected_until.get(e, 0.0) <= now,
+            }
+            for e in self.engines
+        ]
+
+
+class RecentWriters:
+    """Bounded map of user id -> when their last write committed, kept for `window_seconds`.
+
+    Per process, like the principal cache: with several workers, a read served by a worker
+    other than the one that took the write can still hit a lagging replica.
+    """
+
+    def __init__(self, window_seconds: float, maxsize: int = 100_000):
+        self.window_seconds = window_seconds
+        self.maxsize = maxsize
+        self._until: OrderedDict[int, float] = OrderedDict()  # ordered by expiry
+        self._lock = threading.Lock()
+
+    def touch(self, user_id: int) -> None:
+        if self.window_seconds <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._until.pop(user_id, None)
+            self._until[user_id] = now + self.window_seconds
+            while self._until and (len(self._until) > self.maxsize or next(iter(self._until.values())) <= now):
+                self._until.popitem(last=False)
+
+    def recent(self, user_id: int) -> bool:
+        with self._lock:
+            until = self._until.get(user_id)
+        return until is not None and until > time.monotonic()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._until.clear()
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, **kw):
+        replicas: ReplicaSet | None = self.info.get("replicas")
+        if replicas is None or not self.info.get("read_only"):
+            return super().get_bind(mapper=mapper, clause=clause, **kw)
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            # A read-only session that writes anyway must read its own writes from then on
+            self.info["pinned_primary"] = True
+        if self.info.get("pinned_primary"):
+            return super().get_bind(mapper=mapper, clause=clause, **kw)
+        if "replica" not in self.info:
+            self.info["replica"] = replicas.choose()
+        return self.info["replica"] or super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+def pin_primary(db: Session | AsyncSession) -> None:
+    """Route the rest of this session to the primary (read-your-writes)."""
+    session = db.sync_session if isinstance(db, AsyncSession) else db
+    session.info["pinned_primary"] = True
@@ -0,0 +1,98 @@
+"""Opt-in SQLite production profile: WAL journal, tuned pragmas and a single writer lane.
+
+In WAL mode readers never block the writer or each other, but SQLite still allows one writer at
+a time, and a deferred transaction that read first and then tries to write after someone else
+committed fails with `database is locked` regardless of busy_timeout. So the profile takes
+transaction control away from the driver and begins writer transactions with BEGIN IMMEDIATE
+(they hold the write lock from their first statement). In-process, writers also queue on a lock
+rather than busy-polling the database file. Which transactions are writers is decided by the
+`sqlite_writer` execution option on the Engine/Connection the session is bound to.
+"""
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+WRITER_OPTION = "sqlite_writer"
+
+
+def apply_sqlite_profile(
+    engine: Engine,
+    *,
+    busy_timeout_ms: int = 5000,
+    mmap_size: int = 256 * 1024 * 1024,
+    cache_size_kib: int = 64 * 1024,
+    writer_lane: "threading.Lock | None" = None,
+) -> None:
+    """Install the profile's connect/begin hooks on `engine` (a sync Engine or async sync_engine).
+
+    `writer_lane` serializes writer transactions within the process; leave it None for async
+    drivers, whose hooks run on the event loop and must not block (BEGIN IMMEDIATE plus
+    busy_timeout still serializes them, in SQLite's worker threads). It blocks the calling
+    thread, so callers that share a bounded threadpool should queue before taking a worker (see
+    app.dependencies.db.request_writer_lane) rather than wait here.
+    """
+
+    @event.listens_for(engine, "connect")
+    def _configure(dbapi_connection, connection_record) -> None:
+        # Let SQLAlchemy emit BEGIN itself so writers can use BEGIN IMMEDIATE
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        # With WAL, NORMAL only fsyncs at checkpoints: durable against app crashes, not power loss
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+        cursor.execute(f"PRAGMA mmap_size={int(mmap_size)}")
+        cursor.execute(f"PRAGMA cache_size=-{int(cache_size_kib)}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+    @event.listens_for(engine, "begin")
+    def _begin(conn) -> None:
+        writer = conn.get_execution_options().get(WRITER_OPTION, False)
+        if writer and writer_lane is not None:
+            writer_lane.acquire()
+            conn.info["holds_writer_lane"] = True
+        try:
+            _execute(conn, "BEGIN IMMEDIATE" if writer else "BEGIN")
+        except Exception:
+            _release(conn)
+            raise
+
+    def _release(conn) -> None:
+        if conn.info.pop("holds_writer_lane", False):
+            writer_lane.release()
+
+    # The commit/rollback events fire before the driver ends the transaction. For lane holders,
+    # end it here so the next writer is let in only once the write lock is really free (otherwise
+    # its BEGIN IMMEDIATE lands mid-COMMIT and sleeps in the busy handler); the driver's own
+    # commit()/rollback() then finds no open transaction and does nothing.
+    @event.listens_for(engine, "commit")
+    def _commit(conn) -> None:
+        if not conn.info.get("holds_writer_lane"):
+            return
+        try:
+            _execute(conn, "COMMIT")
+        finally:
+            _release(conn)
+
+    @event.listens_for(engine, "rollback")
+    def _rollback(conn) -> None:
+        if not conn.info.get("holds_writer_lane"):
+            return
+        try:
+            _execute(conn, "ROLLBACK")
+        except Exception:
+            pass  # the driver's rollback() follows and reports a genuinely broken connection
+        finally:
+            _release(conn)
+
+
+def _execute(conn, statement: str) -> None:
+    # Raw DBAPI cursor: transaction control stays out of the per-request SQL accounting
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(statement)
+    finally:
+        cursor.close()
@@ -0,0 +1,21 @@
+"""INSERT ... ON CONFLICT DO UPDATE for the backends the app runs on (SQLite and PostgreSQL)."""
+from sqlalchemy import Table
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+
+_INSERTS = {"sqlite": sqlite_insert, "postgresql": pg_insert}
+
+
+def upsert(db: Session, table: Table, set_):
+    """An INSERT into `table` that updates the existing row on a primary-key conflict.
+
+    `set_(columns, excluded)` returns the SET clause as {column name: expression}, where
+    `excluded` holds the values the conflicting row would have inserted. Execute the statement
+    with a list of parameter dicts to upsert many rows in one executemany.
+    """
+    stmt = _INSERTS[db.get_bind().dialect.name](table)
+    return stmt.on_conflict_do_update(
+        index_elements=[c.name for c in table.primary_key], set_=set_(table.c, stmt.excluded)
+    )
@@ -0,0 +1,136 @@
+"""Maintenance commands: `python -m app.cli <command>` (run with `src` on PYTHONPATH)."""
+import argparse
+import asyncio
+import sys
+
+from app.dependencies import db as db_module
+
+
+def _run_async(coro_fn):
+    async def _run():
+        try:
+            return await coro_fn()
+        finally:
+            # Pooled async connections are bound to this loop; don't leak them into the next one
+            if db_module.async_engine is not None:
+                await db_module.async_engine.dispose()
+
+    return asyncio.run(_run())
+
+
+def run_with_session(fn, *args, **kwargs):
+    """Run a sync service function against a fresh session, whichever engine mode is configured."""
+    if db_module.AsyncSessionLocal is not None:
+        async def _call():
+            async with db_module.AsyncSessionLocal() as session:
+                return await session.run_sync(fn, *args, **kwargs)
+
+        return _run_async(_call)
+    with db_module.SessionLocal() as session:
+        return fn(session, *args, **kwargs)
+
+
+def cmd_rebuild_stats(args: argparse.Namespace) -> int:
+    from services.stats import rebuild_user_stats
+
+    drift = run_with_session(rebuild_user_stats, check_only=args.check)
+    for d in drift:
+        print(f"user {d.user_id}: stored={d.stored} actual={d.actual}")
+    verb = "drifted" if args.check else "rebuilt"
+    print(f"{len(drift)} user stats row(s) {verb}")
+    return 1 if args.check and drift else 0
+
+
+def cmd_rebuild_summaries(args: argparse.Namespace) -> int:
+    from services.workouts import rebuild_workout_summaries
+
+    drifted = run_with_session(rebuild_workout_summaries, check_only=args.check)
+    verb = "drifted" if args.check else "rebuilt"
+    print(f"{len(drifted)} workout summary row(s) {verb}")
+    return 1 if args.check and drifted else 0
+
+
+def cmd_backfill_rollups(args: argparse.Namespace) -> int:
+    from services.rollups import rebuild_rollups
+
+    written = run_with_session(rebuild_rollups, users_per_chunk=args.chunk_size)
+    print(f"{written} rollup row(s) written")
+    return 0
+
+
+def cmd_rebuild_sketches(args: argparse.Namespace) -> int:
+    from services.sketches import rebuild_sketches
+
+    sets_read = run_with_session(rebuild_sketches)
+    print(f"quantile sketches rebuilt from {sets_read} set(s)")
+    return 0
+
+
+def cmd_explain_queries(args: argparse.Namespace) -> int:
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import Session
+    from sqlalchemy.pool import StaticPool
+
+    from app.index_advisor import advise, seed_dataset
+
+    in_memory = args.database_url in ("sqlite://", "sqlite:///:memory:")
+    engine = create_engine(args.database_url, **({"poolclass": StaticPool} if in_memory else {}))
+    db_module.Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        # The seed rows only live in this transaction; nothing is committed
+        user_id = seed_dataset(db, users=args.users, workouts_per_user=args.workouts)
+        reports = advise(db, user_id)
+        db.rollback()
+    engine.dispose()
+
+    flagged = 0
+    for r in reports:
+        print(f"[{r.call}] {' '.join(r.statement.split())[:200]}")
+        for line in r.plan:
+            print(f"    {line}")
+        for flag in r.flags:
+            print(f"    !! {flag}")
+        flagged += bool(r.flags)
+    print(f"{len(reports)} statement(s) explained, {flagged} flagged")
+    return 1 if flagged else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("rebuild-stats", help="Recompute per-user aggregates from workouts and sets")
+    p.add_argument("--check", action="store_true", help="Only report drift; exit 1 if any")
+    p.set_defaults(func=cmd_rebuild_stats)
+
+    p = sub.add_parser("rebuild-summaries", help="Recompute per-workout set summaries from sets")
+    p.add_argument("--check", action="store_true", help="Only report drift; exit 1 if any")
+    p.set_defaults(func=cmd_rebuild_summaries)
+
+    p = sub.add_parser("backfill-rollups", help="Rebuild the day/week/month exercise rollups from sets")
+    p.add_argument("--chunk-size", type=int, default=100, help="Users rebuilt per transaction")
+    p.set_defaults(func=cmd_backfill_rollups)
+
+    p = sub.add_parser("rebuild-sketches", help="Recompute the admin percentile sketches from all sets")
+    p.set_defaults(func=cmd_rebuild_sketches)
+
+    p = sub.add_parser("explain-queries", help="EXPLAIN the service-layer queries and flag scans/sorts")
+    p.add_argument(
+        "--database-url", default="sqlite://",
+        help="Scratch database to seed and explain against (sync driver); default in-memory SQLite",
+    )
+    p.add_argument("--users", type=int, default=20, help="Synthetic users to seed")
+    p.add_argument("--workouts", type=int, default=200, help="Workouts per seeded user")
+    p.set_defaults(func=cmd_explain_queries)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    _run_async(db_module.init_db)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,26 +2,90 @@ from typing import Optional
 from fastapi import Depends, Security
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, ExpiredSignatureError
+from sqlalchemy import event, inspect
 from sqlalchemy.orm import Session
 
 from app.security import decode_token
-from app.dependencies.db import get_db
+from app.dependencies.db import get_db, recent_writers, run_db
+from app.principal_cache import Principal, PrincipalCache
+from app.settings import settings
 from adapters.sqlalchemy.models import User
+from adapters.sqlalchemy.replicas import pin_primary
 from domain.exceptions import Unauthorized, Forbidden
+from services.auth import get_user
 
 
 security_scheme = HTTPBearer(auto_error=False)
 
+principal_cache = PrincipalCache(
+    maxsize=settings.principal_cache_size,
+    ttl_seconds=settings.principal_cache_ttl_seconds,
+)
 
-def get_current_user(
+
+def _invalidate_at_commit(target: User) -> None:
+    # Drop the user's entries now and again once the change commits: until then a concurrent
+    # cache miss still reads the committed (old) row and would re-cache it for the whole TTL
+    principal_cache.invalidate_user(target.id)
+    session = inspect(target).session
+    if session is not None:
+        session.info.setdefault("invalidated_principals", set()).add(target.id)
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_deleted_user(mapper, connection, target: User) -> None:
+    _invalidate_at_commit(target)
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_changed_role(mapper, connection, target: User) -> None:
+    if inspect(target).attrs.role.history.has_changes():
+        _invalidate_at_commit(target)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_principals(session: Session) -> None:
+    if session.in_nested_transaction():  # a released SAVEPOINT; wait for the outer commit
+        return
+    for user_id in session.info.pop("invalidated_principals", ()):
+        principal_cache.invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _forget_invalidated_principals(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop("invalidated_principals", None)
+
+
+@event.listens_for(Session, "after_commit")
+def _remember_committed_write(session: Session) -> None:
+    if session.in_nested_transaction() or session.info.get("read_only", True):
+        return
+    user_id = session.info.get("user_id")  # request sessions only; see get_current_user
+    if user_id is not None:
+        recent_writers.touch(user_id)
+
+
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials | None = Security(security_scheme),
     db: Session = Depends(get_db),
-) -> User:
+) -> Principal:
+    principal = await _authenticate(credentials, db)
+    db.info["user_id"] = principal.id
+    if db.info.get("read_only") and recent_writers.recent(principal.id):
+        pin_primary(db)  # read-your-writes: replicas may not have the user's last write yet
+    return principal
+
+
+async def _authenticate(credentials: HTTPAuthorizationCredentials | None, db: Session) -> Principal:
     if not credentials:
         raise Unauthorized("Missing Authorization header")
     if credentials.scheme.lower() != "bearer":
         raise Unauthorized("Invalid authorization scheme; expected Bearer")
     token = credentials.credentials
+    cached = principal_cache.get(token)
+    if cached is not None:
+        return cached
     try:
         payload = decode_token(token)
     except ExpiredSignatureError:
@@ -31,15 +95,19 @@ def get_current_user(
     if payload.get("type") != "access":
         raise Unauthorized("Invalid token type")
     user_id = payload.get("sub")
-    user: User | None = db.query(User).filter(User.id == int(user_id)).first()
+    user: User | None = await run_db(db, get_user, int(user_id))
+    if not user and db.info.get("replica") is not None:
+        # A just-registered user may not have replicated yet; ask the primary before refusing
+        pin_primary(db)
+        user = await run_db(db, get_user, int(user_id))
     if not user:
         raise Unauthorized("User not found")
-    return user
+    principal = Principal(id=user.id, role=user.role)
+    principal_cache.put(token, principal, payload.get("exp"))
+    return principal
 
 
-def require_admin(user: User = Depends(get_current_user)) -> User:
+async def require_admin(user: Principal = Depends(get_current_user)) -> Principal:
     if user.role != "admin":
         raise Forbidden("Admin access required")
     return user
-
-
@@ -1,8 +1,20 @@
+import asyncio
+import threading
+
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import QueuePool
 from contextlib import contextmanager
+from starlette.concurrency import run_in_threadpool
 
+from adapters.sqlalchemy.replicas import RecentWriters, ReplicaSet, RoutingSession
+from adapters.sqlalchemy.sqlite import WRITER_OPTION, apply_sqlite_profile
+from app.instrumentation import install_sql_hooks
+from app.metrics import timed_pool_class
 from app.settings import settings
 
 
@@ -10,18 +22,126 @@ class Base(DeclarativeBase):
     pass
 
 
-engine = create_engine(
-    settings.database_url,
-    connect_args={"check_same_thread": False} if settings.database_url.startswith("sqlite") else {},
-    pool_pre_ping=True,
+def is_async_url(url: str) -> bool:
+    # e.g. sqlite+aiosqlite:// or postgresql+asyncpg://
+    return bool(make_url(url).get_dialect().is_async)
+
+
+_url = make_url(settings.database_url)
+_connect_args = {"check_same_thread": False} if settings.database_url.startswith("sqlite") else {}
+# The dialect's default pool, subclassed to time checkouts for /metrics
+_poolclass = timed_pool_class(_url.get_dialect().get_pool_class(_url))
+# Sizing only applies to queue pools (not e.g. the singleton pools used for in-memory SQLite);
+# QueuePool blocks up to pool_timeout once pool_size + max_overflow connections are out
+_pool_kwargs = (
+    {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+    }
+    if issubclass(_poolclass, QueuePool)
+    else {}
+)
+
+if is_async_url(settings.database_url):
+    async_engine = create_async_engine(
+        settings.database_url,
+        connect_args=_connect_args,
+        pool_pre_ping=True,
+        poolclass=_poolclass,
+        **_pool_kwargs,
+    )
+    # Event hooks and metadata work against the sync facade of the async engine
+    engine = async_engine.sync_engine
+    replica_engines = [
+        create_async_engine(url, connect_args=_connect_args, pool_pre_ping=True).sync_engine
+        for url in settings.database_replica_urls
+    ]
+else:
+    async_engine = None
+    engine = create_engine(
+        settings.database_url,
+        connect_args=_connect_args,
+        pool_pre_ping=True,
+        poolclass=_poolclass,
+        **_pool_kwargs,
+    )
+    replica_engines = [
+        create_engine(url, connect_args=_connect_args, pool_pre_ping=True)
+        for url in settings.database_replica_urls
+    ]
+
+# Read-only request sessions route SELECTs to a replica; see adapters.sqlalchemy.replicas
+replicas = ReplicaSet(replica_engines, settings.replica_eject_seconds) if replica_engines else None
+recent_writers = RecentWriters(settings.replica_read_your_writes_seconds)
+for _e in (engine, *replica_engines):
+    install_sql_hooks(_e)
+_session_info = {"replicas": replicas}
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=engine, class_=RoutingSession, info=_session_info
+)
+AsyncSessionLocal = (
+    async_sessionmaker(
+        async_engine, autoflush=False, sync_session_class=RoutingSession, info=_session_info
+    )
+    if async_engine is not None
+    else None
+)
+
+# Opt-in SQLite profile: sessions for mutating requests bind to writer_engine and go through the
+# single writer lane; everything else reads concurrently under WAL
+sqlite_wal = _url.get_backend_name() == "sqlite" and settings.sqlite_profile == "wal"
+if sqlite_wal:
+    apply_sqlite_profile(
+        engine,
+        busy_timeout_ms=settings.sqlite_busy_timeout_ms,
+        mmap_size=settings.sqlite_mmap_size,
+        cache_size_kib=settings.sqlite_cache_size_kib,
+        writer_lane=None if async_engine is not None else threading.Lock(),
+    )
+    writer_engine = engine.execution_options(**{WRITER_OPTION: True})
+    async_writer_engine = (
+        async_engine.execution_options(**{WRITER_OPTION: True}) if async_engine is not None else None
+    )
+else:
+    writer_engine = engine
+    async_writer_engine = async_engine
+
+# Background writers (jobs, flushers) read and then write in one transaction, so under the WAL
+# profile they need writer sessions too
+WriterSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=writer_engine, class_=RoutingSession, info=_session_info
+)
+AsyncWriterSessionLocal = (
+    async_sessionmaker(
+        async_writer_engine, autoflush=False, sync_session_class=RoutingSession, info=_session_info
+    )
+    if async_engine is not None
+    else None
 )
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Writer requests queue for the profile's lane here, on the event loop, before they touch the
+# database (in run_db). Queueing inside threadpool workers (the engine-level lane) deadlocks: the blocked
+# workers can use up the pool while the lane holder still needs a worker to finish, e.g. to
+# close a session whose post-commit refresh began a new writer transaction. The engine-level
+# lane remains for writers outside requests (jobs, flushers), which have their own threads.
+request_writer_lane = asyncio.Lock() if sqlite_wal else None
 
-def init_db() -> None:
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+async def init_db() -> None:
     # Import models to ensure metadata is populated
-    from adapters.sqlalchemy.models import User, Workout, Exercise, Set  # noqa: F401
-    Base.metadata.create_all(bind=engine)
+    from adapters.sqlalchemy.models import (  # noqa: F401
+        User, Workout, Exercise, Set, UserStats, UserDataVersion, ExerciseRollup, PersonalRecord,
+        QuantileSketchBucket, Job,
+    )
+    if async_engine is not None:
+        async with async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    else:
+        await run_in_threadpool(Base.metadata.create_all, bind=engine)
 
 
 @contextmanager
@@ -37,11 +157,78 @@ def get_db_session():
         db.close()
 
 
-def get_db():
-    db: Session = SessionLocal()
+async def _enter_writer_lane(db: Session | AsyncSession) -> None:
+    if db.info.get("wants_writer_lane") and not db.info.get("in_writer_lane"):
+        await request_writer_lane.acquire()
+        db.info["in_writer_lane"] = True
+
+
+def _leave_writer_lane(db: Session | AsyncSession) -> None:
+    if db.info.pop("in_writer_lane", False):
+        request_writer_lane.release()
+
+
+async def get_db(request: Request):
+    """Request-scoped session. Sessions are lazy: no connection is checked out of the pool until
+    the first statement, so requests answered from caches never touch the pool.
+
+    Under the SQLite WAL profile a writer request takes `request_writer_lane` in its first
+    `run_db` and holds it until its session is closed (or `end_transaction` lets go of it), so
+    a request still reading its body doesn't keep other writers out."""
+    writer = request.method not in SAFE_METHODS
+    info = {"read_only": not writer, "wants_writer_lane": writer and request_writer_lane is not None}
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal(bind=async_writer_engine if writer else async_engine, info=info) as db:
+            try:
+                yield db
+            finally:
+                await db.close()
+                _leave_writer_lane(db)
+        return
+    db: Session = SessionLocal(bind=writer_engine if writer else engine, info=info)
     try:
         yield db
     finally:
-        db.close()
+        try:
+            if db.in_transaction():
+                await run_in_threadpool(db.close)
+            else:
+                db.close()  # never connected: nothing to release, skip the threadpool hop
+        finally:
+            _leave_writer_lane(db)
+
+
+async def run_db(db: Session | AsyncSession, fn, *args, **kwargs):
+    """Run a sync service function `fn(session, *args)` without blocking the event loop.
+
+    With an AsyncSession the function runs via `run_sync` on the async driver, so there is no
+    thread hop; with a plain Session it is offloaded to the threadpool.
+    """
+    await _enter_writer_lane(db)
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
+async def end_transaction(db: Session | AsyncSession) -> None:
+    """Roll back the session's read-only transaction, returning its connection to the pool.
+
+    Call before slow non-DB work (e.g. password hashing) so the request doesn't hold a pooled
+    connection, or the SQLite writer lane, while it runs; the next `run_db` takes the lane back.
+    Loaded objects are expired.
+    """
+    if isinstance(db, AsyncSession):
+        await db.rollback()
+    else:
+        await run_in_threadpool(db.rollback)
+    _leave_writer_lane(db)
+
+
+def get_session_factory() -> sessionmaker | async_sessionmaker:
+    """Session factory for work that outlives the request-scoped session, e.g. streamed responses."""
+    return AsyncSessionLocal if AsyncSessionLocal is not None else SessionLocal
 
 
+def get_writer_session_factory() -> sessionmaker | async_sessionmaker:
+    """Like `get_session_factory`, for work that writes outside a request: jobs and flushers."""
+    return AsyncWriterSessionLocal if AsyncWriterSessionLocal is not None else WriterSessionLocal
@@ -0,0 +1,38 @@
+from fastapi import Request, Response
+from starlette.status import HTTP_304_NOT_MODIFIED
+
+from app.dependencies.db import run_db
+from services.data_version import get_data_version
+
+
+def data_etag(user_id: int, version: int) -> str:
+    return f'W/"{user_id}.{version}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison: ignore the W/ prefix on both sides
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+async def not_modified(request: Request, response: Response, db, user_id: int) -> Response | None:
+    """Validate the request against the user's data version.
+
+    Returns a bodiless 304 when the client's copy is current; otherwise sets ETag on `response`
+    and returns None so the handler goes on to run its query. The version is read before the
+    main query, so a concurrent write can only make the ETag older than the body, never newer.
+    """
+    version = await run_db(db, get_data_version, user_id)
+    headers = {
+        "ETag": data_etag(user_id, version),
+        "Cache-Control": "private, no-cache",
+        "Vary": "Authorization",
+    }
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
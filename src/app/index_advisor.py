@@ -0,0 +1,142 @@
+"""Run EXPLAIN over the statements the service layer issues and flag plans that won't scale.
+
+Each hot service call is executed against a seeded dataset with a QueryCounter attached; every
+captured SELECT is then explained with the same parameters. SQLite plans are read from
+`EXPLAIN QUERY PLAN`, Postgres plans from `EXPLAIN (FORMAT JSON)`. Flags are full table scans
+and sorts the planner has to materialize (temp B-trees / Sort nodes).
+"""
+import json
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from adapters.sqlalchemy.models import Exercise, Set, User, Workout
+from adapters.sqlalchemy.query_counter import QueryCounter
+from app.dependencies.db import Base
+
+
+@dataclass
+class PlanReport:
+    call: str
+    statement: str
+    plan: list[str]
+    flags: list[str] = field(default_factory=list)
+
+
+def seed_dataset(
+    db: Session, users: int = 20, workouts_per_user: int = 200, sets_per_workout: int = 4
+) -> int:
+    """Insert synthetic users/exercises/workouts/sets and return the id of the first user."""
+    first_user = None
+    start = date(2020, 1, 1)
+    for u in range(users):
+        user_id = db.scalar(
+            insert(User)
+            .values(email=f"advisor{u}@example.com", hashed_password="x", role="user")
+            .returning(User.id)
+        )
+        first_user = first_user or user_id
+        exercise_ids = db.scalars(
+            insert(Exercise).returning(Exercise.id),
+            [{"user_id": user_id, "name": f"Exercise {i}"} for i in range(10)],
+        ).all()
+        workout_ids = db.scalars(
+            insert(Workout).returning(Workout.id),
+            [{"user_id": user_id, "date": start + timedelta(days=d)} for d in range(workouts_per_user)],
+        ).all()
+        db.execute(insert(Set), [
+            {"workout_id": w, "exercise_id": exercise_ids[i % 10], "reps": 5, "weight_kg": 100.0}
+            for w in workout_ids
+            for i in range(sets_per_workout)
+        ])
+    db.flush()
+    return first_user
+
+
+def _hot_calls(db: Session, user_id: int) -> list[tuple[str, callable]]:
+    from services.auth import get_user
+    from services.data_version import get_data_version
+    from services.exercises import list_all_exercises, list_exercises, read_exercise
+    from services.export import iter_export
+    from services.stats import _compute_all_stats, get_user_stats
+    from services.workouts import list_all_workouts, list_workouts, read_workout
+
+    first = list_workouts(db, user_id, 20)
+    workout_id = first.items[0].id
+    exercise_id = list_exercises(db, user_id, 1).items[0].id
+    return [
+        ("get_user", lambda: get_user(db, user_id)),
+        ("get_data_version", lambda: get_data_version(db, user_id)),
+        ("list_workouts", lambda: list_workouts(db, user_id, 20)),
+        ("list_workouts(cursor)", lambda: list_workouts(db, user_id, 20, cursor=first.next_cursor)),
+        ("list_all_workouts", lambda: list_all_workouts(db, 20, include_total=False)),
+        ("read_workout", lambda: read_workout(db, user_id, workout_id)),
+        ("list_exercises", lambda: list_exercises(db, user_id, 20)),
+        ("list_all_exercises", lambda: list_all_exercises(db, 20, include_total=False)),
+        ("read_exercise", lambda: read_exercise(db, user_id, exercise_id)),
+        ("get_user_stats", lambda: get_user_stats(db, user_id)),
+        ("rebuild_user_stats", lambda: _compute_all_stats(db)),
+        ("export", lambda: list(iter_export(db, user_id, "ndjson"))),
+    ]
+
+
+def _explain_sqlite(db: Session, statement: str, parameters) -> tuple[list[str], list[str]]:
+    rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    tables = set(Base.metadata.tables)
+    plan = [row[-1] for row in rows]
+    flags = [detail.lower() for detail in plan if "TEMP B-TREE" in detail]
+    # A rowid-order scan feeding a LIMIT with no sort step stops after one page; not a full scan
+    bounded = not flags and " LIMIT " in statement
+    for detail in plan:
+        words = detail.split()
+        table = words[1] if words[0] == "SCAN" and len(words) > 1 else None
+        if table in tables and "USING" not in words and not bounded:
+            flags.append(f"full scan of {table}")
+    return plan, flags
+
+
+def _explain_postgres(db: Session, statement: str, parameters) -> tuple[list[str], list[str]]:
+    raw = db.connection().exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+    root = (json.loads(raw) if isinstance(raw, str) else raw)[0]["Plan"]
+    plan, flags = [], []
+
+    def walk(node: dict, depth: int) -> None:
+        kind = node["Node Type"]
+        relation = node.get("Relation Name")
+        plan.append("  " * depth + kind + (f" on {relation}" if relation else ""))
+        if kind == "Seq Scan":
+            flags.append(f"full scan of {relation}")
+        if kind == "Sort":
+            flags.append(f"sort on {', '.join(node.get('Sort Key', []))}")
+        for child in node.get("Plans", []):
+            walk(child, depth + 1)
+
+    walk(root, 0)
+    return plan, flags
+
+
+def advise(db: Session, user_id: int) -> list[PlanReport]:
+    """Explain every distinct SELECT issued by the hot service calls for `user_id`."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        explain = _explain_sqlite
+    elif dialect == "postgresql":
+        explain = _explain_postgres
+    else:
+        raise ValueError(f"EXPLAIN parsing is not implemented for {dialect}")
+
+    db.execute(text("ANALYZE"))
+    reports: list[PlanReport] = []
+    seen: set[str] = set()
+    for name, call in _hot_calls(db, user_id):
+        with QueryCounter(db.get_bind()) as counter:
+            call()
+        for statement, parameters in zip(counter.statements, counter.parameters):
+            if not statement.lstrip().upper().startswith("SELECT") or statement in seen:
+                continue
+            seen.add(statement)
+            plan, flags = explain(db, statement, parameters)
+            reports.append(PlanReport(call=name, statement=statement, plan=plan, flags=flags))
+    return reports
@@ -0,0 +1,173 @@
+"""Per-request SQL accounting: query count, DB time and slowest statement.
+
+Engine hooks add to the RequestSqlStats bound to the current request through a ContextVar; the
+ASGI middleware opens that context, folds it into per-route-template aggregates and, when
+enabled (SQL_DEBUG), reports it as a `Server-Timing` header; off by default, since it shows any
+client backend timings. The context survives `run_in_threadpool` and `run_sync`, so
+queries from service functions are attributed to the request that issued them.
+"""
+import logging
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RequestSqlStats:
+    query_count: int = 0
+    db_seconds: float = 0.0
+    slowest_seconds: float = 0.0
+    slowest_statement: str | None = None
+    shapes: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.query_count += 1
+        self.db_seconds += elapsed
+        self.shapes[statement] += 1
+        if elapsed >= self.slowest_seconds:
+            self.slowest_seconds = elapsed
+            self.slowest_statement = statement
+
+    def repeated_shapes(self, threshold: int) -> list[tuple[str, int]]:
+        return [(s, n) for s, n in self.shapes.items() if n > threshold]
+
+
+@dataclass
+class RouteSqlStats:
+    requests: int = 0
+    queries: int = 0
+    db_seconds: float = 0.0
+    max_queries: int = 0
+    slowest_seconds: float = 0.0
+    slowest_statement: str | None = None
+
+
+current_sql_stats: ContextVar[RequestSqlStats | None] = ContextVar("current_sql_stats", default=None)
+
+_route_stats: dict[str, RouteSqlStats] = {}
+_route_stats_lock = threading.Lock()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if current_sql_stats.get() is not None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = current_sql_stats.get()
+    if stats is None:
+        return
+    starts = conn.info.get("query_start_time")
+    if not starts:
+        return
+    stats.record(statement, time.perf_counter() - starts.pop())
+
+
+def install_sql_hooks(engine) -> None:
+    """Attach the accounting hooks to an Engine (or to the Engine class for every engine)."""
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def route_template(scope: Scope) -> str:
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if not template:
+        return "<unmatched>"
+    # Routes from included routers may only know their own path; recover the prefix from the URL
+    try:
+        concrete = route.path_format.format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return template
+    path = scope.get("path", "")
+    if path.endswith(concrete) and path != concrete:
+        return path[: len(path) - len(concrete)] + template
+    return template
+
+
+def record_route(route: str, stats: RequestSqlStats) -> None:
+    with _route_stats_lock:
+        agg = _route_stats.get(route)
+        if agg is None:
+            agg = _route_stats[route] = RouteSqlStats()
+        agg.requests += 1
+        agg.queries += stats.query_count
+        agg.db_seconds += stats.db_seconds
+        agg.max_queries = max(agg.max_queries, stats.query_count)
+        if stats.slowest_seconds >= agg.slowest_seconds:
+            agg.slowest_seconds = stats.slowest_seconds
+            agg.slowest_statement = stats.slowest_statement
+
+
+def route_sql_stats() -> dict[str, dict]:
+    with _route_stats_lock:
+        return {
+            route: {
+                "requests": agg.requests,
+                "queries": agg.queries,
+                "avg_queries": agg.queries / agg.requests,
+                "max_queries": agg.max_queries,
+                "db_ms_total": round(agg.db_seconds * 1000, 3),
+                "db_ms_avg": round(agg.db_seconds * 1000 / agg.requests, 3),
+                "slowest_ms": round(agg.slowest_seconds * 1000, 3),
+                "slowest_statement": agg.slowest_statement,
+            }
+            for route, agg in _route_stats.items()
+        }
+
+
+def reset_route_sql_stats() -> None:
+    with _route_stats_lock:
+        _route_stats.clear()
+
+
+def server_timing(stats: RequestSqlStats, total_seconds: float) -> str:
+    return (
+        f'db;dur={stats.db_seconds * 1000:.3f};desc="{stats.query_count} queries", '
+        f"db-slowest;dur={stats.slowest_seconds * 1000:.3f}, "
+        f"app;dur={total_seconds * 1000:.3f}"
+    )
+
+
+class SqlInstrumentationMiddleware:
+    def __init__(self, app: ASGIApp, n_plus_one_threshold: int | None = None, server_timing: bool = False):
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestSqlStats()
+        token = current_sql_stats.set(stats)
+        start = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if self.server_timing and message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", server_timing(stats, time.perf_counter() - start))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_sql_stats.reset(token)
+            route = route_template(scope)
+            record_route(route, stats)
+            if self.n_plus_one_threshold is not None:
+                for statement, count in stats.repeated_shapes(self.n_plus_one_threshold):
+                    logger.warning(
+                        "Possible N+1 in %s %s: statement ran %d times: %s",
+                        scope.get("method"), route, count, statement[:300],
+                    )
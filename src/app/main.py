@@ -1,10 +1,82 @@
+import asyncio
+import logging
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from starlette.concurrency import run_in_threadpool
 
-from app.routers import auth, workouts, exercises, stats
+from app.routers import auth, workouts, exercises, stats, export, admin, jobs
+from app.compression import CompressionMiddleware
+from app.instrumentation import SqlInstrumentationMiddleware, route_sql_stats
+from app.metrics import MetricsMiddleware, pool_samples, registry
+from app.responses import FastJSONResponse
 from app.utils.errors import add_error_handlers
-from app.dependencies.db import init_db
+from app.dependencies.auth import principal_cache
+from app.dependencies.db import engine, get_writer_session_factory, init_db
 from app.settings import settings
+from services.auth import password_hasher
+from services.jobs import recover_jobs, runner as job_runner
+from services.sketches import sketches
+
+
+logger = logging.getLogger(__name__)
+
+
+@registry.collector
+def _runtime_metrics():
+    for key, value in pool_samples(engine.pool).items():
+        yield f"db_pool_{key}", "gauge", f"DB connection pool {key.replace('_', ' ')}", [({}, value)]
+    routes = route_sql_stats()
+    yield "db_queries_total", "counter", "SQL statements by route template", [
+        ({"route": r}, s["queries"]) for r, s in routes.items()
+    ]
+    yield "db_query_seconds_total", "counter", "DB time by route template", [
+        ({"route": r}, s["db_ms_total"] / 1000) for r, s in routes.items()
+    ]
+    cache = principal_cache.stats()
+    yield "principal_cache_hits_total", "counter", "Verified-principal cache hits", [({}, cache["hits"])]
+    yield "principal_cache_misses_total", "counter", "Verified-principal cache misses", [({}, cache["misses"])]
+    hasher = password_hasher.stats()
+    yield "password_hash_queue_depth", "gauge", "Password hashes waiting for a worker", [
+        ({}, hasher["queue_depth"])
+    ]
+    yield "password_hash_rejected_total", "counter", "Password hashes shed by admission control", [
+        ({}, hasher["rejected"])
+    ]
+
+
+async def flush_sketches() -> int:
+    """Persist this worker's pending quantile-sketch deltas (see services.sketches)."""
+    factory = get_writer_session_factory()
+    if isinstance(factory, async_sessionmaker):
+        async with factory() as db:
+            return await db.run_sync(sketches.flush)
+    with factory() as db:
+        return await run_in_threadpool(sketches.flush, db)
+
+
+async def _flush_sketches_periodically(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await flush_sketches()
+        except Exception:
+            logger.exception("Quantile sketch flush failed; deltas kept for the next attempt")
+
+
+async def resume_jobs() -> None:
+    """Fail or adopt jobs left behind by exited processes and submit the adopted ones."""
+    factory = get_writer_session_factory()
+    if isinstance(factory, async_sessionmaker):
+        async with factory() as db:
+            adopted = await db.run_sync(recover_jobs)
+    else:
+        with factory() as db:
+            adopted = await run_in_threadpool(recover_jobs, db)
+    for job_id in adopted:
+        job_runner.submit(job_id, factory)
 
 
 def create_app() -> FastAPI:
@@ -12,6 +84,7 @@ def create_app() -> FastAPI:
         title="Workout Log API",
         version="0.1.0",
         docs_url="/docs",
+        default_response_class=FastJSONResponse,
         description=(
             "Secure workout logging API with JWT auth, user-scoped CRUD, and stats.\n\n"
             "Authorization: First POST to /auth/login with email/password to obtain tokens.\n"
@@ -30,6 +103,8 @@ def create_app() -> FastAPI:
             {"name": "workouts", "description": "Manage workouts and their sets (user-scoped)"},
             {"name": "exercises", "description": "Manage personal exercises (user-scoped)"},
             {"name": "stats", "description": "Aggregated statistics for the current user"},
+            {"name": "export", "description": "Streaming export of the current user's full history"},
+            {"name": "admin", "description": "Operational introspection (admin only)"},
         ],
         servers=[
             {"url": "/", "description": "Current environment"},
@@ -44,21 +119,62 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    app.add_middleware(
+        SqlInstrumentationMiddleware,
+        n_plus_one_threshold=settings.sql_n_plus_one_threshold if settings.sql_debug else None,
+        server_timing=settings.sql_debug,
+    )
+    if settings.compression_enabled:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.compression_minimum_size,
+            gzip_level=settings.compression_gzip_level,
+            zstd_level=settings.compression_zstd_level,
+        )
+    if settings.metrics_enabled:
+        app.add_middleware(MetricsMiddleware)
+
+        @app.get("/metrics", include_in_schema=False)
+        async def metrics() -> PlainTextResponse:
+            return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
     add_error_handlers(app)
 
     app.include_router(auth.router, prefix="/auth", tags=["auth"])
     app.include_router(workouts.router, prefix="/api/v1", tags=["workouts"])
     app.include_router(exercises.router, prefix="/api/v1", tags=["exercises"])
     app.include_router(stats.router, prefix="/api/v1", tags=["stats"])
+    app.include_router(export.router, prefix="/api/v1", tags=["export"])
+    app.include_router(admin.router, prefix="/api/v1", tags=["admin"])
+    app.include_router(jobs.router, prefix="/api/v1", tags=["jobs"])
+
+    sketch_flusher: asyncio.Task | None = None
 
     @app.on_event("startup")
     async def on_startup() -> None:
-        init_db()
+        nonlocal sketch_flusher
+        await init_db()
+        await resume_jobs()
+        if settings.quantile_sketches_enabled:
+            sketch_flusher = asyncio.create_task(
+                _flush_sketches_periodically(settings.quantile_sketch_flush_seconds)
+            )
         try:
             print(f"✅ JWT: {settings.jwt_algorithm}, secret len={len(settings.jwt_secret)}")
         except Exception:
             pass
 
+    @app.on_event("shutdown")
+    async def on_shutdown() -> None:
+        password_hasher.shutdown()
+        job_runner.shutdown()
+        if sketch_flusher is not None:
+            sketch_flusher.cancel()
+            try:
+                await flush_sketches()
+            except Exception:
+                logger.exception("Final quantile sketch flush failed; unflushed deltas are lost")
+
     return app
 
 
@@ -0,0 +1,255 @@
+"""Prometheus text-format metrics with lock-cheap recording.
+
+Every metric keeps one shard per recording thread (a plain list reached through threading.local),
+so `inc`/`observe` on the hot path are a bisect and two list updates with no lock. The lock is
+only taken when a thread records its first value and when a scrape merges the shards.
+"""
+import threading
+import time
+from bisect import bisect_left
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.instrumentation import route_template
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+POOL_WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+
+class _Sharded:
+    def __init__(self, width: int):
+        self._width = width
+        self._local = threading.local()
+        self._shards: list[list] = []
+        self._lock = threading.Lock()
+
+    def _shard(self) -> list:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = [0] * self._width
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def _merged(self) -> list:
+        totals = [0] * self._width
+        with self._lock:
+            for shard in self._shards:
+                for i, v in enumerate(shard):
+                    totals[i] += v
+        return totals
+
+
+class Counter(_Sharded):
+    def __init__(self):
+        super().__init__(1)
+
+    def inc(self, amount: float = 1) -> None:
+        self._shard()[0] += amount
+
+    @property
+    def value(self) -> float:
+        return self._merged()[0]
+
+
+class Gauge(Counter):
+    def dec(self, amount: float = 1) -> None:
+        self._shard()[0] -= amount
+
+
+class Histogram(_Sharded):
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        # one slot per bucket, one for +Inf, then the running sum
+        super().__init__(len(self.buckets) + 2)
+
+    def observe(self, value: float) -> None:
+        shard = self._shard()
+        shard[bisect_left(self.buckets, value)] += 1
+        shard[-1] += value
+
+    def snapshot(self) -> tuple[list[int], int, float]:
+        """Cumulative bucket counts, total count and sum."""
+        merged = self._merged()
+        cumulative, running = [], 0
+        for c in merged[:-1]:
+            running += c
+            cumulative.append(running)
+        return cumulative, running, merged[-1]
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-th quantile (None when empty)."""
+        cumulative, count, _ = self.snapshot()
+        if not count:
+            return None
+        rank = q * count
+        for bound, c in zip(self.buckets + (float("inf"),), cumulative):
+            if c >= rank:
+                return bound
+        return float("inf")
+
+
+class Family:
+    """A metric name with label names; `labels(...)` returns the child for one label set."""
+
+    def __init__(self, name: str, kind: str, help: str, labelnames: tuple = (), factory=Counter):
+        self.name = name
+        self.kind = kind
+        self.help = help
+        self.labelnames = labelnames
+        self._factory = factory
+        self._children: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._factory())
+        return child
+
+    def children(self) -> list[tuple[tuple, object]]:
+        with self._lock:
+            return list(self._children.items())
+
+
+class Registry:
+    def __init__(self):
+        self._families: list[Family] = []
+        self._collectors: list = []
+
+    def counter(self, name: str, help: str, labelnames: tuple = ()) -> Family:
+        return self._add(Family(name, "counter", help, labelnames, Counter))
+
+    def gauge(self, name: str, help: str, labelnames: tuple = ()) -> Family:
+        return self._add(Family(name, "gauge", help, labelnames, Gauge))
+
+    def histogram(self, name: str, help: str, labelnames: tuple = (), buckets=DEFAULT_BUCKETS) -> Family:
+        return self._add(Family(name, "histogram", help, labelnames, lambda: Histogram(buckets)))
+
+    def collector(self, fn):
+        """Register `fn() -> iterable of (name, kind, help, [(labels_dict, value), ...])` run at scrape."""
+        self._collectors.append(fn)
+        return fn
+
+    def _add(self, family: Family) -> Family:
+        self._families.append(family)
+        return family
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for family in self._families:
+            lines.append(f"# HELP {family.name} {family.help}")
+            lines.append(f"# TYPE {family.name} {family.kind}")
+            for values, child in family.children():
+                labels = dict(zip(family.labelnames, values))
+                if family.kind == "histogram":
+                    cumulative, count, total = child.snapshot()
+                    for bound, c in zip(child.buckets + (float("inf"),), cumulative):
+                        le = "+Inf" if bound == float("inf") else repr(bound)
+                        lines.append(f"{family.name}_bucket{_labels({**labels, 'le': le})} {c}")
+                    lines.append(f"{family.name}_count{_labels(labels)} {count}")
+                    lines.append(f"{family.name}_sum{_labels(labels)} {total}")
+                else:
+                    lines.append(f"{family.name}{_labels(labels)} {child.value}")
+        for collect in self._collectors:
+            for name, kind, help, samples in collect():
+                lines.append(f"# HELP {name} {help}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in samples:
+                    lines.append(f"{name}{_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+registry = Registry()
+
+http_requests_total = registry.counter(
+    "http_requests_total", "HTTP requests by route template and status", ("method", "route", "status")
+)
+http_request_duration_seconds = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route")
+)
+http_requests_in_flight = registry.gauge("http_requests_in_flight", "HTTP requests currently being served")
+db_pool_checkout_wait_seconds = registry.histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled DB connection", buckets=POOL_WAIT_BUCKETS
+)
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        in_flight = http_requests_in_flight.labels()
+        in_flight.inc()
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_flight.dec()
+            method = scope.get("method", "")
+            route = route_template(scope)
+            http_request_duration_seconds.labels(method, route).observe(time.perf_counter() - start)
+            http_requests_total.labels(method, route, str(status)).inc()
+
+
+class TimedCheckoutMixin:
+    """Pool mixin recording how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            db_pool_checkout_wait_seconds.labels().observe(time.perf_counter() - start)
+
+
+_timed_pool_classes: dict[type, type] = {}
+
+
+def timed_pool_class(pool_cls: type) -> type:
+    cls = _timed_pool_classes.get(pool_cls)
+    if cls is None:
+        cls = _timed_pool_classes[pool_cls] = type(f"Timed{pool_cls.__name__}", (TimedCheckoutMixin, pool_cls), {})
+    return cls
+
+
+def pool_samples(pool) -> dict[str, float]:
+    """Checked-out/idle/overflow counts and saturation for pools that track them (QueuePool family)."""
+    if not hasattr(pool, "checkedout") or not hasattr(pool, "size"):
+        return {}
+    size = pool.size()
+    checked_out = pool.checkedout()
+    overflow = max(pool.overflow(), 0)
+    max_overflow = getattr(pool, "_max_overflow", 0)
+    capacity = size + max_overflow if max_overflow >= 0 else None
+    return {
+        "size": size,
+        "checked_out": checked_out,
+        "idle": pool.checkedin(),
+        "overflow": overflow,
+        "saturation": checked_out / capacity if capacity else 0.0,
+    }
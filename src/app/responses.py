@@ -0,0 +1,24 @@
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+
+class FastJSONResponse(JSONResponse):
+    """App-wide default JSON response rendered with orjson."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+def model_response(model: BaseModel, response: Response | None = None) -> Response:
+    """Serialize an already-validated model straight to JSON bytes.
+
+    Returning a Response skips the second validation FastAPI would run through `response_model`;
+    headers set on the injected `response` (e.g. ETag) are carried over.
+    """
+    return Response(
+        model.__pydantic_serializer__.to_json(model),
+        media_type="application/json",
+        headers=response.headers if response is not None else None,
+    )
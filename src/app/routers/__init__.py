@@ -1,5 +1,5 @@
-from . import auth, workouts, exercises, stats
+from . import auth, workouts, exercises, stats, export, admin, jobs
 
-__all__ = ["auth", "workouts", "exercises", "stats"]
+__all__ = ["auth", "workouts", "exercises", "stats", "export", "admin", "jobs"]
 
 
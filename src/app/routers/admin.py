@@ -0,0 +1,75 @@
+from typing import List, Literal
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.dependencies.auth import require_admin
+from app.dependencies.db import engine, get_db, replicas, run_db
+from app.instrumentation import route_sql_stats
+from app.metrics import db_pool_checkout_wait_seconds, pool_samples
+from app.settings import settings
+from domain.exceptions import BadRequest
+from services.sketches import RELATIVE_ACCURACY, sketches
+
+
+router = APIRouter(prefix="/admin")
+
+
+@router.get("/sql-stats")
+async def sql_stats(admin=Depends(require_admin)):
+    """Per-route-template query counts and DB time since process start."""
+    return route_sql_stats()
+
+
+@router.get("/pool")
+async def pool_stats(admin=Depends(require_admin)):
+    """Live connection-pool occupancy, configured limits and checkout wait percentiles."""
+    waits = db_pool_checkout_wait_seconds.labels()
+    _, checkouts, wait_total = waits.snapshot()
+    return {
+        "pool_class": type(engine.pool).__name__,
+        "config": {
+            "pool_size": settings.db_pool_size,
+            "max_overflow": settings.db_max_overflow,
+            "pool_timeout_seconds": settings.db_pool_timeout_seconds,
+            "pool_recycle_seconds": settings.db_pool_recycle_seconds,
+        },
+        **pool_samples(engine.pool),
+        "checkouts": checkouts,
+        # bucket upper bounds, so these read as "at most"
+        "checkout_wait_seconds": {
+            "p50": waits.quantile(0.5),
+            "p95": waits.quantile(0.95),
+            "p99": waits.quantile(0.99),
+            "mean": wait_total / checkouts if checkouts else None,
+        },
+        "replicas": replicas.stats() if replicas is not None else [],
+    }
+
+
+@router.get("/percentiles")
+async def percentiles(
+    exercise: str = Query(..., min_length=1, description="Exercise name (case and spacing are ignored)"),
+    metric: Literal["weight_kg", "reps", "session_volume_kg"] = Query("session_volume_kg"),
+    q: List[float] = Query([0.5, 0.9, 0.99], description="Quantiles to estimate, each in [0, 1]"),
+    value: float | None = Query(None, ge=0, description="Also rank this value in the population"),
+    db: Session = Depends(get_db),
+    admin=Depends(require_admin),
+):
+    """Population quantiles of one metric across every user's sets of an exercise.
+
+    Answered from a quantile sketch: each returned value is within `relative_accuracy` (1%) of
+    the exact quantile, and `rank` is exact up to the 1%-wide bucket holding `value`. Sketches
+    include the writes every worker flushed in the last QUANTILE_SKETCH_FLUSH_SECONDS or so.
+    """
+    if not all(0 <= p <= 1 for p in q):
+        raise BadRequest("Quantiles must be between 0 and 1")
+    sketch = await run_db(db, sketches.get, exercise, metric)
+    return {
+        "exercise": exercise,
+        "metric": metric,
+        "count": sketch.count,
+        "relative_accuracy": RELATIVE_ACCURACY,
+        "quantiles": {str(p): sketch.quantile(p) for p in q},
+        "rank": sketch.rank(value) if value is not None else None,
+    }
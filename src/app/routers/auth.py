@@ -2,37 +2,35 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 from starlette.status import HTTP_201_CREATED
 
-from app.dependencies.db import get_db
-from services.auth import hash_password, verify_password
+from app.dependencies.db import end_transaction, get_db, run_db
+from services.auth import create_user, get_user_by_email, password_hasher
 from app.security import create_access_token, create_refresh_token, decode_token
 from domain.schemas import UserCreate, TokenPair, UserRead
 from domain.exceptions import BadRequest, Unauthorized
-from adapters.sqlalchemy.models import User
 
 
 router = APIRouter()
 
 
 @router.post("/register", response_model=UserRead, status_code=HTTP_201_CREATED)
-def register(payload: UserCreate, db: Session = Depends(get_db)):
-    existing = db.query(User).filter(User.email == payload.email).first()
+async def register(payload: UserCreate, db: Session = Depends(get_db)):
+    existing = await run_db(db, get_user_by_email, payload.email)
     if existing:
         raise BadRequest("Email already registered")
-    user = User(email=payload.email, hashed_password=hash_password(payload.password), role="user")
-    db.add(user)
-    db.flush()
-    db.commit()
-    db.refresh(user)
-    return user
+    await end_transaction(db)
+    hashed = await password_hasher.hash(payload.password)
+    return await run_db(db, create_user, payload.email, hashed)
 
 
 @router.post("/login", response_model=TokenPair)
-def login(payload: UserCreate, db: Session = Depends(get_db)):
-    user: User | None = db.query(User).filter(User.email == payload.email).first()
-    if not user or not verify_password(payload.password, user.hashed_password):
+async def login(payload: UserCreate, db: Session = Depends(get_db)):
+    user = await run_db(db, get_user_by_email, payload.email)
+    user_id, hashed = (user.id, user.hashed_password) if user else (None, None)
+    await end_transaction(db)
+    if hashed is None or not await password_hasher.verify(payload.password, hashed):
         raise Unauthorized("Invalid credentials")
-    access = create_access_token(str(user.id))
-    refresh = create_refresh_token(str(user.id))
+    access = create_access_token(str(user_id))
+    refresh = create_refresh_token(str(user_id))
     return TokenPair(access_token=access, refresh_token=refresh)
 
 
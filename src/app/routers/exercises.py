@@ -1,63 +1,70 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.orm import Session
 from starlette.status import HTTP_201_CREATED, HTTP_204_NO_CONTENT
 
-from app.dependencies.db import get_db
+from app.dependencies.db import get_db, run_db
 from app.dependencies.auth import get_current_user, require_admin
+from app.dependencies.etag import not_modified
+from app.responses import model_response
 from domain.schemas import ExerciseCreate, ExerciseRead, PaginatedResponse
-from services.exercises import create_exercise, get_exercise, update_exercise, delete_exercise
-from adapters.sqlalchemy.models import Exercise
+from services.exercises import (
+    create_exercise,
+    read_exercise,
+    update_exercise,
+    delete_exercise,
+    list_exercises as list_user_exercises,
+    list_all_exercises,
+)
 
 
 router = APIRouter(prefix="/exercises")
 
 
 @router.post("", response_model=ExerciseRead, status_code=HTTP_201_CREATED)
-def create(payload: ExerciseCreate, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    return create_exercise(db, user.id, payload)
+async def create(payload: ExerciseCreate, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    return await run_db(db, create_exercise, user.id, payload)
 
 
 @router.get("/{exercise_id}", response_model=ExerciseRead)
-def read_one(exercise_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    return get_exercise(db, user.id, exercise_id)
+async def read_one(exercise_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    return model_response(await run_db(db, read_exercise, user.id, exercise_id))
 
 
-@router.get("", response_model=PaginatedResponse)
-def list_exercises(
+@router.get("", response_model=PaginatedResponse[ExerciseRead])
+async def list_exercises(
+    request: Request,
+    response: Response,
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    include_total: bool = Query(False, description="Also count all matches (an extra COUNT query)"),
     db: Session = Depends(get_db),
     user=Depends(get_current_user),
 ):
-    q = db.query(Exercise).filter(Exercise.user_id == user.id)
-    total = q.count()
-    orm_items = q.order_by(Exercise.name.asc()).offset(offset).limit(limit).all()
-    items = [ExerciseRead.model_validate(i) for i in orm_items]
-    return {"items": items, "limit": limit, "offset": offset, "total": total}
+    if cached := await not_modified(request, response, db, user.id):
+        return cached
+    page = await run_db(db, list_user_exercises, user.id, limit, offset, cursor, include_total)
+    return model_response(page, response)
 
 
 @router.patch("/{exercise_id}", response_model=ExerciseRead)
-def update(exercise_id: int, payload: ExerciseCreate, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    return update_exercise(db, user.id, exercise_id, payload)
+async def update(exercise_id: int, payload: ExerciseCreate, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    return await run_db(db, update_exercise, user.id, exercise_id, payload)
 
 
 @router.delete("/{exercise_id}", status_code=HTTP_204_NO_CONTENT)
-def delete(exercise_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    delete_exercise(db, user.id, exercise_id)
+async def delete(exercise_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    await run_db(db, delete_exercise, user.id, exercise_id)
     return None
 
 
-@router.get("/admin/all", response_model=PaginatedResponse)
-def admin_list_all(
+@router.get("/admin/all", response_model=PaginatedResponse[ExerciseRead])
+async def admin_list_all(
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    include_total: bool = Query(False, description="Also count all matches (an extra COUNT query)"),
     db: Session = Depends(get_db),
     admin=Depends(require_admin),
 ):
-    q = db.query(Exercise)
-    total = q.count()
-    orm_items = q.order_by(Exercise.id.desc()).offset(offset).limit(limit).all()
-    items = [ExerciseRead.model_validate(i) for i in orm_items]
-    return {"items": items, "limit": limit, "offset": offset, "total": total}
-
-
+    return model_response(await run_db(db, list_all_exercises, limit, offset, cursor, include_total))
@@ -0,0 +1,41 @@
+from typing import AsyncIterator, Iterator, Literal
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.dependencies.auth import get_current_user
+from app.dependencies.db import get_session_factory
+from services.export import MEDIA_TYPES, aiter_export, iter_export
+
+
+router = APIRouter(prefix="/export")
+
+
+def _stream(factory, user_id: int, fmt: str) -> Iterator[bytes]:
+    with factory() as db:
+        yield from iter_export(db, user_id, fmt)
+
+
+async def _astream(factory, user_id: int, fmt: str) -> AsyncIterator[bytes]:
+    async with factory() as db:
+        async for chunk in aiter_export(db, user_id, fmt):
+            yield chunk
+
+
+@router.get("")
+async def export_history(
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    session_factory=Depends(get_session_factory),
+    user=Depends(get_current_user),
+):
+    """Stream the caller's full workout history (with sets) as NDJSON or CSV.
+
+    Compression is negotiated by CompressionMiddleware, which encodes the stream chunk by chunk.
+    """
+    headers = {"Content-Disposition": f'attachment; filename="workouts.{fmt}"'}
+    if isinstance(session_factory, async_sessionmaker):
+        body = _astream(session_factory, user.id, fmt)
+    else:
+        body = _stream(session_factory, user.id, fmt)
+    return StreamingResponse(body, media_type=MEDIA_TYPES[fmt], headers=headers)
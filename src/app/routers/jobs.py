@@ -0,0 +1,64 @@
+import os
+
+from fastapi import APIRouter, Depends, Request, Response
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+
+from adapters.sqlalchemy.models import Job
+from app.dependencies.auth import get_current_user
+from app.dependencies.db import get_db, get_writer_session_factory, run_db
+from domain.exceptions import Conflict, Forbidden, NotFound
+from domain.schemas import JobCreate, JobRead
+from services.jobs import JOB_KINDS, RUNNING, SUCCEEDED, create_job, get_job, runner
+
+
+router = APIRouter(prefix="/jobs")
+
+
+def _job_read(request: Request, job: Job) -> JobRead:
+    read = JobRead.model_validate(job)
+    live = runner.progress(job.id) if job.status == RUNNING else None
+    if live is not None:
+        read.progress_done, read.progress_total = live
+    if job.result_path is not None:
+        read.result_url = str(request.url_for("download_job_result", job_id=job.id))
+    return read
+
+
+@router.post("", response_model=JobRead, status_code=202)
+async def submit_job(
+    payload: JobCreate,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    session_factory=Depends(get_writer_session_factory),
+    user=Depends(get_current_user),
+):
+    """Queue a long-running job (export, analytics report, recompute or backfill).
+
+    Poll the job's URL (also in `Location`) for status and progress; once it has succeeded,
+    `result_url` downloads what it produced.
+    """
+    if JOB_KINDS[payload.kind].admin_only and user.role != "admin":
+        raise Forbidden("Admin access required")
+    job = await run_db(db, create_job, user.id, payload.kind, payload.params)
+    runner.submit(job.id, session_factory)
+    response.headers["Location"] = str(request.url_for("read_job", job_id=job.id))
+    return _job_read(request, job)
+
+
+@router.get("/{job_id}", response_model=JobRead)
+async def read_job(job_id: int, request: Request, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    job = await run_db(db, get_job, user.id, job_id)
+    return _job_read(request, job)
+
+
+@router.get("/{job_id}/result")
+async def download_job_result(job_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    """The file a succeeded job produced."""
+    job = await run_db(db, get_job, user.id, job_id)
+    if job.status != SUCCEEDED:
+        raise Conflict(f"Job is {job.status}; its result is available once it has succeeded")
+    if job.result_path is None or not os.path.exists(job.result_path):
+        raise NotFound("Job has no result to download")
+    return FileResponse(job.result_path, media_type=job.result_media_type, filename=job.result_name)
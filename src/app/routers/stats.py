@@ -1,9 +1,18 @@
-from fastapi import APIRouter, Depends
+from datetime import date
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.orm import Session
 
-from app.dependencies.db import get_db
+from app.dependencies.db import get_db, run_db
 from app.dependencies.auth import get_current_user
-from domain.schemas import StatsRead
+from app.dependencies.etag import not_modified
+from app.responses import FastJSONResponse, model_response
+from domain.exceptions import BadRequest
+from domain.schemas import ExerciseProgression, PersonalRecords, StatsRead, VolumeTimeseries
+from services.progression import exercise_progression
+from services.records import list_records
+from services.rollups import volume_timeseries
 from services.stats import get_user_stats
 
 
@@ -11,7 +20,64 @@ router = APIRouter(prefix="/stats")
 
 
 @router.get("", response_model=StatsRead)
-def read_stats(db: Session = Depends(get_db), user=Depends(get_current_user)):
-    return get_user_stats(db, user.id)
+async def read_stats(
+    request: Request, response: Response, db: Session = Depends(get_db), user=Depends(get_current_user)
+):
+    if cached := await not_modified(request, response, db, user.id):
+        return cached
+    return await run_db(db, get_user_stats, user.id)
+
+
+@router.get("/exercises/{exercise_id}/progression", response_model=ExerciseProgression)
+async def read_progression(
+    exercise_id: int,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Volume, estimated 1RM (Epley/Brzycki), running PRs and trends per session of one exercise."""
+    if cached := await not_modified(request, response, db, user.id):
+        return cached
+    series = await run_db(db, exercise_progression, user.id, exercise_id)
+    # The series are NumPy arrays, which orjson writes natively; skip per-element validation
+    return FastJSONResponse(series, headers=response.headers)
+
+
+@router.get("/timeseries", response_model=VolumeTimeseries)
+async def read_timeseries(
+    request: Request,
+    response: Response,
+    granularity: Literal["day", "week", "month"] = Query("week"),
+    start: date | None = Query(None, alias="from", description="First day to cover (inclusive)"),
+    end: date | None = Query(None, alias="to", description="Last day to cover (inclusive)"),
+    exercise_id: int | None = Query(None, description="Only this exercise"),
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Per-exercise sets, reps, volume and workout frequency per day, ISO week or month.
+
+    Reads precomputed rollups only; buckets partially covered by the range are included whole.
+    """
+    if start is not None and end is not None and start > end:
+        raise BadRequest("'from' must not be after 'to'")
+    if cached := await not_modified(request, response, db, user.id):
+        return cached
+    rows = await run_db(db, volume_timeseries, user.id, granularity, start, end, exercise_id)
+    series = VolumeTimeseries(granularity=granularity, start=start, end=end, points=rows)
+    return model_response(series, response)
 
 
+@router.get("/records", response_model=PersonalRecords)
+async def read_records(
+    request: Request,
+    response: Response,
+    exercise_id: int | None = Query(None, description="Only this exercise"),
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """Personal records: heaviest weight, most reps at each load and best workout volume per exercise."""
+    if cached := await not_modified(request, response, db, user.id):
+        return cached
+    rows = await run_db(db, list_records, user.id, exercise_id)
+    return model_response(PersonalRecords(records=rows), response)
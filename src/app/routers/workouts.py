@@ -1,64 +1,155 @@
-from fastapi import APIRouter, Depends, Query
+import json
+from typing import AsyncIterator, Literal, Union
+
+from fastapi import APIRouter, Depends, Query, Request, Response
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
 from starlette.status import HTTP_201_CREATED, HTTP_204_NO_CONTENT
 
-from app.dependencies.db import get_db
+from app.dependencies.db import end_transaction, get_db, run_db
 from app.dependencies.auth import get_current_user, require_admin
-from domain.schemas import WorkoutCreate, WorkoutRead, WorkoutUpdate, PaginatedResponse
-from services.workouts import create_workout, get_workout, update_workout, delete_workout
-from adapters.sqlalchemy.models import Workout
+from app.dependencies.etag import not_modified
+from app.responses import model_response
+from app.settings import settings
+from domain.exceptions import BadRequest
+from domain.schemas import (
+    BulkImportResult, WorkoutCreate, WorkoutCreated, WorkoutRead, WorkoutSummaryRead, WorkoutUpdate, PaginatedResponse,
+)
+from services.workouts import (
+    create_workout,
+    import_workouts,
+    read_workout,
+    update_workout,
+    delete_workout,
+    list_workouts as list_user_workouts,
+    list_workout_summaries,
+    list_all_workouts,
+)
 
 
 router = APIRouter(prefix="/workouts")
 
 
-@router.post("", response_model=WorkoutRead, status_code=HTTP_201_CREATED)
-def create(payload: WorkoutCreate, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    w = create_workout(db, user.id, payload)
+@router.post("", response_model=WorkoutCreated, status_code=HTTP_201_CREATED)
+async def create(payload: WorkoutCreate, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    """Create a workout. `new_records` lists the personal records it set, with the values beaten."""
+    w = await run_db(db, create_workout, user.id, payload)
     return w
 
 
+async def _iter_bulk_items(request: Request) -> AsyncIterator[tuple[int, WorkoutCreate | list]]:
+    """Yield (index, WorkoutCreate) or (index, validation errors) from an NDJSON stream or JSON array."""
+    if request.headers.get("content-type", "").startswith(("application/x-ndjson", "application/jsonl")):
+        index = 0
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if line.strip():
+                    yield index, _parse_item(WorkoutCreate.model_validate_json, line)
+                    index += 1
+        if buffer.strip():
+            yield index, _parse_item(WorkoutCreate.model_validate_json, buffer)
+        return
+    try:
+        payload = json.loads(await request.body())
+    except ValueError:
+        raise BadRequest("Body must be a JSON array or NDJSON")
+    if not isinstance(payload, list):
+        raise BadRequest("Body must be a JSON array or NDJSON")
+    if len(payload) > settings.bulk_import_max_items:
+        raise BadRequest(f"At most {settings.bulk_import_max_items} workouts per request")
+    for index, raw in enumerate(payload):
+        yield index, _parse_item(WorkoutCreate.model_validate, raw)
+
+
+def _parse_item(validate, raw) -> WorkoutCreate | list:
+    try:
+        return validate(raw)
+    except ValidationError as e:
+        return json.loads(e.json(include_url=False))
+
+
+async def _import_chunk(db: Session, user_id: int, chunk: list, owned_exercises: set[int]) -> list[dict]:
+    results = await run_db(db, import_workouts, user_id, chunk, owned_exercises)
+    await end_transaction(db)  # the chunk committed; release the writer lane until the next one
+    return results
+
+
+@router.post("/bulk", response_model=BulkImportResult)
+async def bulk_import(request: Request, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    """Import many workouts from a JSON array or an NDJSON stream of WorkoutCreate objects.
+
+    Valid items are inserted in chunks, each chunk in its own transaction; the response reports
+    the outcome of every item by its position in the input.
+    """
+    results: list[dict] = []
+    owned_exercises: set[int] = set()
+    chunk: list[tuple[int, WorkoutCreate]] = []
+    await end_transaction(db)  # don't keep other writers out while the body streams in
+    async for index, item in _iter_bulk_items(request):
+        if index >= settings.bulk_import_max_items:
+            results.append({"index": index, "status": "error", "errors": [
+                {"msg": f"Item limit of {settings.bulk_import_max_items} exceeded; remaining input ignored"}
+            ]})
+            break
+        if isinstance(item, list):
+            results.append({"index": index, "status": "error", "errors": item})
+            continue
+        chunk.append((index, item))
+        if len(chunk) >= settings.bulk_import_chunk_size:
+            results += await _import_chunk(db, user.id, chunk, owned_exercises)
+            chunk = []
+    if chunk:
+        results += await _import_chunk(db, user.id, chunk, owned_exercises)
+    results.sort(key=lambda r: r["index"])
+    created = sum(r["status"] == "created" for r in results)
+    return {"created": created, "failed": len(results) - created, "items": results}
+
+
 @router.get("/{workout_id}", response_model=WorkoutRead)
-def read_one(workout_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    return get_workout(db, user.id, workout_id)
+async def read_one(workout_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    return model_response(await run_db(db, read_workout, user.id, workout_id))
 
 
-@router.get("", response_model=PaginatedResponse)
-def list_workouts(
+@router.get("", response_model=Union[PaginatedResponse[WorkoutRead], PaginatedResponse[WorkoutSummaryRead]])
+async def list_workouts(
+    request: Request,
+    response: Response,
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    include_total: bool = Query(False, description="Also count all matches (an extra COUNT query)"),
+    view: Literal["full", "summary"] = Query("full", description="summary: per-workout totals instead of sets"),
     db: Session = Depends(get_db),
     user=Depends(get_current_user),
 ):
-    q = db.query(Workout).filter(Workout.user_id == user.id)
-    total = q.count()
-    orm_items = q.order_by(Workout.date.desc()).offset(offset).limit(limit).all()
-    items = [WorkoutRead.model_validate(i) for i in orm_items]
-    return {"items": items, "limit": limit, "offset": offset, "total": total}
+    if cached := await not_modified(request, response, db, user.id):
+        return cached
+    list_page = list_workout_summaries if view == "summary" else list_user_workouts
+    page = await run_db(db, list_page, user.id, limit, offset, cursor, include_total)
+    return model_response(page, response)
 
 
-@router.get("/admin/all", response_model=PaginatedResponse)
-def admin_list_all(
+@router.get("/admin/all", response_model=PaginatedResponse[WorkoutRead])
+async def admin_list_all(
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    cursor: str | None = Query(None, description="next_cursor of the previous page"),
+    include_total: bool = Query(False, description="Also count all matches (an extra COUNT query)"),
     db: Session = Depends(get_db),
     admin=Depends(require_admin),
 ):
-    q = db.query(Workout)
-    total = q.count()
-    orm_items = q.order_by(Workout.date.desc()).offset(offset).limit(limit).all()
-    items = [WorkoutRead.model_validate(i) for i in orm_items]
-    return {"items": items, "limit": limit, "offset": offset, "total": total}
+    return model_response(await run_db(db, list_all_workouts, limit, offset, cursor, include_total))
 
 
 @router.patch("/{workout_id}", response_model=WorkoutRead)
-def update(workout_id: int, payload: WorkoutUpdate, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    return update_workout(db, user.id, workout_id, payload)
+async def update(workout_id: int, payload: WorkoutUpdate, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    return await run_db(db, update_workout, user.id, workout_id, payload)
 
 
 @router.delete("/{workout_id}", status_code=HTTP_204_NO_CONTENT)
-def delete(workout_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
-    delete_workout(db, user.id, workout_id)
+async def delete(workout_id: int, db: Session = Depends(get_db), user=Depends(get_current_user)):
+    await run_db(db, delete_workout, user.id, workout_id)
     return None
-
-
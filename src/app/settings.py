@@ -1,5 +1,5 @@
 from functools import lru_cache
-from typing import List
+from typing import List, Literal
 import secrets
 
 from pydantic import Field, AliasChoices
@@ -9,6 +9,13 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     app_env: str = Field(default="development")
     database_url: str = Field(default="sqlite:///./workout.db")
+    database_replica_urls: List[str] = Field(default_factory=list)
+    replica_eject_seconds: float = Field(default=30.0)
+    replica_read_your_writes_seconds: float = Field(default=5.0, ge=0)
+    db_pool_size: int = Field(default=5, ge=1)
+    db_max_overflow: int = Field(default=10, ge=-1)
+    db_pool_timeout_seconds: float = Field(default=30.0, gt=0)
+    db_pool_recycle_seconds: int = Field(default=1800, ge=-1)
     jwt_secret: str = Field(
         default_factory=lambda: secrets.token_urlsafe(32),
         validation_alias=AliasChoices("SECRET_KEY", "JWT_SECRET"),
@@ -26,6 +33,31 @@ class Settings(BaseSettings):
         validation_alias=AliasChoices("REFRESH_TOKEN_EXPIRE_DAYS", "REFRESH_TOKEN_EXP_DAYS"),
     )
     cors_allow_origins: List[str] = Field(default_factory=lambda: ["*"])
+    principal_cache_size: int = Field(default=10_000)
+    principal_cache_ttl_seconds: int = Field(default=300)
+    password_hash_executor: Literal["thread", "process"] = Field(default="thread")
+    password_hash_workers: int = Field(default=2)
+    password_hash_max_queue: int = Field(default=32)
+    bulk_import_max_items: int = Field(default=10_000)
+    bulk_import_chunk_size: int = Field(default=500)
+    sql_debug: bool = Field(default=False)
+    sql_n_plus_one_threshold: int = Field(default=10)
+    metrics_enabled: bool = Field(default=True)
+    sqlite_profile: Literal["default", "wal"] = Field(default="default")
+    sqlite_busy_timeout_ms: int = Field(default=5000)
+    sqlite_mmap_size: int = Field(default=256 * 1024 * 1024)
+    sqlite_cache_size_kib: int = Field(default=64 * 1024)
+    quantile_sketches_enabled: bool = Field(default=True)
+    quantile_sketch_flush_seconds: float = Field(default=30.0, gt=0)
+    job_executor: Literal["thread", "process"] = Field(default="thread")
+    job_workers: int = Field(default=2, ge=1)
+    job_max_active_per_user: int = Field(default=2, ge=1)
+    job_results_dir: str = Field(default="./job_results")
+    job_retention_days: int = Field(default=7, ge=1)
+    compression_enabled: bool = Field(default=True)
+    compression_minimum_size: int = Field(default=1024)
+    compression_gzip_level: int = Field(default=6, ge=1, le=9)
+    compression_zstd_level: int = Field(default=3, ge=1, le=22)
 
     model_config = {
         "env_file": ".env",
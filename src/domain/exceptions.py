@@ -4,12 +4,26 @@ from starlette.status import (
     HTTP_401_UNAUTHORIZED,
     HTTP_403_FORBIDDEN,
     HTTP_404_NOT_FOUND,
+    HTTP_409_CONFLICT,
+    HTTP_429_TOO_MANY_REQUESTS,
+    HTTP_503_SERVICE_UNAVAILABLE,
 )
 
 
 class AppException(HTTPException):
-    def __init__(self, code: str, message: str, status_code: int, details: dict | None = None):
-        super().__init__(status_code=status_code, detail={"code": code, "message": message, "details": details or {}})
+    def __init__(
+        self,
+        code: str,
+        message: str,
+        status_code: int,
+        details: dict | None = None,
+        headers: dict[str, str] | None = None,
+    ):
+        super().__init__(
+            status_code=status_code,
+            detail={"code": code, "message": message, "details": details or {}},
+            headers=headers,
+        )
 
 
 class Unauthorized(AppException):
@@ -32,3 +46,26 @@ class BadRequest(AppException):
         super().__init__(code="BAD_REQUEST", message=message, status_code=HTTP_400_BAD_REQUEST, details=details)
 
 
+class Conflict(AppException):
+    def __init__(self, message: str = "Conflict"):
+        super().__init__(code="CONFLICT", message=message, status_code=HTTP_409_CONFLICT)
+
+
+class TooManyRequests(AppException):
+    def __init__(self, message: str = "Too Many Requests", retry_after: int = 1):
+        super().__init__(
+            code="TOO_MANY_REQUESTS",
+            message=message,
+            status_code=HTTP_429_TOO_MANY_REQUESTS,
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+class ServiceUnavailable(AppException):
+    def __init__(self, message: str = "Service Unavailable", retry_after: int = 1):
+        super().__init__(
+            code="SERVICE_UNAVAILABLE",
+            message=message,
+            status_code=HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": str(retry_after)},
+        )
@@ -1,5 +1,6 @@
+import datetime
 from datetime import date
-from typing import Literal, Optional, List
+from typing import Generic, Literal, Optional, List, TypeVar
 from pydantic import BaseModel, EmailStr, Field
 from pydantic import field_validator
 from pydantic.config import ConfigDict
@@ -7,6 +8,8 @@ from pydantic.config import ConfigDict
 
 Role = Literal["user", "admin"]
 
+T = TypeVar("T")
+
 
 class UserCreate(BaseModel):
     email: EmailStr
@@ -69,7 +72,8 @@ class WorkoutCreate(BaseModel):
 
 
 class WorkoutUpdate(BaseModel):
-    date: Optional[date] = None
+    # Qualified: inside the class body a bare `date` would resolve to this field's default (None)
+    date: Optional[datetime.date] = None
     note: Optional[str] = Field(default=None, max_length=500)
 
     @field_validator("date")
@@ -90,16 +94,147 @@ class WorkoutRead(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
-class PaginatedResponse(BaseModel):
-    items: list
+RecordKind = Literal["max_weight", "reps_at_weight", "session_volume"]
+
+
+class NewRecord(BaseModel):
+    exercise_id: int
+    kind: RecordKind
+    weight_kg: float | None  # the load, for reps_at_weight
+    value: float
+    previous: float | None
+
+
+class WorkoutCreated(WorkoutRead):
+    new_records: List[NewRecord] = []
+
+
+class PersonalRecordRead(BaseModel):
+    exercise_id: int
+    kind: RecordKind
+    weight_kg: float | None  # the load, for reps_at_weight
+    value: float
+    workout_id: int
+    achieved_on: date
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PersonalRecords(BaseModel):
+    records: List[PersonalRecordRead]
+
+
+class WorkoutSummaryRead(BaseModel):
+    id: int
+    user_id: int
+    date: date
+    note: str | None
+    set_count: int
+    total_reps: int
+    total_volume_kg: float
+    exercise_count: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class BulkItemResult(BaseModel):
+    index: int
+    status: Literal["created", "error"]
+    id: int | None = None
+    errors: list | None = None
+
+
+class BulkImportResult(BaseModel):
+    created: int
+    failed: int
+    items: List[BulkItemResult]
+
+
+class PaginatedResponse(BaseModel, Generic[T]):
+    items: List[T]
     limit: int
     offset: int
-    total: int
+    total: int | None = None
+    next_cursor: str | None = None
 
 
 class StatsRead(BaseModel):
     total_workouts: int
     avg_reps: float | None
     total_sets: int
+    total_volume_kg: float = 0.0
+
+
+
+
+class ExerciseProgression(BaseModel):
+    """Per-session series for one exercise; position i in every list is the i-th session."""
+
+    exercise_id: int
+    sessions: int
+    dates: List[date]
+    workout_ids: List[int]
+    set_count: List[int]
+    volume_kg: List[float]
+    top_weight_kg: List[float]
+    best_e1rm_epley_kg: List[float]
+    best_e1rm_brzycki_kg: List[float | None]
+    rolling_best_e1rm_kg: List[float]
+    is_pr: List[bool]
+    e1rm_trend_kg_per_week: float | None
+    volume_trend_kg_per_week: float | None
+
+
+class RollupPoint(BaseModel):
+    bucket_start: date
+    exercise_id: int
+    set_count: int
+    reps_sum: int
+    volume_kg: float
+    workout_count: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class VolumeTimeseries(BaseModel):
+    granularity: Literal["day", "week", "month"]
+    start: date | None
+    end: date | None
+    points: List[RollupPoint]
 
 
+JobKind = Literal["export", "progression_report", "recompute_records", "backfill_rollups"]
+JobStatus = Literal["queued", "running", "succeeded", "failed"]
+
+
+class JobCreate(BaseModel):
+    kind: JobKind
+    params: dict = Field(default_factory=dict)
+
+
+class ExportJobParams(BaseModel):
+    format: Literal["ndjson", "csv"] = "ndjson"
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class NoJobParams(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+
+
+class JobRead(BaseModel):
+    id: int
+    kind: JobKind
+    params: dict
+    status: JobStatus
+    progress_done: int
+    progress_total: int | None
+    error: str | None
+    result_name: str | None
+    result_size: int | None
+    result_url: str | None = None
+    created_at: datetime.datetime
+    started_at: datetime.datetime | None
+    finished_at: datetime.datetime | None
+
+    model_config = ConfigDict(from_attributes=True)
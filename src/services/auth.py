@@ -1,4 +1,15 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
 from passlib.context import CryptContext
+from sqlalchemy import lambda_stmt, select
+from sqlalchemy.orm import Session
+
+from adapters.sqlalchemy.models import User
+from app.settings import settings
+from domain.exceptions import ServiceUnavailable
 
 
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
@@ -13,3 +24,110 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def _timed(fn, *args):
+    # Runs inside the worker so the measured time excludes queueing
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+class PasswordHasherPool:
+    """Dedicated executor for argon2 work with a bounded admission queue.
+
+    At most `workers + max_queue` calls are in flight; beyond that `run` fails fast with
+    ServiceUnavailable instead of letting hashing requests pile up and starve other endpoints.
+    """
+
+    def __init__(self, workers: int, max_queue: int, kind: str = "thread"):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.kind = kind
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.rejected = 0
+        self.completed = 0
+        self.hash_seconds_total = 0.0
+        self.hash_seconds_max = 0.0
+        self.wait_seconds_total = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pwhash")
+        return self._executor
+
+    async def run(self, fn, *args):
+        with self._lock:
+            if self._in_flight >= self.workers + self.max_queue:
+                self.rejected += 1
+                raise ServiceUnavailable("Authentication is busy, retry shortly")
+            self._in_flight += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result, elapsed = await loop.run_in_executor(self._get_executor(), _timed, fn, *args)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+        total = time.perf_counter() - start
+        with self._lock:
+            self.completed += 1
+            self.hash_seconds_total += elapsed
+            self.hash_seconds_max = max(self.hash_seconds_max, elapsed)
+            self.wait_seconds_total += max(total - elapsed, 0.0)
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self.run(hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.run(verify_password, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        with self._lock:
+            in_flight = self._in_flight
+            completed = self.completed
+            return {
+                "executor": self.kind,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "in_flight": in_flight,
+                "queue_depth": max(in_flight - self.workers, 0),
+                "rejected": self.rejected,
+                "completed": completed,
+                "hash_seconds_avg": self.hash_seconds_total / completed if completed else None,
+                "hash_seconds_max": self.hash_seconds_max,
+                "wait_seconds_avg": self.wait_seconds_total / completed if completed else None,
+            }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasherPool(
+    workers=settings.password_hash_workers,
+    max_queue=settings.password_hash_max_queue,
+    kind=settings.password_hash_executor,
+)
+
+
+def get_user(db: Session, user_id: int) -> User | None:
+    return db.scalars(lambda_stmt(lambda: select(User).where(User.id == user_id))).first()
+
+
+def get_user_by_email(db: Session, email: str) -> User | None:
+    return db.scalars(lambda_stmt(lambda: select(User).where(User.email == email))).first()
+
+
+def create_user(db: Session, email: str, hashed_password: str) -> User:
+    user = User(email=email, hashed_password=hashed_password, role="user")
+    db.add(user)
+    db.flush()
+    db.commit()
+    db.refresh(user)
+    return user
@@ -0,0 +1,45 @@
+from sqlalchemy import lambda_stmt, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from adapters.sqlalchemy.models import UserDataVersion
+
+
+def get_data_version(db: Session, user_id: int) -> int:
+    stmt = lambda_stmt(lambda: select(UserDataVersion.version).where(UserDataVersion.user_id == user_id))
+    return db.scalar(stmt) or 0
+
+
+def bump_data_version(db: Session, user_id: int) -> None:
+    """Mark the user's data as changed inside the caller's transaction."""
+    stmt = (
+        update(UserDataVersion)
+        .where(UserDataVersion.user_id == user_id)
+        .values(version=UserDataVersion.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    if db.execute(stmt).rowcount:
+        return
+    try:
+        with db.begin_nested():
+            db.add(UserDataVersion(user_id=user_id, version=1))
+    except IntegrityError:
+        # A concurrent writer created the row first
+        db.execute(stmt)
+
+
+def bump_data_versions(db: Session, user_ids) -> None:
+    """bump_data_version for every user in `user_ids`, e.g. after a rebuild rewrote their rows."""
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return
+    db.execute(
+        update(UserDataVersion)
+        .where(UserDataVersion.user_id.in_(user_ids))
+        .values(version=UserDataVersion.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    existing = set(db.scalars(select(UserDataVersion.user_id).where(UserDataVersion.user_id.in_(user_ids))))
+    for user_id in user_ids:
+        if user_id not in existing:
+            bump_data_version(db, user_id)
@@ -1,8 +1,15 @@
+from sqlalchemy import lambda_stmt, select
 from sqlalchemy.orm import Session
 
 from adapters.sqlalchemy.models import Exercise
-from domain.schemas import ExerciseCreate
+from domain.schemas import ExerciseCreate, ExerciseRead, PaginatedResponse
 from domain.exceptions import NotFound, Forbidden, BadRequest
+from services.data_version import bump_data_version
+from services.pagination import paginate
+from services.sketches import stage_sketch_rename
+
+
+EXERCISE_COLUMNS = (Exercise.id, Exercise.name, Exercise.user_id)
 
 
 def ensure_owner(entity_user_id: int, current_user_id: int) -> None:
@@ -11,29 +18,47 @@ def ensure_owner(entity_user_id: int, current_user_id: int) -> None:
 
 
 def create_exercise(db: Session, user_id: int, data: ExerciseCreate) -> Exercise:
-    exists = db.query(Exercise).filter(Exercise.user_id == user_id, Exercise.name == data.name).first()
+    name = data.name
+    exists = db.scalars(lambda_stmt(
+        lambda: select(Exercise.id).where(Exercise.user_id == user_id, Exercise.name == name).limit(1)
+    )).first()
     if exists:
         raise BadRequest("Exercise with this name already exists")
     ex = Exercise(user_id=user_id, name=data.name)
     db.add(ex)
     db.flush()
+    bump_data_version(db, user_id)
     db.commit()
     db.refresh(ex)
     return ex
 
 
 def get_exercise(db: Session, user_id: int, exercise_id: int) -> Exercise:
-    ex: Exercise | None = db.query(Exercise).filter(Exercise.id == exercise_id).first()
+    ex: Exercise | None = db.scalars(
+        lambda_stmt(lambda: select(Exercise).where(Exercise.id == exercise_id))
+    ).first()
     if not ex:
         raise NotFound("Exercise not found")
     ensure_owner(ex.user_id, user_id)
     return ex
 
 
+def read_exercise(db: Session, user_id: int, exercise_id: int) -> ExerciseRead:
+    row = db.execute(lambda_stmt(
+        lambda: select(*EXERCISE_COLUMNS).where(Exercise.id == exercise_id)
+    )).first()
+    if row is None:
+        raise NotFound("Exercise not found")
+    ensure_owner(row.user_id, user_id)
+    return ExerciseRead.model_validate(row)
+
+
 def update_exercise(db: Session, user_id: int, exercise_id: int, data: ExerciseCreate) -> Exercise:
     ex = get_exercise(db, user_id, exercise_id)
+    stage_sketch_rename(db, ex.id, ex.name, data.name)
     ex.name = data.name
     db.flush()
+    bump_data_version(db, user_id)
     db.commit()
     db.refresh(ex)
     return ex
@@ -42,6 +67,34 @@ def update_exercise(db: Session, user_id: int, exercise_id: int, data: ExerciseC
 def delete_exercise(db: Session, user_id: int, exercise_id: int) -> None:
     ex = get_exercise(db, user_id, exercise_id)
     db.delete(ex)
+    bump_data_version(db, user_id)
     db.commit()
 
 
+def list_exercises(
+    db: Session,
+    user_id: int,
+    limit: int,
+    offset: int = 0,
+    cursor: str | None = None,
+    include_total: bool = False,
+) -> PaginatedResponse[ExerciseRead]:
+    page = paginate(
+        db, select(*EXERCISE_COLUMNS).where(Exercise.user_id == user_id), [Exercise.name, Exercise.id],
+        descending=False, limit=limit, offset=offset, cursor=cursor, include_total=include_total,
+    )
+    return PaginatedResponse[ExerciseRead].model_validate(page, from_attributes=True)
+
+
+def list_all_exercises(
+    db: Session,
+    limit: int,
+    offset: int = 0,
+    cursor: str | None = None,
+    include_total: bool = False,
+) -> PaginatedResponse[ExerciseRead]:
+    page = paginate(
+        db, select(*EXERCISE_COLUMNS), [Exercise.id], descending=True,
+        limit=limit, offset=offset, cursor=cursor, include_total=include_total,
+    )
+    return PaginatedResponse[ExerciseRead].model_validate(page, from_attributes=True)
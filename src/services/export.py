@@ -0,0 +1,84 @@
+import csv
+import io
+from typing import AsyncIterator, Callable, Iterable, Iterator
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+
+from adapters.sqlalchemy.models import Workout
+from domain.schemas import WorkoutRead
+
+
+EXPORT_CHUNK_SIZE = 500
+
+CSV_COLUMNS = ["workout_id", "date", "note", "set_id", "exercise_id", "reps", "weight_kg"]
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def export_statement(user_id: int, chunk_size: int = EXPORT_CHUNK_SIZE):
+    # yield_per streams from a server-side cursor; sets are selectin-loaded per partition
+    return (
+        select(Workout)
+        .options(selectinload(Workout.sets))
+        .where(Workout.user_id == user_id)
+        .order_by(Workout.date.asc(), Workout.id.asc())
+        .execution_options(yield_per=chunk_size)
+    )
+
+
+def _encode_ndjson(workouts: Iterable[Workout]) -> str:
+    return "".join(WorkoutRead.model_validate(w).model_dump_json() + "\n" for w in workouts)
+
+
+def _encode_csv(workouts: Iterable[Workout]) -> str:
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for w in workouts:
+        if not w.sets:
+            writer.writerow([w.id, w.date.isoformat(), w.note or "", "", "", "", ""])
+        for s in w.sets:
+            writer.writerow([w.id, w.date.isoformat(), w.note or "", s.id, s.exercise_id, s.reps, s.weight_kg])
+    return buf.getvalue()
+
+
+def _csv_header() -> str:
+    buf = io.StringIO()
+    csv.writer(buf).writerow(CSV_COLUMNS)
+    return buf.getvalue()
+
+
+_ENCODERS = {"ndjson": _encode_ndjson, "csv": _encode_csv}
+
+
+def iter_export(
+    db: Session,
+    user_id: int,
+    fmt: str,
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+    on_partition: Callable[[int], None] | None = None,
+) -> Iterator[bytes]:
+    """Yield the user's full history in `fmt`, one encoded chunk per cursor partition.
+
+    `on_partition`, if given, is called with the number of workouts in each partition encoded.
+    """
+    encode = _ENCODERS[fmt]
+    if fmt == "csv":
+        yield _csv_header().encode()
+    for partition in db.scalars(export_statement(user_id, chunk_size)).partitions():
+        yield encode(partition).encode()
+        if on_partition is not None:
+            on_partition(len(partition))
+
+
+async def aiter_export(
+    db: AsyncSession, user_id: int, fmt: str, chunk_size: int = EXPORT_CHUNK_SIZE
+) -> AsyncIterator[bytes]:
+    """Async-driver counterpart of iter_export."""
+    encode = _ENCODERS[fmt]
+    if fmt == "csv":
+        yield _csv_header().encode()
+    result = await db.stream_scalars(export_statement(user_id, chunk_size))
+    async for partition in result.partitions():
+        yield encode(partition).encode()
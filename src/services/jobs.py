@@ -0,0 +1,489 @@
+"""Background jobs for work too slow for a request: full exports, analytics and backfills.
+
+POST /jobs stores a `queued` row owned by the submitting process (`worker_token`) and hands
+its id to that process's `runner`. A runner worker, a thread or, with JOB_EXECUTOR=process or an
+async database, a child process, claims the row (`running`), runs the kind's handler with its own
+session, writes any result to a file under JOB_RESULTS_DIR and records `succeeded` or `failed`.
+
+Handlers report progress to the owning process's runner, which serves it from memory while the
+job runs; the row only gets the final count, since writing it mid-job would contend with the
+job's own transaction on SQLite. Everything runs on one box, so an active job whose owner no
+longer holds its lease was lost with its process: `recover_jobs` re-adopts such queued jobs and
+fails such running ones at startup, and prunes finished jobs past retention.
+
+Owners are identified by a token made at import rather than by pid: pids repeat, e.g. after a
+container restart the server is PID 1 again. Each process holds an exclusive flock on a lease
+file named after its token under JOB_RESULTS_DIR/.workers; the OS drops it when the process
+exits, so a token whose lease can be locked by someone else belongs to a dead process.
+"""
+import asyncio
+import fcntl
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import BinaryIO, Callable
+
+import orjson
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session
+
+from adapters.sqlalchemy.models import Exercise, Job, User, Workout
+from app.settings import settings
+from domain.exceptions import BadRequest, NotFound, TooManyRequests
+from domain.schemas import ExportJobParams, NoJobParams
+from services.data_version import bump_data_version
+from services.export import MEDIA_TYPES, iter_export
+from services.progression import exercise_progression
+from services.records import recompute_records
+from services.rollups import rebuild_rollups
+
+
+logger = logging.getLogger(__name__)
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+ACTIVE = (QUEUED, RUNNING)
+
+RECORDS_EXERCISES_PER_COMMIT = 50
+
+Report = Callable[[int, int, int | None], None]
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)  # naive UTC, as DateTime columns store it
+
+
+class JobContext:
+    """A handler's view of its job: owner, params, progress reporting and the result file."""
+
+    def __init__(self, job: Job, report: Report):
+        self.job_id = job.id
+        self.user_id = job.user_id
+        self.params = job.params
+        self.done = 0
+        self.total: int | None = None
+        self.result_name: str | None = None
+        self.media_type: str | None = None
+        self._report = report
+        self._partial: Path | None = None
+
+    def progress(self, done: int, total: int | None = None) -> None:
+        self.done = done
+        if total is not None:
+            self.total = total
+        self._report(self.job_id, self.done, self.total)
+
+    def advance(self, n: int = 1) -> None:
+        self.progress(self.done + n)
+
+    def open_result(self, name: str, media_type: str) -> BinaryIO:
+        """Open the job's result file for writing; it is only published if the handler succeeds."""
+        directory = Path(settings.job_results_dir)
+        directory.mkdir(parents=True, exist_ok=True)
+        self.result_name, self.media_type = name, media_type
+        self._partial = directory / f"{self.job_id}-{name}.part"
+        return open(self._partial, "wb")
+
+    def _publish(self) -> Path | None:
+        if self._partial is None:
+            return None
+        path = self._partial.with_suffix("")
+        os.replace(self._partial, path)
+        return path
+
+    def _discard(self) -> None:
+        if self._partial is not None:
+            self._partial.unlink(missing_ok=True)
+
+
+def _export(db: Session, ctx: JobContext) -> None:
+    fmt = ctx.params["format"]
+    ctx.progress(0, db.scalar(select(func.count()).select_from(Workout).where(Workout.user_id == ctx.user_id)))
+    with ctx.open_result(f"workouts.{fmt}", MEDIA_TYPES[fmt]) as out:
+        for chunk in iter_export(db, ctx.user_id, fmt, on_partition=ctx.advance):
+            out.write(chunk)
+
+
+def _user_exercise_ids(db: Session, user_id: int) -> list[int]:
+    return db.scalars(select(Exercise.id).where(Exercise.user_id == user_id).order_by(Exercise.id)).all()
+
+
+def _progression_report(db: Session, ctx: JobContext) -> None:
+    exercise_ids = _user_exercise_ids(db, ctx.user_id)
+    ctx.progress(0, len(exercise_ids))
+    with ctx.open_result("progression.ndjson", MEDIA_TYPES["ndjson"]) as out:
+        for exercise_id in exercise_ids:
+            series = exercise_progression(db, ctx.user_id, exercise_id)
+            out.write(orjson.dumps(series, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE))
+            ctx.advance()
+
+
+def _recompute_records(db: Session, ctx: JobContext) -> None:
+    exercise_ids = _user_exercise_ids(db, ctx.user_id)
+    ctx.progress(0, len(exercise_ids))
+    for i in range(0, len(exercise_ids), RECORDS_EXERCISES_PER_COMMIT):
+        batch = exercise_ids[i:i + RECORDS_EXERCISES_PER_COMMIT]
+        recompute_records(db, ctx.user_id, set(batch))
+        bump_data_version(db, ctx.user_id)
+        db.commit()
+        ctx.advance(len(batch))
+
+
+def _backfill_rollups(db: Session, ctx: JobContext) -> None:
+    ctx.progress(0, db.scalar(select(func.count()).select_from(User)))
+    rebuild_rollups(db, on_chunk=ctx.advance)
+
+
+@dataclass(frozen=True)
+class JobKind:
+    handler: Callable[[Session, JobContext], None]
+    params: type[BaseModel]
+    admin_only: bool = False
+
+
+JOB_KINDS: dict[str, JobKind] = {
+    "export": JobKind(_export, ExportJobParams),
+    "progression_report": JobKind(_progression_report, NoJobParams),
+    "recompute_records": JobKind(_recompute_records, NoJobParams),
+    "backfill_rollups": JobKind(_backfill_rollups, NoJobParams, admin_only=True),
+}
+
+
+WORKER_TOKEN = uuid.uuid4().hex  # this process's owner token; child workers make their own
+_lease: BinaryIO | None = None
+
+
+def _lease_path(token: str) -> Path:
+    return Path(settings.job_results_dir) / ".workers" / token
+
+
+def _hold_lease() -> str:
+    """Take this process's lease, once, before it owns any job; returns its token."""
+    global _lease
+    if _lease is None:
+        path = _lease_path(WORKER_TOKEN)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lease = open(path, "wb")
+        fcntl.flock(lease, fcntl.LOCK_EX)
+        _lease = lease
+    return WORKER_TOKEN
+
+
+def _alive(token: str | None) -> bool:
+    if token is None:
+        return False
+    if token == WORKER_TOKEN:
+        return True
+    try:
+        lease = open(_lease_path(token), "rb")
+    except FileNotFoundError:
+        return False
+    with lease:
+        try:
+            fcntl.flock(lease, fcntl.LOCK_SH | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return True  # still locked by its owner
+    return False
+
+
+def _prune_leases() -> None:
+    """Delete lease files of dead processes, leaving recent ones alone (their owner may be
+    between creating and locking the file)."""
+    directory = _lease_path(WORKER_TOKEN).parent
+    cutoff = time.time() - settings.job_retention_days * 86400
+    for path in directory.glob("*") if directory.is_dir() else ():
+        if path.stat().st_mtime < cutoff and not _alive(path.name):
+            path.unlink(missing_ok=True)
+
+
+def _lost(db: Session, status: str, user_id: int | None = None) -> list[tuple[int, str | None]]:
+    stmt = select(Job.id, Job.worker_token).where(Job.status == status)
+    if user_id is not None:
+        stmt = stmt.where(Job.user_id == user_id)
+    return [(id_, token) for id_, token in db.execute(stmt) if not _alive(token)]
+
+
+def fail_lost_jobs(db: Session, user_id: int | None = None) -> int:
+    """Mark running jobs whose worker process has exited as failed; returns how many."""
+    lost = [id_ for id_, _ in _lost(db, RUNNING, user_id)]
+    if lost:
+        db.execute(
+            update(Job).where(Job.id.in_(lost), Job.status == RUNNING)
+            .values(status=FAILED, error="Interrupted: its worker process exited", finished_at=_now())
+        )
+    return len(lost)
+
+
+def create_job(db: Session, user_id: int, kind: str, params: dict) -> Job:
+    """Queue a job for this process to run, within the per-user limit on active jobs."""
+    try:
+        params = JOB_KINDS[kind].params.model_validate(params).model_dump()
+    except ValidationError as exc:
+        errors = exc.errors(include_url=False, include_context=False)
+        raise BadRequest("Invalid job parameters", details={"errors": errors})
+    fail_lost_jobs(db, user_id)  # so jobs of a crashed worker don't hold the user's slots
+    active = db.scalar(
+        select(func.count()).select_from(Job).where(Job.user_id == user_id, Job.status.in_(ACTIVE))
+    )
+    if active >= settings.job_max_active_per_user:
+        raise TooManyRequests(
+            f"At most {settings.job_max_active_per_user} jobs can be queued or running at once", retry_after=10
+        )
+    job = Job(
+        user_id=user_id, kind=kind, params=params, status=QUEUED,
+        worker_token=_hold_lease(), worker_pid=os.getpid(), created_at=_now(),
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def get_job(db: Session, user_id: int, job_id: int) -> Job:
+    job = db.get(Job, job_id)
+    if job is None or job.user_id != user_id:
+        raise NotFound("Job not found")
+    return job
+
+
+def execute_job(db: Session, job_id: int, report: Report) -> str | None:
+    """Claim a queued job and run it to completion; returns its final status, or None if the
+    job was not queued (already claimed by another worker)."""
+    claimed = db.execute(
+        update(Job).where(Job.id == job_id, Job.status == QUEUED)
+        .values(status=RUNNING, worker_token=_hold_lease(), worker_pid=os.getpid(), started_at=_now())
+    ).rowcount
+    db.commit()
+    if not claimed:
+        return None
+    job = db.get(Job, job_id)
+    kind = job.kind
+    ctx = JobContext(job, report)
+    try:
+        JOB_KINDS[kind].handler(db, ctx)
+        path = ctx._publish()
+    except Exception as exc:
+        db.rollback()
+        ctx._discard()
+        logger.exception("Job %s (%s) failed", job_id, kind)
+        values = {"status": FAILED, "error": f"{type(exc).__name__}: {exc}"[:500]}
+    else:
+        values = {"status": SUCCEEDED}
+        if path is not None:
+            values.update(
+                result_path=str(path), result_name=ctx.result_name,
+                result_media_type=ctx.media_type, result_size=path.stat().st_size,
+            )
+    db.execute(
+        update(Job).where(Job.id == job_id)
+        .values(progress_done=ctx.done, progress_total=ctx.total, finished_at=_now(), **values)
+    )
+    db.commit()
+    return values["status"]
+
+
+def fail_job(db: Session, job_id: int, error: str) -> None:
+    """Mark a job that never got to record its own outcome (its worker raised) as failed."""
+    db.execute(
+        update(Job).where(Job.id == job_id, Job.status.in_(ACTIVE))
+        .values(status=FAILED, error=error[:500], finished_at=_now())
+    )
+    db.commit()
+
+
+def recover_jobs(db: Session) -> list[int]:
+    """Startup housekeeping; returns the ids of queued jobs this process adopted and must submit.
+
+    Running jobs of exited processes fail, their queued jobs move to this process (one claim
+    per job, so concurrently starting workers don't both take it), and finished jobs older than
+    JOB_RETENTION_DAYS are deleted along with their result files.
+    """
+    fail_lost_jobs(db)
+    adopted = []
+    for id_, token in _lost(db, QUEUED):
+        owner = Job.worker_token.is_(None) if token is None else Job.worker_token == token
+        claim = (
+            update(Job).where(Job.id == id_, Job.status == QUEUED, owner)
+            .values(worker_token=_hold_lease(), worker_pid=os.getpid())
+        )
+        if db.execute(claim).rowcount:
+            adopted.append(id_)
+    expired = db.execute(
+        select(Job.id, Job.result_path).where(
+            Job.status.in_((SUCCEEDED, FAILED)),
+            Job.finished_at < _now() - timedelta(days=settings.job_retention_days),
+        )
+    ).all()
+    for _, path in expired:
+        if path:
+            Path(path).unlink(missing_ok=True)
+    if expired:
+        db.execute(delete(Job).where(Job.id.in_([id_ for id_, _ in expired])))
+    db.commit()
+    _prune_leases()
+    return adopted
+
+
+_child_progress: "multiprocessing.Queue | None" = None
+
+
+def _init_child(progress_queue) -> None:
+    # Children are spawned, not forked (SQLite connections must not cross a fork), so this
+    # module, its WORKER_TOKEN and the engines are all fresh here
+    global _child_progress
+    _child_progress = progress_queue
+
+
+def _report_from_child(job_id: int, done: int, total: int | None) -> None:
+    _child_progress.put((job_id, done, total))
+
+
+def _run_in_child(job_id: int) -> str | None:
+    from app.dependencies import db as db_module
+
+    factory = db_module.get_writer_session_factory()
+    if isinstance(factory, async_sessionmaker):
+        async def _run():
+            try:
+                async with factory() as db:
+                    return await db.run_sync(execute_job, job_id, _report_from_child)
+            finally:
+                # Pooled async connections are bound to this loop; the next job gets a new one
+                await db_module.async_engine.dispose()
+
+        return asyncio.run(_run())
+    with factory() as db:
+        return execute_job(db, job_id, _report_from_child)
+
+
+async def _fail_async(factory: async_sessionmaker, job_id: int, error: str) -> None:
+    async with factory() as db:
+        await db.run_sync(fail_job, job_id, error)
+
+
+def _run_in_thread(factory, job_id: int, report: Report) -> str | None:
+    with factory() as db:
+        return execute_job(db, job_id, report)
+
+
+class JobRunner:
+    """Runs jobs on a bounded pool of threads or, for CPU-bound work, child processes.
+
+    At most `workers` jobs run at once per app process; the rest wait in the executor's queue
+    with their rows still `queued`.
+    """
+
+    def __init__(self, workers: int, kind: str = "thread"):
+        self.workers = workers
+        self.kind = kind
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+        self._live: dict[int, tuple[int, int | None]] = {}
+        self._factories: dict[int, tuple[object, asyncio.AbstractEventLoop | None]] = {}
+        self._done: dict[int, threading.Event] = {}
+        self._progress_queue = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                context = multiprocessing.get_context("spawn")
+                self._progress_queue = context.Queue()
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=context,
+                    initializer=_init_child, initargs=(self._progress_queue,),
+                )
+                threading.Thread(
+                    target=self._drain_progress, args=(self._progress_queue,), name="job-progress", daemon=True
+                ).start()
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job")
+        return self._executor
+
+    def _drain_progress(self, queue) -> None:
+        while (item := queue.get()) is not None:
+            self._report(*item)
+
+    def _report(self, job_id: int, done: int, total: int | None) -> None:
+        with self._lock:
+            if job_id in self._live:  # late reports of a finished job are dropped
+                self._live[job_id] = (done, total)
+
+    def progress(self, job_id: int) -> tuple[int, int | None] | None:
+        """(done, total) last reported by a job this process is running, if any."""
+        with self._lock:
+            return self._live.get(job_id)
+
+    def submit(self, job_id: int, session_factory) -> None:
+        # An async factory's sessions belong to the app's loop; failures are recorded there
+        loop = asyncio.get_running_loop() if isinstance(session_factory, async_sessionmaker) else None
+        with self._lock:
+            self._live[job_id] = (0, None)
+            self._factories[job_id] = (session_factory, loop)
+            self._done[job_id] = threading.Event()
+        if self.kind == "process":
+            future = self._get_executor().submit(_run_in_child, job_id)
+        else:
+            future = self._get_executor().submit(_run_in_thread, session_factory, job_id, self._report)
+        future.add_done_callback(lambda f: self._finished(job_id, f))
+
+    def _finished(self, job_id: int, future: Future) -> None:
+        with self._lock:
+            self._live.pop(job_id, None)
+            factory, loop = self._factories.pop(job_id)
+            done = self._done.pop(job_id)
+        try:
+            if not future.cancelled() and future.exception() is not None:
+                self._fail(job_id, factory, loop, future.exception())
+        finally:
+            done.set()
+
+    def _fail(self, job_id: int, factory, loop: asyncio.AbstractEventLoop | None, exc: BaseException) -> None:
+        # execute_job records handler errors itself; this is the worker dying under it, or the
+        # claim failing, which would otherwise leave the job queued and holding a user's slot
+        logger.error("Job %s worker failed", job_id, exc_info=exc)
+        error = f"Worker failed: {type(exc).__name__}: {exc}"
+        try:
+            if loop is not None:
+                asyncio.run_coroutine_threadsafe(_fail_async(factory, job_id, error), loop)
+            else:
+                with factory() as db:
+                    fail_job(db, job_id, error)
+        except Exception:
+            logger.exception("Could not mark job %s failed", job_id)
+
+    def wait(self, job_id: int, timeout: float | None = None) -> None:
+        """Block until this process's run of the job ends (for tests and scripts)."""
+        with self._lock:
+            done = self._done.get(job_id)
+        if done is not None:
+            done.wait(timeout)
+
+    def shutdown(self) -> None:
+        """Stop taking jobs. Running ones finish; queued ones stay queued and are adopted by the
+        next process to start (see recover_jobs)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._progress_queue is not None:
+            self._progress_queue.put(None)
+            self._progress_queue = None
+
+
+def _executor_kind() -> str:
+    # A thread worker would drive an async engine's job through run_sync on the event loop,
+    # stalling every request until it finished; a child process runs it on its own loop
+    if make_url(settings.database_url).get_dialect().is_async:
+        return "process"
+    return settings.job_executor
+
+
+runner = JobRunner(workers=settings.job_workers, kind=_executor_kind())
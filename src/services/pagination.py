@@ -0,0 +1,62 @@
+import base64
+import binascii
+import json
+from datetime import date
+
+from sqlalchemy import Date, Select, func, select, tuple_
+from sqlalchemy.orm import Session
+
+from domain.exceptions import BadRequest
+
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps(values, default=lambda v: v.isoformat(), separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: list) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor shape mismatch")
+        return [
+            date.fromisoformat(v) if isinstance(col.type, Date) else col.type.python_type(v)
+            for col, v in zip(columns, values)
+        ]
+    except (ValueError, TypeError, binascii.Error, UnicodeDecodeError):
+        raise BadRequest("Invalid cursor")
+
+
+def paginate(
+    db: Session,
+    stmt: Select,
+    columns: list,
+    *,
+    descending: bool,
+    limit: int,
+    offset: int = 0,
+    cursor: str | None = None,
+    include_total: bool = False,
+) -> dict:
+    """Page the column projection `stmt` ordered on `columns` (the last must be unique, e.g. id).
+
+    With a cursor the page is a keyset range scan `(columns) < / > (cursor values)` and `offset`
+    is ignored; without one it falls back to offset paging. `total` costs an extra COUNT over every
+    match, so it is only computed when asked for (and is None otherwise).
+    Returns a dict with plain Row tuples in `items` (no identity-map bookkeeping) and an opaque
+    `next_cursor` when more rows follow.
+    """
+    total = db.scalar(select(func.count()).select_from(stmt.subquery())) if include_total else None
+    if cursor is not None:
+        key = tuple_(*columns)
+        after = tuple_(*decode_cursor(cursor, columns))
+        stmt = stmt.where(key < after if descending else key > after)
+        offset = 0
+    ordering = [c.desc() if descending else c.asc() for c in columns]
+    rows = db.execute(stmt.order_by(*ordering).offset(offset).limit(limit + 1)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([getattr(rows[-1], c.key) for c in columns])
+    return {"items": rows, "limit": limit, "offset": offset, "total": total, "next_cursor": next_cursor}
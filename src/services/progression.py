@@ -0,0 +1,92 @@
+"""Per-exercise progression series, computed column-wise with NumPy.
+
+The exercise's sets come back from one query ordered by session (workout), are unpacked into
+flat arrays, and every series is a vectorized expression over them: per-session reductions use
+`ufunc.reduceat` at the session boundaries, running PRs use `maximum.accumulate`. Python only
+loops over sessions to format dates.
+"""
+from itertools import chain
+
+import numpy as np
+from sqlalchemy import String, select, type_coerce
+from sqlalchemy.orm import Session
+
+from adapters.sqlalchemy.models import Set, Workout
+from services.exercises import get_exercise
+
+
+def estimated_1rm(reps: np.ndarray, weight: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Epley and Brzycki one-rep-max estimates per set.
+
+    A single is its own 1RM and a zero-rep set lifts nothing; Brzycki is undefined from 37 reps
+    up and yields NaN there.
+    """
+    reps = reps.astype(np.float64)
+    epley = weight * (1.0 + reps / 30.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        brzycki = np.where(reps < 37, weight * 36.0 / (37.0 - reps), np.nan)
+    single, failed = reps == 1, reps == 0
+    epley = np.where(single, weight, np.where(failed, 0.0, epley))
+    brzycki = np.where(single, weight, np.where(failed, 0.0, brzycki))
+    return epley, brzycki
+
+
+def _weekly_slope(days: np.ndarray, values: np.ndarray) -> float | None:
+    """Least-squares slope of `values` over `days`, per week; None without two distinct days."""
+    mask = ~np.isnan(values)
+    days, values = days[mask], values[mask]
+    if days.size < 2 or days[0] == days[-1]:
+        return None
+    slope = np.polyfit(days - days[0], values, 1)[0]
+    return round(float(slope) * 7, 3)
+
+
+def exercise_progression(db: Session, user_id: int, exercise_id: int) -> dict:
+    """Session-by-session progression series for one of the user's exercises.
+
+    Values are NumPy arrays (the default response class serializes them directly); NaN, e.g.
+    Brzycki past its range, renders as null.
+    """
+    get_exercise(db, user_id, exercise_id)  # 404 / 403
+    # Core execution skips ORM row processing; the date is fetched unconverted (an ISO string on
+    # SQLite, a date elsewhere; str() of either is ISO) and only formatted at session starts
+    rows = db.connection().execute(
+        select(Workout.id, type_coerce(Workout.date, String), Set.reps, Set.weight_kg)
+        .join(Workout, Workout.id == Set.workout_id)
+        .where(Set.exercise_id == exercise_id, Workout.user_id == user_id)
+        .order_by(Workout.date, Workout.id, Set.id)
+    ).all()
+    n = len(rows)
+    flat = np.fromiter(chain.from_iterable((r[0], r[2], r[3]) for r in rows), np.float64, count=3 * n)
+    workout_ids, reps, weight = flat.reshape(n, 3).T
+
+    # Sets of one session are contiguous: a session starts wherever the workout id changes
+    starts = np.flatnonzero(np.diff(workout_ids, prepend=np.nan))
+    epley, brzycki = estimated_1rm(reps, weight)
+
+    volume = np.add.reduceat(reps * weight, starts)
+    best_epley = np.fmax.reduceat(epley, starts)
+    best_brzycki = np.fmax.reduceat(brzycki, starts)  # fmax skips Brzycki's NaNs
+    top_weight = np.maximum.reduceat(weight, starts)
+    set_count = np.diff(np.append(starts, n))
+    rolling_best = np.maximum.accumulate(best_epley)
+    previous_best = np.concatenate(([-np.inf], rolling_best))[:-1]
+    is_pr = best_epley > previous_best
+
+    dates = [str(rows[i][1]) for i in starts]
+    days = np.array(dates, dtype="datetime64[D]").astype(np.float64)
+    return {
+        "exercise_id": exercise_id,
+        "sessions": len(dates),
+        "dates": dates,
+        "workout_ids": workout_ids[starts].astype(np.int64),
+        "set_count": set_count.astype(np.int64),
+        "volume_kg": np.round(volume, 2),
+        "top_weight_kg": np.round(top_weight, 2),
+        "best_e1rm_epley_kg": np.round(best_epley, 2),
+        "best_e1rm_brzycki_kg": np.round(best_brzycki, 2),
+        "rolling_best_e1rm_kg": np.round(rolling_best, 2),
+        "is_pr": is_pr,
+        "e1rm_trend_kg_per_week": _weekly_slope(days, best_epley),
+        "volume_trend_kg_per_week": _weekly_slope(days, volume),
+    }
@@ -0,0 +1,159 @@
+"""Personal records per exercise, kept current by the workout write path.
+
+Three kinds of record: the heaviest weight lifted for at least one rep (`max_weight`), the most
+reps at each distinct load (`reps_at_weight`) and the largest single-workout volume
+(`session_volume`). New workouts are folded into the stored records with one read and one
+batched upsert; deleting a workout that holds records, or re-dating one, recomputes just the
+exercises affected from their sets (a tie goes to the earlier workout, so a move can change
+which workout holds a record).
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date
+from itertools import groupby
+
+from sqlalchemy import case, delete, insert, select
+from sqlalchemy.orm import Session
+
+from adapters.sqlalchemy.models import PersonalRecord, Set, Workout
+from adapters.sqlalchemy.upsert import upsert
+
+
+MAX_WEIGHT = "max_weight"
+REPS_AT_WEIGHT = "reps_at_weight"
+SESSION_VOLUME = "session_volume"
+
+RECORD_COLUMNS = (
+    PersonalRecord.exercise_id,
+    PersonalRecord.kind,
+    PersonalRecord.weight_kg,
+    PersonalRecord.value,
+    PersonalRecord.workout_id,
+    PersonalRecord.achieved_on,
+)
+
+
+@dataclass(slots=True)
+class _Best:
+    value: float
+    workout_id: int
+    achieved_on: date
+
+
+def _fold(best: dict[tuple, _Best], workouts) -> dict[tuple, float | None]:
+    """Fold `(workout_id, day, sets)` triples into `best`, keyed (exercise_id, kind, weight_kg).
+
+    Only strict improvements of positive values count, so the first workout to reach a value
+    keeps the record. Returns the keys that improved, each with its value from before the fold.
+    """
+    improved: dict[tuple, float | None] = {}
+
+    def offer(key: tuple, value: float, workout_id: int, day: date) -> None:
+        current = best.get(key)
+        if value <= 0 or (current is not None and value <= current.value):
+            return
+        if key not in improved:
+            improved[key] = current.value if current is not None else None
+        best[key] = _Best(value, workout_id, day)
+
+    for workout_id, day, sets in workouts:
+        volume: dict[int, float] = defaultdict(float)
+        for s in sets:
+            if s.reps >= 1:
+                offer((s.exercise_id, MAX_WEIGHT, 0.0), s.weight_kg, workout_id, day)
+            offer((s.exercise_id, REPS_AT_WEIGHT, s.weight_kg), s.reps, workout_id, day)
+            volume[s.exercise_id] += s.reps * s.weight_kg
+        for exercise_id, total in volume.items():
+            offer((exercise_id, SESSION_VOLUME, 0.0), total, workout_id, day)
+    return improved
+
+
+def _rows(user_id: int, best: dict[tuple, _Best], keys) -> list[dict]:
+    return [
+        {
+            "user_id": user_id, "exercise_id": e, "kind": kind, "weight_kg": w,
+            "value": best[(e, kind, w)].value,
+            "workout_id": best[(e, kind, w)].workout_id,
+            "achieved_on": best[(e, kind, w)].achieved_on,
+        }
+        for e, kind, w in sorted(keys)
+    ]
+
+
+def record_workouts(db: Session, user_id: int, workouts) -> list[dict]:
+    """Merge newly created `(workout_id, day, sets)` triples into the user's records.
+
+    Returns the records they set, with the value each one beat (None for a first record).
+    """
+    exercise_ids = {s.exercise_id for _, _, sets in workouts for s in sets}
+    if not exercise_ids:
+        return []
+    best = {
+        (r.exercise_id, r.kind, r.weight_kg): _Best(r.value, r.workout_id, r.achieved_on)
+        for r in db.execute(
+            select(*RECORD_COLUMNS).where(
+                PersonalRecord.user_id == user_id, PersonalRecord.exercise_id.in_(exercise_ids)
+            )
+        )
+    }
+    improved = _fold(best, workouts)
+    if improved:
+        stmt = upsert(db, PersonalRecord.__table__, lambda c, excluded: {
+            "value": excluded.value, "workout_id": excluded.workout_id, "achieved_on": excluded.achieved_on,
+        })
+        db.execute(stmt, _rows(user_id, best, improved))
+    return [
+        {"exercise_id": e, "kind": kind, "weight_kg": w if kind == REPS_AT_WEIGHT else None,
+         "value": best[(e, kind, w)].value, "previous": improved[(e, kind, w)]}
+        for e, kind, w in sorted(improved)
+    ]
+
+
+def records_held_by(db: Session, user_id: int, workout_id: int) -> set[int]:
+    """Exercises with at least one record set in `workout_id`."""
+    return set(db.scalars(
+        select(PersonalRecord.exercise_id).where(
+            PersonalRecord.user_id == user_id, PersonalRecord.workout_id == workout_id
+        )
+    ))
+
+
+def recompute_records(db: Session, user_id: int, exercise_ids: set[int]) -> None:
+    """Rebuild the records of `exercise_ids` from the user's remaining sets, oldest first."""
+    if not exercise_ids:
+        return
+    db.execute(delete(PersonalRecord).where(
+        PersonalRecord.user_id == user_id, PersonalRecord.exercise_id.in_(exercise_ids)
+    ))
+    rows = db.execute(
+        select(Workout.id, Workout.date, Set.exercise_id, Set.reps, Set.weight_kg)
+        .join(Set, Set.workout_id == Workout.id)
+        .where(Workout.user_id == user_id, Set.exercise_id.in_(exercise_ids))
+        .order_by(Workout.date, Workout.id, Set.id)
+    ).all()
+    workouts = []
+    for workout_id, workout_sets in groupby(rows, key=lambda r: r.id):
+        sets = list(workout_sets)
+        workouts.append((workout_id, sets[0].date, sets))
+    best: dict[tuple, _Best] = {}
+    _fold(best, workouts)
+    if best:
+        db.execute(insert(PersonalRecord.__table__), _rows(user_id, best, best))
+
+
+def list_records(db: Session, user_id: int, exercise_id: int | None = None) -> list:
+    """The user's records, by exercise, in one primary-key range read."""
+    load = case((PersonalRecord.kind == REPS_AT_WEIGHT, PersonalRecord.weight_kg), else_=None)
+    stmt = select(
+        PersonalRecord.exercise_id,
+        PersonalRecord.kind,
+        load.label("weight_kg"),
+        PersonalRecord.value,
+        PersonalRecord.workout_id,
+        PersonalRecord.achieved_on,
+    ).where(PersonalRecord.user_id == user_id)
+    if exercise_id is not None:
+        stmt = stmt.where(PersonalRecord.exercise_id == exercise_id)
+    return db.execute(
+        stmt.order_by(PersonalRecord.exercise_id, PersonalRecord.kind, PersonalRecord.weight_kg)
+    ).all()
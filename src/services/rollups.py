@@ -0,0 +1,140 @@
+"""Per-exercise training rollups by day, ISO week and month.
+
+`exercise_rollups` holds one row per (user, granularity, bucket start, exercise): sets, reps,
+volume and the number of workouts that trained the exercise. The workout write path applies
+deltas in its own transaction (services.workouts._record_change), so timeseries reads are a
+primary-key range scan; `rebuild_rollups` recomputes everything from sets for existing data.
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+from itertools import groupby
+from typing import Callable
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from adapters.sqlalchemy.models import ExerciseRollup, Set, User, Workout
+from adapters.sqlalchemy.upsert import upsert
+from services.data_version import bump_data_versions
+
+
+GRANULARITIES = ("day", "week", "month")
+_TOTALS = ("set_count", "reps_sum", "volume_kg", "workout_count")
+
+
+def bucket_start(day: date, granularity: str) -> date:
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())  # ISO weeks start on Monday
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def rollup_deltas(added=(), removed=()) -> dict[tuple, list]:
+    """Fold `(day, sets)` pairs, one per workout, into per-bucket deltas.
+
+    Returns {(granularity, bucket_start, exercise_id): [sets, reps, volume_kg, workouts]};
+    `sets` are set-like objects (SetCreate, Set or Rows) with exercise_id, reps and weight_kg.
+    """
+    deltas: dict[tuple, list] = defaultdict(lambda: [0, 0, 0.0, 0])
+    for sign, workouts in ((1, added), (-1, removed)):
+        for day, sets in workouts:
+            per_exercise: dict[int, list] = defaultdict(lambda: [0, 0, 0.0])
+            for s in sets:
+                totals = per_exercise[s.exercise_id]
+                totals[0] += 1
+                totals[1] += s.reps
+                totals[2] += s.reps * s.weight_kg
+            for granularity in GRANULARITIES:
+                start = bucket_start(day, granularity)
+                for exercise_id, (n, reps, volume) in per_exercise.items():
+                    delta = deltas[(granularity, start, exercise_id)]
+                    delta[0] += sign * n
+                    delta[1] += sign * reps
+                    delta[2] += sign * volume
+                    delta[3] += sign
+    return deltas
+
+
+def apply_rollup_deltas(db: Session, user_id: int, deltas: dict[tuple, list]) -> None:
+    """Add `deltas` to the user's rollup rows with one batched upsert (INSERT ... ON CONFLICT)."""
+    rows = [
+        {"user_id": user_id, "granularity": g, "bucket_start": b, "exercise_id": e, **dict(zip(_TOTALS, d))}
+        for (g, b, e), d in sorted(deltas.items())  # fixed lock order across concurrent writers
+        if any(d)
+    ]
+    if not rows:
+        return
+    stmt = upsert(
+        db, ExerciseRollup.__table__, lambda c, excluded: {name: c[name] + excluded[name] for name in _TOTALS}
+    )
+    db.execute(stmt, rows)
+    if any(r["set_count"] < 0 for r in rows):
+        # Buckets whose last set was removed (or moved to another date) disappear
+        db.execute(delete(ExerciseRollup).where(ExerciseRollup.user_id == user_id, ExerciseRollup.set_count <= 0))
+
+
+def volume_timeseries(
+    db: Session,
+    user_id: int,
+    granularity: str,
+    start: date | None = None,
+    end: date | None = None,
+    exercise_id: int | None = None,
+) -> list:
+    """Rollup rows of one granularity whose bucket overlaps [start, end], oldest first."""
+    stmt = select(
+        ExerciseRollup.bucket_start,
+        ExerciseRollup.exercise_id,
+        ExerciseRollup.set_count,
+        ExerciseRollup.reps_sum,
+        ExerciseRollup.volume_kg,
+        ExerciseRollup.workout_count,
+    ).where(ExerciseRollup.user_id == user_id, ExerciseRollup.granularity == granularity)
+    if start is not None:
+        stmt = stmt.where(ExerciseRollup.bucket_start >= bucket_start(start, granularity))
+    if end is not None:
+        stmt = stmt.where(ExerciseRollup.bucket_start <= end)
+    if exercise_id is not None:
+        stmt = stmt.where(ExerciseRollup.exercise_id == exercise_id)
+    return db.execute(stmt.order_by(ExerciseRollup.bucket_start, ExerciseRollup.exercise_id)).all()
+
+
+def rebuild_rollups(
+    db: Session, users_per_chunk: int = 100, on_chunk: Callable[[int], None] | None = None
+) -> int:
+    """Recompute every user's rollups from workouts and sets; returns the number of rows written.
+
+    Works through users in id order, `users_per_chunk` at a time, replacing their rows and
+    committing per chunk, so it can run against a live database without one long transaction.
+    Each chunk's users get their data versions bumped, so cached timeseries ETags stop
+    matching. `on_chunk`, if given, is called with the number of users in each committed chunk.
+    """
+    written = 0
+    last_id = 0
+    while True:
+        user_ids = db.scalars(
+            select(User.id).where(User.id > last_id).order_by(User.id).limit(users_per_chunk)
+        ).all()
+        if not user_ids:
+            return written
+        db.execute(delete(ExerciseRollup).where(ExerciseRollup.user_id.in_(user_ids)))
+        sets = db.execute(
+            select(Workout.user_id, Workout.id, Workout.date, Set.exercise_id, Set.reps, Set.weight_kg)
+            .join(Set, Set.workout_id == Workout.id)
+            .where(Workout.user_id.in_(user_ids))
+            .order_by(Workout.user_id, Workout.id)
+        ).all()
+        for user_id, user_sets in groupby(sets, key=lambda r: r.user_id):
+            workouts = []
+            for _, workout_sets in groupby(user_sets, key=lambda r: r.id):
+                rows = list(workout_sets)
+                workouts.append((rows[0].date, rows))
+            deltas = rollup_deltas(added=workouts)
+            apply_rollup_deltas(db, user_id, deltas)
+            written += len(deltas)
+        bump_data_versions(db, user_ids)
+        db.commit()
+        if on_chunk is not None:
+            on_chunk(len(user_ids))
+        last_id = user_ids[-1]
@@ -0,0 +1,279 @@
+"""Population-wide quantile sketches per exercise name and metric, for admin percentile queries.
+
+Each sketch is a DDSketch-style log-bucketed histogram: a positive value v is counted in bucket
+ceil(log_gamma(v)) with gamma = (1 + a) / (1 - a), and a quantile read back from the sketch is
+within relative error a (RELATIVE_ACCURACY) of the exact quantile, for any data size or
+distribution. Buckets are plain counts, so sketches merge exactly by adding counts (in any order,
+across any number of workers) and deleting a workout subtracts what its sets once added.
+
+Workers stage deltas per transaction and move them into the process-wide `sketches` store when
+it commits; `SketchStore.flush` periodically adds them to `quantile_sketch_buckets` with an
+upsert. Queries read merged rows through a per-process cache, refreshed at most every
+`cache_seconds`, so answering one is a bisect over cumulative counts.
+"""
+import math
+import threading
+import time
+from bisect import bisect_right
+from collections import defaultdict
+from itertools import groupby
+
+from sqlalchemy import delete, event, select
+from sqlalchemy.orm import Session
+
+from adapters.sqlalchemy.models import Exercise, QuantileSketchBucket, Set, Workout
+from adapters.sqlalchemy.upsert import upsert
+from app.settings import settings
+
+
+RELATIVE_ACCURACY = 0.01
+_GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+ZERO_BUCKET = -(2**31)  # values too small to log-bucket (0 kg, bodyweight sets)
+_MIN_POSITIVE = 1e-9
+
+METRICS = ("weight_kg", "reps", "session_volume_kg")
+
+
+def normalize_name(name: str) -> str:
+    """Exercises are per user; the population key is the case- and whitespace-folded name."""
+    return " ".join(name.lower().split())
+
+
+def bucket_index(value: float) -> int:
+    return ZERO_BUCKET if value < _MIN_POSITIVE else math.ceil(math.log(value) / _LOG_GAMMA)
+
+
+def bucket_value(index: int) -> float:
+    """The estimate for every value in a bucket, within RELATIVE_ACCURACY of each of them."""
+    return 0.0 if index == ZERO_BUCKET else 2 * _GAMMA**index / (_GAMMA + 1)
+
+
+class QuantileSketch:
+    def __init__(self, counts: dict[int, int] | None = None):
+        self.counts: dict[int, int] = defaultdict(int, counts or {})
+        self._cdf: tuple[list[int], list[int]] | None = None
+
+    def add(self, value: float, count: int = 1) -> None:
+        self.counts[bucket_index(value)] += count
+        self._cdf = None
+
+    def merge(self, other: "QuantileSketch") -> None:
+        for index, count in other.counts.items():
+            self.counts[index] += count
+        self._cdf = None
+
+    def _cumulative(self) -> tuple[list[int], list[int]]:
+        if self._cdf is None:
+            keys = sorted(k for k, c in self.counts.items() if c > 0)
+            cumulative, running = [], 0
+            for k in keys:
+                running += self.counts[k]
+                cumulative.append(running)
+            self._cdf = keys, cumulative
+        return self._cdf
+
+    @property
+    def count(self) -> int:
+        cumulative = self._cumulative()[1]
+        return cumulative[-1] if cumulative else 0
+
+    def quantile(self, q: float) -> float | None:
+        """Estimate of the value at rank q * (count - 1); None for an empty sketch."""
+        keys, cumulative = self._cumulative()
+        if not keys:
+            return None
+        rank = q * (cumulative[-1] - 1)
+        return bucket_value(keys[bisect_right(cumulative, rank)])
+
+    def rank(self, value: float) -> float | None:
+        """Fraction of values at or below `value` (exact up to the bucket holding `value`)."""
+        keys, cumulative = self._cumulative()
+        if not keys:
+            return None
+        position = bisect_right(keys, bucket_index(value))
+        return cumulative[position - 1] / cumulative[-1] if position else 0.0
+
+
+def _workout_samples(day_sets, sign: int, names: dict[int, str], deltas: dict) -> None:
+    """Add one workout's samples (reps and weight per set, volume per exercise) to `deltas`."""
+    volume: dict[int, float] = defaultdict(float)
+    for s in day_sets:
+        name = names.get(s.exercise_id)
+        if name is None:
+            continue
+        if s.reps >= 1:
+            deltas[(name, "weight_kg")][bucket_index(s.weight_kg)] += sign
+        deltas[(name, "reps")][bucket_index(s.reps)] += sign
+        volume[s.exercise_id] += s.reps * s.weight_kg
+    for exercise_id, total in volume.items():
+        deltas[(names[exercise_id], "session_volume_kg")][bucket_index(total)] += sign
+
+
+def stage_sketch_deltas(db: Session, added=(), removed=()) -> None:
+    """Queue the sketch deltas of a workout write; they reach the store when `db` commits.
+
+    `added`/`removed` are `(date, sets)` pairs as passed to services.workouts._record_change.
+    """
+    exercise_ids = {s.exercise_id for _, sets in (*added, *removed) for s in sets}
+    if not exercise_ids or not settings.quantile_sketches_enabled:
+        return
+    names = {
+        id_: normalize_name(name)
+        for id_, name in db.execute(select(Exercise.id, Exercise.name).where(Exercise.id.in_(exercise_ids)))
+    }
+    deltas: dict[tuple, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+    for sign, workouts in ((1, added), (-1, removed)):
+        for _, sets in workouts:
+            _workout_samples(sets, sign, names, deltas)
+    db.info.setdefault("sketch_deltas", []).append(deltas)
+
+
+def stage_sketch_rename(db: Session, exercise_id: int, old_name: str, new_name: str) -> None:
+    """Queue moving an exercise's samples from its old name's sketches to its new name's.
+
+    Sketches are keyed by name, so without this a later delete of one of its workouts would
+    subtract from the new name what was only ever added under the old one.
+    """
+    old, new = normalize_name(old_name), normalize_name(new_name)
+    if old == new or not settings.quantile_sketches_enabled:
+        return
+    rows = db.execute(
+        select(Set.workout_id, Set.exercise_id, Set.reps, Set.weight_kg)
+        .where(Set.exercise_id == exercise_id)
+        .order_by(Set.workout_id)
+    ).all()
+    deltas: dict[tuple, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+    for sign, name in ((-1, old), (1, new)):
+        for _, workout_sets in groupby(rows, key=lambda r: r.workout_id):
+            _workout_samples(list(workout_sets), sign, {exercise_id: name}, deltas)
+    if deltas:
+        db.info.setdefault("sketch_deltas", []).append(deltas)
+
+
+class SketchStore:
+    def __init__(self, cache_seconds: float = 30.0):
+        self.cache_seconds = cache_seconds
+        self._pending: dict[tuple, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self._cache: dict[tuple, tuple[float, QuantileSketch]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, deltas: dict[tuple, dict[int, int]]) -> None:
+        with self._lock:
+            for key, buckets in deltas.items():
+                pending = self._pending[key]
+                for index, count in buckets.items():
+                    pending[index] += count
+
+    def pending_keys(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def flush(self, db: Session) -> int:
+        """Add pending deltas to the persisted buckets; returns the number of bucket rows touched.
+
+        On failure the deltas go back to pending for the next flush.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(lambda: defaultdict(int))
+        rows = _bucket_rows(pending)
+        if not rows:
+            return 0
+        try:
+            _add_buckets(db, rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            self.record(pending)
+            raise
+        with self._lock:
+            for key in pending:
+                self._cache.pop(key, None)
+        return len(rows)
+
+    def get(self, db: Session, exercise_name: str, metric: str) -> QuantileSketch:
+        """The merged sketch as last persisted by any worker (cached for `cache_seconds`)."""
+        key = (normalize_name(exercise_name), metric)
+        cached = self._cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.cache_seconds:
+            return cached[1]
+        sketch = QuantileSketch(dict(db.execute(
+            select(QuantileSketchBucket.bucket, QuantileSketchBucket.count).where(
+                QuantileSketchBucket.exercise_name == key[0], QuantileSketchBucket.metric == metric
+            )
+        ).all()))
+        sketch._cumulative()  # built once here, so queries against the cached sketch only bisect
+        self._cache[key] = (time.monotonic(), sketch)
+        return sketch
+
+    def reset(self) -> None:
+        with self._lock:
+            self._pending.clear()
+            self._cache.clear()
+
+
+sketches = SketchStore(cache_seconds=settings.quantile_sketch_flush_seconds)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_sketch_deltas(session: Session) -> None:
+    if session.in_nested_transaction():  # a released SAVEPOINT, the outer transaction may still roll back
+        return
+    for deltas in session.info.pop("sketch_deltas", ()):
+        sketches.record(deltas)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_sketch_deltas(session: Session, transaction) -> None:
+    if transaction.parent is None:  # top-level end without a commit: rolled back or closed
+        session.info.pop("sketch_deltas", None)
+
+
+def _bucket_rows(deltas: dict[tuple, dict[int, int]]) -> list[dict]:
+    return [
+        {"exercise_name": name, "metric": metric, "bucket": index, "count": count}
+        for (name, metric), buckets in sorted(deltas.items())  # fixed lock order across workers
+        for index, count in sorted(buckets.items())
+        if count
+    ]
+
+
+def _add_buckets(db: Session, rows: list[dict]) -> None:
+    stmt = upsert(db, QuantileSketchBucket.__table__, lambda c, excluded: {"count": c.count + excluded.count})
+    db.execute(stmt, rows)
+
+
+def rebuild_sketches(db: Session, workouts_per_chunk: int = 5000) -> int:
+    """Replace every persisted sketch with one computed from all sets; returns the sets read.
+
+    One transaction, reading workouts in id order `workouts_per_chunk` at a time. Meant for
+    first enabling sketches or after a restore: writes committed while it runs may be counted
+    twice, once here and once by their own flush.
+    """
+    db.execute(delete(QuantileSketchBucket))
+    sets_read = 0
+    last_id = 0
+    while True:
+        workout_ids = db.scalars(
+            select(Workout.id).where(Workout.id > last_id).order_by(Workout.id).limit(workouts_per_chunk)
+        ).all()
+        if not workout_ids:
+            break
+        rows = db.execute(
+            select(Workout.id, Set.exercise_id, Set.reps, Set.weight_kg, Exercise.name)
+            .join(Set, Set.workout_id == Workout.id)
+            .join(Exercise, Exercise.id == Set.exercise_id)
+            .where(Workout.id.in_(workout_ids))
+            .order_by(Workout.id)
+        ).all()
+        names = {r.exercise_id: normalize_name(r.name) for r in rows}
+        deltas: dict[tuple, dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        for _, workout_sets in groupby(rows, key=lambda r: r.id):
+            _workout_samples(list(workout_sets), 1, names, deltas)
+        if deltas:
+            _add_buckets(db, _bucket_rows(deltas))
+        sets_read += len(rows)
+        last_id = workout_ids[-1]
+    db.commit()
+    sketches.reset()
+    return sets_read
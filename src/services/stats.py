@@ -1,19 +1,108 @@
-from sqlalchemy import func
+from dataclasses import dataclass
+
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from adapters.sqlalchemy.models import Workout, Set
+from adapters.sqlalchemy.models import Workout, Set, UserStats
+from services.data_version import bump_data_versions
 
 
 def get_user_stats(db: Session, user_id: int) -> dict:
-    total_workouts = db.query(func.count(Workout.id)).filter(Workout.user_id == user_id).scalar() or 0
-    total_sets = db.query(func.count(Set.id)).join(Workout, Workout.id == Set.workout_id).filter(Workout.user_id == user_id).scalar() or 0
-    avg_reps = (
-        db.query(func.avg(Set.reps)).join(Workout, Workout.id == Set.workout_id).filter(Workout.user_id == user_id).scalar()
-    )
+    row: UserStats | None = db.get(UserStats, user_id)
+    if row is None or row.set_count == 0:
+        avg_reps = None
+    else:
+        avg_reps = row.reps_sum / row.set_count
     return {
-        "total_workouts": int(total_workouts),
-        "avg_reps": float(avg_reps) if avg_reps is not None else None,
-        "total_sets": int(total_sets),
+        "total_workouts": row.workout_count if row else 0,
+        "avg_reps": avg_reps,
+        "total_sets": row.set_count if row else 0,
+        "total_volume_kg": row.volume_kg if row else 0.0,
     }
 
 
+def apply_stats_delta(
+    db: Session, user_id: int, workouts: int = 0, sets: int = 0, reps: int = 0, volume_kg: float = 0.0
+) -> None:
+    """Add deltas to the user's aggregate row inside the caller's transaction."""
+    stmt = (
+        update(UserStats)
+        .where(UserStats.user_id == user_id)
+        .values(
+            workout_count=UserStats.workout_count + workouts,
+            set_count=UserStats.set_count + sets,
+            reps_sum=UserStats.reps_sum + reps,
+            volume_kg=UserStats.volume_kg + volume_kg,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if db.execute(stmt).rowcount:
+        return
+    try:
+        with db.begin_nested():
+            db.add(UserStats(
+                user_id=user_id, workout_count=workouts, set_count=sets, reps_sum=reps, volume_kg=volume_kg,
+            ))
+    except IntegrityError:
+        # A concurrent writer created the row first
+        db.execute(stmt)
+
+
+@dataclass
+class StatsDrift:
+    user_id: int
+    stored: tuple
+    actual: tuple
+
+
+def _compute_all_stats(db: Session) -> dict[int, tuple]:
+    actual: dict[int, tuple] = {}
+    workout_rows = db.execute(select(Workout.user_id, func.count(Workout.id)).group_by(Workout.user_id))
+    for user_id, workout_count in workout_rows:
+        actual[user_id] = (workout_count, 0, 0, 0.0)
+    set_rows = db.execute(
+        select(
+            Workout.user_id,
+            func.count(Set.id),
+            func.coalesce(func.sum(Set.reps), 0),
+            func.coalesce(func.sum(Set.reps * Set.weight_kg), 0.0),
+        )
+        .select_from(Set)
+        .join(Workout, Workout.id == Set.workout_id)
+        .group_by(Workout.user_id)
+    )
+    for user_id, set_count, reps_sum, volume_kg in set_rows:
+        workout_count = actual.get(user_id, (0,))[0]
+        actual[user_id] = (workout_count, int(set_count), int(reps_sum), float(volume_kg))
+    return actual
+
+
+def rebuild_user_stats(db: Session, check_only: bool = False, tolerance: float = 1e-6) -> list[StatsDrift]:
+    """Recompute every user's aggregate row from workouts/sets and report rows that drifted.
+
+    Unless `check_only`, drifted or missing rows are overwritten, their users' data versions
+    bumped (so cached ETags stop matching) and the session is committed.
+    """
+    actual = _compute_all_stats(db)
+    stored = {row.user_id: row for row in db.scalars(select(UserStats))}
+    drift: list[StatsDrift] = []
+    for user_id in sorted(actual.keys() | stored.keys()):
+        want = actual.get(user_id, (0, 0, 0, 0.0))
+        row = stored.get(user_id)
+        have = (row.workout_count, row.set_count, row.reps_sum, row.volume_kg) if row else None
+        if have is not None and have[:3] == want[:3] and abs(have[3] - want[3]) <= tolerance:
+            continue
+        if have is None and want == (0, 0, 0, 0.0):
+            continue
+        drift.append(StatsDrift(user_id=user_id, stored=have, actual=want))
+        if check_only:
+            continue
+        if row is None:
+            row = UserStats(user_id=user_id)
+            db.add(row)
+        row.workout_count, row.set_count, row.reps_sum, row.volume_kg = want
+    if not check_only:
+        bump_data_versions(db, [d.user_id for d in drift])
+        db.commit()
+    return drift
@@ -1,9 +1,40 @@
-from sqlalchemy.orm import Session
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date
+
+from sqlalchemy import Row, func, insert, lambda_stmt, or_, select, update
+from sqlalchemy.orm import Session, selectinload
 from typing import List
 
-from adapters.sqlalchemy.models import Workout, Set
-from domain.schemas import WorkoutCreate, WorkoutUpdate
+from adapters.sqlalchemy.models import Exercise, Workout, Set
+from domain.schemas import (
+    NewRecord, PaginatedResponse, WorkoutCreate, WorkoutCreated, WorkoutRead, WorkoutSummaryRead, WorkoutUpdate,
+)
 from domain.exceptions import NotFound, Forbidden
+from services.data_version import bump_data_version, bump_data_versions
+from services.pagination import paginate
+from services.records import recompute_records, record_workouts, records_held_by
+from services.rollups import apply_rollup_deltas, rollup_deltas
+from services.sketches import stage_sketch_deltas
+from services.stats import apply_stats_delta
+
+
+WORKOUT_COLUMNS = (Workout.id, Workout.user_id, Workout.date, Workout.note)
+SET_COLUMNS = (Set.id, Set.workout_id, Set.exercise_id, Set.reps, Set.weight_kg)
+WORKOUT_SUMMARY_COLUMNS = WORKOUT_COLUMNS + (
+    Workout.set_count, Workout.total_reps, Workout.total_volume_kg, Workout.exercise_count,
+)
+
+
+@dataclass(slots=True)
+class WorkoutRow:
+    """Read-only workout projection: column values and set Rows, untracked by any session."""
+
+    id: int
+    user_id: int
+    date: date
+    note: str | None
+    sets: list
 
 
 def ensure_owner(entity_user_id: int, current_user_id: int) -> None:
@@ -11,44 +42,249 @@ def ensure_owner(entity_user_id: int, current_user_id: int) -> None:
         raise Forbidden("You do not have access to this resource")
 
 
-def create_workout(db: Session, user_id: int, data: WorkoutCreate) -> Workout:
-    workout = Workout(user_id=user_id, date=data.date, note=data.note)
+def _attach_sets(db: Session, rows: list[Row]) -> list[WorkoutRow]:
+    """Fetch the sets of all `rows` in one projected query and group them per workout."""
+    if not rows:
+        return []
+    sets_by_workout: dict[int, list] = defaultdict(list)
+    stmt = (
+        select(*SET_COLUMNS)
+        .where(Set.workout_id.in_([r.id for r in rows]))
+        .order_by(Set.workout_id, Set.id)  # index order, so no sort step
+    )
+    for s in db.execute(stmt):
+        sets_by_workout[s.workout_id].append(s)
+    return [WorkoutRow(r.id, r.user_id, r.date, r.note, sets_by_workout[r.id]) for r in rows]
+
+
+def summarize_sets(sets) -> dict:
+    """Workout summary column values for set-like objects (SetCreate or Set)."""
+    return {
+        "set_count": len(sets),
+        "total_reps": sum(s.reps for s in sets),
+        "total_volume_kg": sum(s.reps * s.weight_kg for s in sets),
+        "exercise_count": len({s.exercise_id for s in sets}),
+    }
+
+
+def _record_change(db: Session, user_id: int, workouts: int = 0, added=(), removed=()) -> None:
+    """Keep derived per-user data in step with a workout write, in the same transaction.
+
+    `added`/`removed` are `(date, sets)` pairs, one per workout, where sets are set-like
+    objects (SetCreate or Set) carrying exercise_id, reps and weight_kg.
+    """
+    added_sets = [s for _, sets in added for s in sets]
+    removed_sets = [s for _, sets in removed for s in sets]
+    sets = len(added_sets) - len(removed_sets)
+    reps = sum(s.reps for s in added_sets) - sum(s.reps for s in removed_sets)
+    volume = (
+        sum(s.reps * s.weight_kg for s in added_sets) - sum(s.reps * s.weight_kg for s in removed_sets)
+    )
+    if workouts or sets:
+        apply_stats_delta(db, user_id, workouts=workouts, sets=sets, reps=reps, volume_kg=volume)
+    apply_rollup_deltas(db, user_id, rollup_deltas(added, removed))
+    if added_sets != removed_sets:  # a date move re-adds the very same sets: no sample changes
+        stage_sketch_deltas(db, added, removed)
+    bump_data_version(db, user_id)
+
+
+def create_workout(db: Session, user_id: int, data: WorkoutCreate) -> WorkoutCreated:
+    """Create a workout; the result also lists the personal records it set."""
+    workout = Workout(user_id=user_id, date=data.date, note=data.note, **summarize_sets(data.sets))
     db.add(workout)
     db.flush()
     for s in data.sets:
         db.add(Set(workout_id=workout.id, exercise_id=s.exercise_id, reps=s.reps, weight_kg=s.weight_kg))
     db.flush()
+    _record_change(db, user_id, workouts=1, added=[(data.date, data.sets)])
+    new_records = record_workouts(db, user_id, [(workout.id, data.date, data.sets)])
     db.commit()
-    db.refresh(workout)
-    return workout
+    created = WorkoutCreated.model_validate(get_workout(db, user_id, workout.id))
+    return created.model_copy(update={"new_records": [NewRecord(**r) for r in new_records]})
 
 
-def get_workout(db: Session, user_id: int, workout_id: int) -> Workout:
-    workout: Workout | None = (
-        db.query(Workout)
-        .filter(Workout.id == workout_id, Workout.user_id == user_id)
-        .first()
+def import_workouts(
+    db: Session, user_id: int, items: list[tuple[int, WorkoutCreate]], owned_exercises: set[int]
+) -> list[dict]:
+    """Insert one chunk of validated workouts in a single transaction with multi-row INSERTs.
+
+    `items` pairs each workout with its position in the caller's payload. Exercise ownership is
+    checked with one query for ids not already in `owned_exercises`, which the caller keeps
+    across chunks. Returns a result dict per item; workouts referencing foreign or unknown
+    exercises are rejected individually.
+    """
+    referenced = {s.exercise_id for _, w in items for s in w.sets}
+    unseen = referenced - owned_exercises
+    if unseen:
+        owned_exercises.update(
+            db.scalars(select(Exercise.id).where(Exercise.user_id == user_id, Exercise.id.in_(unseen)))
+        )
+
+    results: list[dict] = []
+    accepted: list[tuple[int, WorkoutCreate]] = []
+    for index, w in items:
+        missing = sorted({s.exercise_id for s in w.sets} - owned_exercises)
+        if missing:
+            results.append({"index": index, "status": "error", "errors": [
+                {"loc": ["sets", "exercise_id"], "msg": f"Exercise not found: {missing}"}
+            ]})
+        else:
+            accepted.append((index, w))
+    if not accepted:
+        return results
+
+    workout_rows = [
+        {"user_id": user_id, "date": w.date, "note": w.note, **summarize_sets(w.sets)} for _, w in accepted
+    ]
+    if db.get_bind().dialect.name == "sqlite":
+        # SQLite can't batch an ordered RETURNING, but rowids from these INSERTs are allocated
+        # in VALUES order, so sorting the returned ids restores the parameter order
+        workout_ids = sorted(db.scalars(insert(Workout).returning(Workout.id), workout_rows).all())
+    else:
+        workout_ids = db.scalars(
+            insert(Workout).returning(Workout.id, sort_by_parameter_order=True), workout_rows
+        ).all()
+    set_rows = [
+        {"workout_id": wid, "exercise_id": s.exercise_id, "reps": s.reps, "weight_kg": s.weight_kg}
+        for wid, (_, w) in zip(workout_ids, accepted)
+        for s in w.sets
+    ]
+    if set_rows:
+        db.execute(insert(Set), set_rows)
+    _record_change(db, user_id, workouts=len(accepted), added=[(w.date, w.sets) for _, w in accepted])
+    record_workouts(db, user_id, [(wid, w.date, w.sets) for wid, (_, w) in zip(workout_ids, accepted)])
+    db.commit()
+    results.extend(
+        {"index": index, "status": "created", "id": wid} for wid, (index, _) in zip(workout_ids, accepted)
     )
+    return results
+
+
+def get_workout(db: Session, user_id: int, workout_id: int) -> Workout:
+    workout: Workout | None = db.scalars(lambda_stmt(
+        lambda: select(Workout)
+        .options(selectinload(Workout.sets))
+        .where(Workout.id == workout_id, Workout.user_id == user_id)
+    )).first()
     if not workout:
         raise NotFound("Workout not found")
     return workout
 
 
+def read_workout(db: Session, user_id: int, workout_id: int) -> WorkoutRead:
+    row = db.execute(lambda_stmt(
+        lambda: select(*WORKOUT_COLUMNS).where(Workout.id == workout_id, Workout.user_id == user_id)
+    )).first()
+    if row is None:
+        raise NotFound("Workout not found")
+    return WorkoutRead.model_validate(_attach_sets(db, [row])[0])
+
+
 def update_workout(db: Session, user_id: int, workout_id: int, data: WorkoutUpdate) -> Workout:
     workout = get_workout(db, user_id, workout_id)
+    old_date = workout.date
     if data.date is not None:
         workout.date = data.date
     if data.note is not None:
         workout.note = data.note
     db.flush()
+    if workout.date != old_date:
+        # The sets move to other day/week/month buckets
+        sets = list(workout.sets)
+        _record_change(db, user_id, added=[(workout.date, sets)], removed=[(old_date, sets)])
+        recompute_records(db, user_id, {s.exercise_id for s in sets})
+    else:
+        bump_data_version(db, user_id)
     db.commit()
-    db.refresh(workout)
-    return workout
+    return get_workout(db, user_id, workout_id)
 
 
 def delete_workout(db: Session, user_id: int, workout_id: int) -> None:
     workout = get_workout(db, user_id, workout_id)
+    _record_change(db, user_id, workouts=-1, removed=[(workout.date, list(workout.sets))])
+    affected = records_held_by(db, user_id, workout_id)
     db.delete(workout)
+    db.flush()
+    recompute_records(db, user_id, affected)
     db.commit()
 
 
+def list_workouts(
+    db: Session,
+    user_id: int,
+    limit: int,
+    offset: int = 0,
+    cursor: str | None = None,
+    include_total: bool = False,
+) -> PaginatedResponse[WorkoutRead]:
+    page = paginate(
+        db, select(*WORKOUT_COLUMNS).where(Workout.user_id == user_id), [Workout.date, Workout.id],
+        descending=True, limit=limit, offset=offset, cursor=cursor, include_total=include_total,
+    )
+    page["items"] = _attach_sets(db, page["items"])
+    return PaginatedResponse[WorkoutRead].model_validate(page, from_attributes=True)
+
+
+def list_workout_summaries(
+    db: Session,
+    user_id: int,
+    limit: int,
+    offset: int = 0,
+    cursor: str | None = None,
+    include_total: bool = False,
+) -> PaginatedResponse[WorkoutSummaryRead]:
+    """Like list_workouts, but with the summary columns instead of sets: one query, no sets read."""
+    page = paginate(
+        db, select(*WORKOUT_SUMMARY_COLUMNS).where(Workout.user_id == user_id), [Workout.date, Workout.id],
+        descending=True, limit=limit, offset=offset, cursor=cursor, include_total=include_total,
+    )
+    return PaginatedResponse[WorkoutSummaryRead].model_validate(page, from_attributes=True)
+
+
+def list_all_workouts(
+    db: Session,
+    limit: int,
+    offset: int = 0,
+    cursor: str | None = None,
+    include_total: bool = False,
+) -> PaginatedResponse[WorkoutRead]:
+    page = paginate(
+        db, select(*WORKOUT_COLUMNS), [Workout.date, Workout.id],
+        descending=True, limit=limit, offset=offset, cursor=cursor, include_total=include_total,
+    )
+    page["items"] = _attach_sets(db, page["items"])
+    return PaginatedResponse[WorkoutRead].model_validate(page, from_attributes=True)
+
+
+def rebuild_workout_summaries(db: Session, check_only: bool = False, tolerance: float = 1e-6) -> list[int]:
+    """Recompute summary columns from sets; returns the ids of workouts whose stored values drifted.
+
+    Unless `check_only`, drifted rows are overwritten, their owners' data versions bumped and
+    the session is committed.
+    """
+    def per_workout(agg):
+        return select(agg).where(Set.workout_id == Workout.id).scalar_subquery()
+
+    actual = {
+        "set_count": per_workout(func.count(Set.id)),
+        "total_reps": per_workout(func.coalesce(func.sum(Set.reps), 0)),
+        "total_volume_kg": per_workout(func.coalesce(func.sum(Set.reps * Set.weight_kg), 0.0)),
+        "exercise_count": per_workout(func.count(Set.exercise_id.distinct())),
+    }
+    drifted = or_(
+        Workout.set_count != actual["set_count"],
+        Workout.total_reps != actual["total_reps"],
+        func.abs(Workout.total_volume_kg - actual["total_volume_kg"]) > tolerance,
+        Workout.exercise_count != actual["exercise_count"],
+    )
+    rows = db.execute(select(Workout.id, Workout.user_id).where(drifted).order_by(Workout.id)).all()
+    ids = [r.id for r in rows]
+    if ids and not check_only:
+        db.execute(
+            update(Workout).where(drifted).values(**actual),
+            execution_options={"synchronize_session": False},
+        )
+        bump_data_versions(db, [r.user_id for r in rows])
+    if not check_only:
+        db.commit()
+    return ids
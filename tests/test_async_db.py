@@ -0,0 +1,81 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from tests.conftest import auth_headers
+from app.main import app
+from app.dependencies.auth import principal_cache
+from app.dependencies.db import Base, get_db, get_session_factory, is_async_url
+
+
+pytest.importorskip("aiosqlite")
+
+
+@pytest.fixture
+def async_client(tmp_path):
+    path = tmp_path / "async.db"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=sync_engine)
+    sync_engine.dispose()
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}", poolclass=NullPool)
+    AsyncTestingSession = async_sessionmaker(engine, autoflush=False)
+
+    async def override_get_db():
+        async with AsyncTestingSession() as db:
+            yield db
+
+    principal_cache.clear()
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: AsyncTestingSession
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_async_driver_detection():
+    assert is_async_url("sqlite+aiosqlite:///./workout.db")
+    assert is_async_url("postgresql+asyncpg://u:p@db/app")
+    assert not is_async_url("sqlite:///./workout.db")
+    assert not is_async_url("postgresql+psycopg2://u:p@db/app")
+
+
+def test_crud_flow_on_async_session(async_client):
+    client = async_client
+    assert client.post("/auth/register", json={"email": "a@test.com", "password": "password123"}).status_code == 201
+    tokens = client.post("/auth/login", json={"email": "a@test.com", "password": "password123"}).json()
+    headers = auth_headers(tokens["access_token"])
+
+    exercise = client.post("/api/v1/exercises", json={"name": "Squat"}, headers=headers)
+    assert exercise.status_code == 201
+    exercise_id = exercise.json()["id"]
+
+    created = client.post(
+        "/api/v1/workouts",
+        json={"date": "2024-01-01", "sets": [{"exercise_id": exercise_id, "reps": 5, "weight_kg": 100.0}]},
+        headers=headers,
+    )
+    assert created.status_code == 201
+    assert len(created.json()["sets"]) == 1
+    workout_id = created.json()["id"]
+
+    updated = client.patch(f"/api/v1/workouts/{workout_id}", json={"note": "heavy"}, headers=headers)
+    assert updated.status_code == 200
+    assert updated.json()["note"] == "heavy"
+    assert len(updated.json()["sets"]) == 1
+
+    listed = client.get("/api/v1/workouts", headers=headers).json()
+    assert len(listed["items"]) == 1
+    assert listed["items"][0]["sets"][0]["reps"] == 5
+
+    exported = client.get("/api/v1/export", headers=headers)
+    assert exported.status_code == 200
+    assert len(exported.text.splitlines()) == 1
+
+    stats = client.get("/api/v1/stats", headers=headers).json()
+    assert stats["total_workouts"] == 1
+    assert stats["total_sets"] == 1
+
+    assert client.delete(f"/api/v1/workouts/{workout_id}", headers=headers).status_code == 204
+    assert client.get(f"/api/v1/workouts/{workout_id}", headers=headers).status_code == 404
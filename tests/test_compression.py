@@ -0,0 +1,101 @@
+import asyncio
+import gzip
+import zlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response
+from fastapi.testclient import TestClient
+
+from tests.conftest import auth_headers
+from app.compression import CompressionMiddleware, negotiate_encoding
+
+
+def _app() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/big")
+    async def big():
+        return PlainTextResponse("x" * 1000, headers={"ETag": '"v1"'})
+
+    @app.get("/small")
+    async def small():
+        return PlainTextResponse("tiny")
+
+    @app.get("/encoded")
+    async def encoded():
+        return Response(gzip.compress(b"y" * 1000), media_type="text/plain", headers={"Content-Encoding": "gzip"})
+
+    return TestClient(app)
+
+
+def test_negotiate_encoding():
+    assert negotiate_encoding("gzip, deflate, zstd", zstd_available=True) == "zstd"
+    assert negotiate_encoding("gzip, deflate, zstd", zstd_available=False) == "gzip"
+    assert negotiate_encoding("zstd;q=0.5, gzip", zstd_available=True) == "gzip"
+    assert negotiate_encoding("gzip;q=0", zstd_available=False) is None
+    assert negotiate_encoding("*", zstd_available=False) == "gzip"
+    assert negotiate_encoding("identity", zstd_available=True) is None
+    assert negotiate_encoding("", zstd_available=True) is None
+
+
+def test_compresses_above_threshold_only():
+    client = _app()
+    big = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert big.headers["content-encoding"] == "gzip"
+    assert big.headers["vary"] == "Accept-Encoding"
+    assert big.headers["etag"] == 'W/"v1"'
+    assert int(big.headers["content-length"]) < 1000
+    assert big.text == "x" * 1000
+
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    assert small.text == "tiny"
+
+
+def test_zstd_when_accepted():
+    pytest.importorskip("zstandard")
+    response = _app().get("/big", headers={"Accept-Encoding": "zstd, gzip"})
+    assert response.headers["content-encoding"] == "zstd"
+    assert response.text == "x" * 1000
+
+
+def test_already_encoded_responses_pass_through():
+    response = _app().get("/encoded", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text == "y" * 1000
+
+
+def test_streaming_chunks_are_flushed_individually():
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/x-ndjson")]})
+        for i in range(3):
+            await send({"type": "http.response.body", "body": f"line {i}\n".encode(), "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", b"gzip")]}
+    asyncio.run(CompressionMiddleware(app, minimum_size=100)(scope, None, send))
+
+    start, *bodies = sent
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+    decoder = zlib.decompressobj(31)
+    # each chunk decodes on its own as soon as it is sent
+    assert [decoder.decompress(m["body"]) for m in bodies] == [b"line 0\n", b"line 1\n", b"line 2\n", b""]
+    assert decoder.eof
+
+
+def test_workout_list_is_compressed(client, user1_tokens):
+    headers = auth_headers(user1_tokens["access_token"])
+    client.post("/api/v1/workouts/bulk", json=[{"date": "2024-01-01", "note": "n" * 100}] * 30, headers=headers)
+    response = client.get("/api/v1/workouts?limit=30", headers={**headers, "Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()["items"]) == 30
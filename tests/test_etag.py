@@ -0,0 +1,110 @@
+from tests.conftest import auth_headers
+from adapters.sqlalchemy.query_counter import QueryCounter
+from app.dependencies.etag import etag_matches
+
+
+def test_etag_matching():
+    assert etag_matches('W/"1.3"', 'W/"1.3"')
+    assert etag_matches('"1.3"', 'W/"1.3"')
+    assert etag_matches('W/"1.2", W/"1.3"', 'W/"1.3"')
+    assert etag_matches("*", 'W/"1.3"')
+    assert not etag_matches('W/"1.2"', 'W/"1.3"')
+    assert not etag_matches(None, 'W/"1.3"')
+
+
+def test_conditional_get_returns_304_until_data_changes(client, test_db, user1_tokens):
+    headers = auth_headers(user1_tokens["access_token"])
+    first = client.get("/api/v1/workouts", headers=headers)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+
+    with QueryCounter(test_db.get_bind()) as counter:
+        cached = client.get("/api/v1/workouts", headers={**headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+    assert counter.count == 1
+
+    exercise_id = client.post("/api/v1/exercises", json={"name": "Squat"}, headers=headers).json()["id"]
+    client.post(
+        "/api/v1/workouts",
+        json={"date": "2024-01-01", "sets": [{"exercise_id": exercise_id, "reps": 5, "weight_kg": 100.0}]},
+        headers=headers,
+    )
+    fresh = client.get("/api/v1/workouts", headers={**headers, "If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert len(fresh.json()["items"]) == 1
+    assert fresh.headers["etag"] != etag
+
+
+def test_every_write_bumps_the_version(client, user1_tokens):
+    headers = auth_headers(user1_tokens["access_token"])
+    seen = {client.get("/api/v1/stats", headers=headers).headers["etag"]}
+
+    def assert_changed():
+        etag = client.get("/api/v1/exercises", headers=headers).headers["etag"]
+        assert etag not in seen
+        seen.add(etag)
+
+    exercise_id = client.post("/api/v1/exercises", json={"name": "Squat"}, headers=headers).json()["id"]
+    assert_changed()
+    client.patch(f"/api/v1/exercises/{exercise_id}", json={"name": "Back Squat"}, headers=headers)
+    assert_changed()
+    workout_id = client.post("/api/v1/workouts", json={"date": "2024-01-01", "sets": []}, headers=headers).json()["id"]
+    assert_changed()
+    client.patch(f"/api/v1/workouts/{workout_id}", json={"note": "easy"}, headers=headers)
+    assert_changed()
+    client.post("/api/v1/workouts/bulk", json=[{"date": "2024-01-02", "sets": []}], headers=headers)
+    assert_changed()
+    client.delete(f"/api/v1/workouts/{workout_id}", headers=headers)
+    assert_changed()
+    client.delete(f"/api/v1/exercises/{exercise_id}", headers=headers)
+    assert_changed()
+
+
+def test_etag_is_per_user(client, user1_tokens, user2_tokens):
+    etag1 = client.get("/api/v1/stats", headers=auth_headers(user1_tokens["access_token"])).headers["etag"]
+    response = client.get(
+        "/api/v1/stats", headers={**auth_headers(user2_tokens["access_token"]), "If-None-Match": etag1}
+    )
+    assert response.status_code == 200
+
+
+def test_rebuilds_invalidate_cached_etags(client, test_db, user1_tokens):
+    """Test drift repairs and backfills bump the data version of the users they rewrite"""
+    from adapters.sqlalchemy.models import UserStats, Workout
+    from services.rollups import rebuild_rollups
+    from services.stats import rebuild_user_stats
+    from services.workouts import rebuild_workout_summaries
+
+    headers = auth_headers(user1_tokens["access_token"])
+    exercise_id = client.post("/api/v1/exercises", json={"name": "Squat"}, headers=headers).json()["id"]
+    client.post(
+        "/api/v1/workouts",
+        json={"date": "2024-01-01", "sets": [{"exercise_id": exercise_id, "reps": 5, "weight_kg": 100.0}]},
+        headers=headers,
+    )
+
+    def repaired(url, corrupt, rebuild):
+        etag = client.get(url, headers=headers).headers["etag"]
+        corrupt()
+        test_db.commit()
+        assert client.get(url, headers={**headers, "If-None-Match": etag}).status_code == 304
+        rebuild(test_db)
+        return client.get(url, headers={**headers, "If-None-Match": etag})
+
+    def corrupt_stats():
+        test_db.query(UserStats).update({"set_count": 99})
+
+    response = repaired("/api/v1/stats", corrupt_stats, rebuild_user_stats)
+    assert (response.status_code, response.json()["total_sets"]) == (200, 1)
+
+    def corrupt_summaries():
+        test_db.query(Workout).update({"set_count": 99})
+
+    response = repaired("/api/v1/workouts?view=summary", corrupt_summaries, rebuild_workout_summaries)
+    assert (response.status_code, response.json()["items"][0]["set_count"]) == (200, 1)
+
+    response = repaired("/api/v1/stats/timeseries", lambda: None, rebuild_rollups)
+    assert response.status_code == 200
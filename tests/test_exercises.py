@@ -102,7 +102,7 @@ def test_list_own_exercises(client, user1_tokens):
     response = client.get("/api/v1/exercises?limit=10&offset=0", headers=headers)
     assert response.status_code == 200
     data = response.json()
-    assert data["total"] >= 3
+    assert data["total"] is None  # only counted when asked for
     assert len(data["items"]) >= 3
     
     # Check that exercises are sorted by name
@@ -237,7 +237,7 @@ def test_pagination(client, user1_tokens):
         )
     
     # Test pagination
-    response = client.get("/api/v1/exercises?limit=2&offset=0", headers=headers)
+    response = client.get("/api/v1/exercises?limit=2&offset=0&include_total=true", headers=headers)
     assert response.status_code == 200
     data = response.json()
     assert data["limit"] == 2
@@ -268,7 +268,27 @@ def test_exercises_are_user_scoped(client, user1_tokens, user2_tokens):
     user1_list = client.get("/api/v1/exercises", headers=user1_headers)
     user2_list = client.get("/api/v1/exercises", headers=user2_headers)
     
-    assert user1_list.json()["total"] == 1
-    assert user2_list.json()["total"] == 1
+    assert len(user1_list.json()["items"]) == 1
+    assert len(user2_list.json()["items"]) == 1
     assert user1_list.json()["items"][0]["name"] == "User1 Exercise"
     assert user2_list.json()["items"][0]["name"] == "User1 Exercise"
+
+
+def test_cursor_pagination(client, user1_tokens):
+    """Test keyset pagination over exercises ordered by name"""
+    headers = auth_headers(user1_tokens["access_token"])
+    names = ["Deadlift", "Bench Press", "Squat", "Row", "Curl"]
+    for name in names:
+        client.post("/api/v1/exercises", json={"name": name}, headers=headers)
+
+    seen = []
+    cursor = None
+    while True:
+        url = "/api/v1/exercises?limit=2" + (f"&cursor={cursor}" if cursor else "")
+        page = client.get(url, headers=headers).json()
+        seen += [e["name"] for e in page["items"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    assert seen == sorted(names)
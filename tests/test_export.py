@@ -0,0 +1,83 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from tests.conftest import auth_headers
+from app.main import app
+from app.dependencies.db import get_session_factory
+
+
+@pytest.fixture
+def export_client(client, test_db):
+    app.dependency_overrides[get_session_factory] = lambda: sessionmaker(bind=test_db.get_bind())
+    return client
+
+
+def _seed(client, headers):
+    exercise_id = client.post("/api/v1/exercises", json={"name": "Squat"}, headers=headers).json()["id"]
+    client.post(
+        "/api/v1/workouts",
+        json={"date": "2024-01-02", "note": "legs", "sets": [
+            {"exercise_id": exercise_id, "reps": 5, "weight_kg": 100.0},
+            {"exercise_id": exercise_id, "reps": 3, "weight_kg": 110.0},
+        ]},
+        headers=headers,
+    )
+    client.post("/api/v1/workouts", json={"date": "2024-01-01", "note": "rest"}, headers=headers)
+    return exercise_id
+
+
+def test_export_ndjson(export_client, user1_tokens):
+    """Test NDJSON export streams one workout per line, oldest first, with sets"""
+    headers = auth_headers(user1_tokens["access_token"])
+    _seed(export_client, headers)
+
+    response = export_client.get("/api/v1/export?format=ndjson", headers={**headers, "Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    assert "content-encoding" not in response.headers
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [w["date"] for w in lines] == ["2024-01-01", "2024-01-02"]
+    assert lines[0]["sets"] == []
+    assert [s["reps"] for s in lines[1]["sets"]] == [5, 3]
+
+
+def test_export_csv_has_one_row_per_set(export_client, user1_tokens):
+    """Test CSV export flattens sets and keeps set-less workouts"""
+    headers = auth_headers(user1_tokens["access_token"])
+    exercise_id = _seed(export_client, headers)
+
+    response = export_client.get("/api/v1/export?format=csv", headers={**headers, "Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 3
+    assert rows[0]["note"] == "rest" and rows[0]["set_id"] == ""
+    assert {r["exercise_id"] for r in rows[1:]} == {str(exercise_id)}
+
+
+def test_export_gzip(export_client, user1_tokens):
+    """Test export is gzip-encoded when the client accepts it"""
+    headers = auth_headers(user1_tokens["access_token"])
+    _seed(export_client, headers)
+
+    with export_client.stream("GET", "/api/v1/export", headers={**headers, "Accept-Encoding": "gzip"}) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        raw = b"".join(response.iter_raw())
+    assert len(gzip.decompress(raw).decode().splitlines()) == 2
+
+
+def test_export_is_user_scoped(export_client, user1_tokens, user2_tokens):
+    """Test export only contains the caller's workouts"""
+    _seed(export_client, auth_headers(user1_tokens["access_token"]))
+    response = export_client.get("/api/v1/export", headers=auth_headers(user2_tokens["access_token"]))
+    assert response.status_code == 200
+    assert response.text == ""
+
+
+def test_export_rejects_unknown_format(export_client, user1_tokens):
+    response = export_client.get("/api/v1/export?format=xml", headers=auth_headers(user1_tokens["access_token"]))
+    assert response.status_code == 422
@@ -0,0 +1,37 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.cli import main
+from app.dependencies.db import Base
+from app.index_advisor import advise, seed_dataset
+
+
+def test_service_queries_have_no_scans_or_sorts():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        user_id = seed_dataset(db, users=3, workouts_per_user=50)
+        reports = advise(db, user_id)
+
+    calls = {r.call for r in reports}
+    assert {"list_workouts", "list_exercises", "read_workout", "rebuild_user_stats"} <= calls
+    assert [(r.call, r.flags) for r in reports if r.flags] == []
+
+
+def test_advisor_flags_missing_index():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        user_id = seed_dataset(db, users=2, workouts_per_user=20)
+        db.connection().exec_driver_sql("DROP INDEX ix_workouts_date_id")
+        reports = advise(db, user_id)
+
+    flagged = {r.call: r.flags for r in reports if r.flags}
+    assert "list_all_workouts" in flagged
+    assert "use temp b-tree for order by" in flagged["list_all_workouts"]
+
+
+def test_explain_queries_command(capsys):
+    assert main(["explain-queries", "--users", "2", "--workouts", "20"]) == 0
+    assert "0 flagged" in capsys.readouterr().out
@@ -0,0 +1,81 @@
+import logging
+import re
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from tests.conftest import auth_headers
+from app.instrumentation import (
+    SqlInstrumentationMiddleware,
+    install_sql_hooks,
+    reset_route_sql_stats,
+    route_sql_stats,
+)
+
+
+@pytest.fixture
+def instrumented_client(client, test_db):
+    install_sql_hooks(test_db.get_bind())
+    reset_route_sql_stats()
+    return client
+
+
+def _query_count(response) -> int:
+    return int(re.search(r'desc="(\d+) queries"', response.headers["server-timing"]).group(1))
+
+
+def _probe(engine, **middleware):
+    probe = FastAPI()
+
+    @probe.get("/items")
+    def items():
+        with engine.connect() as conn:
+            for i in range(5):
+                conn.execute(text("SELECT :i"), {"i": i})
+        return {}
+
+    probe.add_middleware(SqlInstrumentationMiddleware, **middleware)
+    return TestClient(probe)
+
+
+def _engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    install_sql_hooks(engine)
+    return engine
+
+
+def test_server_timing_reports_query_count():
+    response = _probe(_engine(), server_timing=True).get("/items")
+    assert response.status_code == 200
+    assert "db;dur=" in response.headers["server-timing"]
+    assert "app;dur=" in response.headers["server-timing"]
+    assert _query_count(response) == 5
+
+
+def test_server_timing_is_off_by_default(instrumented_client, user1_tokens):
+    headers = auth_headers(user1_tokens["access_token"])
+    response = instrumented_client.get("/api/v1/workouts", headers=headers)
+    assert response.status_code == 200
+    assert "server-timing" not in response.headers
+    assert route_sql_stats()["/api/v1/workouts"]["queries"] >= 2
+
+
+def test_stats_are_aggregated_per_route_template(instrumented_client, user1_tokens):
+    headers = auth_headers(user1_tokens["access_token"])
+    for workout_id in (1, 2, 3):
+        instrumented_client.get(f"/api/v1/workouts/{workout_id}", headers=headers)
+
+    stats = route_sql_stats()
+    assert stats["/api/v1/workouts/{workout_id}"]["requests"] == 3
+    assert stats["/api/v1/workouts/{workout_id}"]["queries"] >= 3
+    assert "/api/v1/workouts/1" not in stats
+
+
+def test_n_plus_one_detector_warns_on_repeated_statement(caplog):
+    with caplog.at_level(logging.WARNING, logger="app.instrumentation"):
+        _probe(_engine(), n_plus_one_threshold=3).get("/items")
+
+    assert any("Possible N+1 in GET /items" in r.getMessage() for r in caplog.records)
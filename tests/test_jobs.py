@@ -0,0 +1,217 @@
+import fcntl
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from tests.conftest import auth_headers
+from app.main import app
+from app.dependencies.db import get_session_factory, get_writer_session_factory
+from app.settings import settings
+from adapters.sqlalchemy.models import Job, User
+from services import jobs as jobs_service
+from services.jobs import recover_jobs, runner
+
+
+@pytest.fixture
+def jobs_client(client, test_db, tmp_path, monkeypatch):
+    factory = sessionmaker(bind=test_db.get_bind())
+    app.dependency_overrides[get_session_factory] = lambda: factory
+    app.dependency_overrides[get_writer_session_factory] = lambda: factory
+    monkeypatch.setattr(settings, "job_results_dir", str(tmp_path))
+    return client
+
+
+def _seed(client, headers):
+    exercise_id = client.post("/api/v1/exercises", json={"name": "Squat"}, headers=headers).json()["id"]
+    for day, weight in (("2024-01-01", 100.0), ("2024-01-08", 105.0)):
+        client.post(
+            "/api/v1/workouts",
+            json={"date": day, "sets": [{"exercise_id": exercise_id, "reps": 5, "weight_kg": weight}]},
+            headers=headers,
+        )
+    return exercise_id
+
+
+def _run(client, headers, kind, **params):
+    response = client.post("/api/v1/jobs", json={"kind": kind, "params": params}, headers=headers)
+    assert response.status_code == 202, response.text
+    job_id = response.json()["id"]
+    runner.wait(job_id, timeout=30)
+    return client.get(f"/api/v1/jobs/{job_id}", headers=headers).json()
+
+
+def test_export_job_result_matches_export(jobs_client, user1_tokens):
+    """Test an export job reports progress and serves the same file as the streamed export"""
+    headers = auth_headers(user1_tokens["access_token"])
+    _seed(jobs_client, headers)
+
+    response = jobs_client.post("/api/v1/jobs", json={"kind": "export", "params": {"format": "csv"}}, headers=headers)
+    assert response.status_code == 202
+    queued = response.json()
+    assert queued["params"] == {"format": "csv"}
+    assert response.headers["location"].endswith(f"/api/v1/jobs/{queued['id']}")
+    runner.wait(queued["id"], timeout=30)
+
+    job = jobs_client.get(f"/api/v1/jobs/{queued['id']}", headers=headers).json()
+    assert job["status"] == "succeeded"
+    assert (job["progress_done"], job["progress_total"]) == (2, 2)
+    assert job["result_name"] == "workouts.csv"
+    result = jobs_client.get(job["result_url"], headers={**headers, "Accept-Encoding": "identity"})
+    assert result.status_code == 200
+    assert result.headers["content-type"].startswith("text/csv")
+    assert 'filename="workouts.csv"' in result.headers["content-disposition"]
+    streamed = jobs_client.get("/api/v1/export?format=csv", headers={**headers, "Accept-Encoding": "identity"})
+    assert result.content == streamed.content
+    assert job["result_size"] == len(result.content)
+
+
+def test_progression_report_and_records_jobs(jobs_client, user1_tokens):
+    """Test the analytics report covers every exercise and the records recompute succeeds"""
+    headers = auth_headers(user1_tokens["access_token"])
+    exercise_id = _seed(jobs_client, headers)
+
+    job = _run(jobs_client, headers, "progression_report")
+    assert job["status"] == "succeeded"
+    lines = jobs_client.get(job["result_url"], headers=headers).text.splitlines()
+    assert [json.loads(line)["exercise_id"] for line in lines] == [exercise_id]
+    assert json.loads(lines[0])["sessions"] == 2
+
+    before = jobs_client.get("/api/v1/stats/records", headers=headers).json()
+    job = _run(jobs_client, headers, "recompute_records")
+    assert (job["status"], job["progress_done"], job["result_url"]) == ("succeeded", 1, None)
+    assert jobs_client.get("/api/v1/stats/records", headers=headers).json() == before
+
+
+def test_failed_job_records_error(jobs_client, user1_tokens, monkeypatch):
+    """Test a handler error marks the job failed, with no result to download"""
+    headers = auth_headers(user1_tokens["access_token"])
+
+    def explode(db, ctx):
+        with ctx.open_result("x.txt", "text/plain") as out:
+            out.write(b"partial")
+        raise RuntimeError("boom")
+
+    monkeypatch.setitem(jobs_service.JOB_KINDS, "export", jobs_service.JobKind(explode, jobs_service.ExportJobParams))
+    job = _run(jobs_client, headers, "export")
+    assert job["status"] == "failed"
+    assert job["error"] == "RuntimeError: boom"
+    assert jobs_client.get(f"/api/v1/jobs/{job['id']}/result", headers=headers).status_code == 409
+    assert not any(p.name.startswith(f"{job['id']}-") for p in Path(settings.job_results_dir).iterdir())
+
+
+def test_job_validation_and_access(jobs_client, user1_tokens, user2_tokens, monkeypatch):
+    """Test bad params, admin-only kinds, other users' jobs and the per-user active limit"""
+    headers = auth_headers(user1_tokens["access_token"])
+    other = auth_headers(user2_tokens["access_token"])
+    monkeypatch.setattr(runner, "submit", lambda job_id, factory: None)  # jobs stay queued
+    monkeypatch.setattr(settings, "job_max_active_per_user", 1)
+
+    bad = jobs_client.post("/api/v1/jobs", json={"kind": "export", "params": {"format": "xml"}}, headers=headers)
+    assert bad.status_code == 400
+    assert jobs_client.post("/api/v1/jobs", json={"kind": "backfill_rollups"}, headers=headers).status_code == 403
+    assert jobs_client.post("/api/v1/jobs", json={"kind": "nope"}, headers=headers).status_code == 422
+
+    job = jobs_client.post("/api/v1/jobs", json={"kind": "export"}, headers=headers).json()
+    assert job["status"] == "queued"
+    assert jobs_client.get(f"/api/v1/jobs/{job['id']}/result", headers=headers).status_code == 409
+    assert jobs_client.get(f"/api/v1/jobs/{job['id']}", headers=other).status_code == 404
+    limited = jobs_client.post("/api/v1/jobs", json={"kind": "export"}, headers=headers)
+    assert limited.status_code == 429
+    assert "retry-after" in limited.headers
+    assert jobs_client.post("/api/v1/jobs", json={"kind": "export"}, headers=other).status_code == 202
+
+
+def test_recover_jobs_of_exited_processes(jobs_client, test_db, user1_tokens):
+    """Test startup recovery fails lost running jobs and adopts lost queued ones, even when the
+    dead owner had this process's pid (as after a container restart), and leaves live owners' jobs"""
+    user = test_db.query(User).filter(User.email == "user1@test.com").first()
+
+    def job(status, token):
+        return Job(user_id=user.id, kind="export", params={}, status=status, worker_token=token,
+                   worker_pid=os.getpid(), created_at=jobs_service._now())
+
+    live = jobs_service._lease_path("b" * 32)
+    live.parent.mkdir(parents=True, exist_ok=True)
+    with open(live, "wb") as lease:
+        fcntl.flock(lease, fcntl.LOCK_EX)  # another process's lease, still held
+        running, queued = job("running", "a" * 32), job("queued", "a" * 32)
+        others = [job("running", "b" * 32), job("queued", "b" * 32)]
+        test_db.add_all([running, queued, *others])
+        test_db.commit()
+
+        assert recover_jobs(test_db) == [queued.id]
+        test_db.expire_all()
+        assert (running.status, running.error) == ("failed", "Interrupted: its worker process exited")
+        assert (queued.status, queued.worker_token) == ("queued", jobs_service.WORKER_TOKEN)
+        assert [(j.status, j.worker_token) for j in others] == [("running", "b" * 32), ("queued", "b" * 32)]
+        assert recover_jobs(test_db) == []
+
+
+def test_async_database_runs_jobs_in_processes(monkeypatch):
+    """Test an async database gets process workers, so jobs never run on the event loop"""
+    monkeypatch.setattr(settings, "job_executor", "thread")
+    monkeypatch.setattr(settings, "database_url", "sqlite:///./workout.db")
+    assert jobs_service._executor_kind() == "thread"
+    monkeypatch.setattr(settings, "database_url", "sqlite+aiosqlite:///./workout.db")
+    assert jobs_service._executor_kind() == "process"
+
+
+def test_worker_error_fails_the_job(jobs_client, user1_tokens, monkeypatch):
+    """Test a job whose worker raises before it could record an outcome is failed, not left queued"""
+    headers = auth_headers(user1_tokens["access_token"])
+
+    def broken(factory, job_id, report):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(jobs_service, "_run_in_thread", broken)
+    job = _run(jobs_client, headers, "export")
+    assert (job["status"], job["error"]) == ("failed", "Worker failed: RuntimeError: database is locked")
+
+
+# Runs in a fresh interpreter: the executor and the WAL profile are chosen from settings at import
+PROCESS_SCRIPT = """
+import asyncio
+import httpx
+from app.main import app
+from app.dependencies.db import init_db
+from services.jobs import runner
+
+async def main():
+    await init_db()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        await client.post("/auth/register", json={"email": "a@test.com", "password": "password123"})
+        login = await client.post("/auth/login", json={"email": "a@test.com", "password": "password123"})
+        headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+        await client.post("/api/v1/exercises", json={"name": "Squat"}, headers=headers)
+        statuses = []
+        for kind in ("recompute_records", "export"):
+            job = (await client.post("/api/v1/jobs", json={"kind": kind}, headers=headers)).json()
+            await asyncio.to_thread(runner.wait, job["id"], 60)
+            statuses.append((await client.get(f"/api/v1/jobs/{job['id']}", headers=headers)).json()["status"])
+        print(statuses)
+    runner.shutdown()
+
+asyncio.run(main())
+"""
+
+
+def test_process_workers_under_the_wal_profile(tmp_path):
+    """Test process workers claim and run jobs against a WAL database the app has open"""
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{tmp_path / 'jobs.db'}",
+        "SQLITE_PROFILE": "wal",
+        "JOB_EXECUTOR": "process",
+        "JOB_RESULTS_DIR": str(tmp_path / "results"),
+        "PYTHONPATH": str(Path(__file__).resolve().parents[1] / "src"),
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", PROCESS_SCRIPT], cwd=tmp_path, env=env, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.splitlines()[-1] == str(["succeeded", "succeeded"])
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.pool import QueuePool
+from starlette.requests import Request
+
+from tests.conftest import auth_headers
+from app.dependencies.db import engine as app_engine, get_db
+from adapters.sqlalchemy.models import User
+from app.metrics import Histogram, Registry, db_pool_checkout_wait_seconds, pool_samples, timed_pool_class
+
+
+def test_histogram_buckets_are_cumulative():
+    h = Histogram(buckets=(0.1, 1.0))
+    for v in (0.05, 0.1, 0.5, 3.0):
+        h.observe(v)
+    cumulative, count, total = h.snapshot()
+    assert cumulative == [2, 3, 4]
+    assert count == 4
+    assert total == 3.65
+    assert h.quantile(0.5) == 0.1
+    assert h.quantile(0.99) == float("inf")
+
+
+def test_histogram_merges_thread_shards():
+    h = Histogram()
+    threads = [threading.Thread(target=lambda: [h.observe(0.01) for _ in range(1000)]) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert h.snapshot()[1] == 4000
+
+
+def test_render_prometheus_text():
+    registry = Registry()
+    requests = registry.counter("requests_total", "Requests", ("route",))
+    latency = registry.histogram("latency_seconds", "Latency", ("route",), buckets=(0.5,))
+    requests.labels('/a/"b"').inc(2)
+    latency.labels("/a").observe(0.2)
+    body = registry.render()
+    assert "# TYPE requests_total counter" in body
+    assert 'requests_total{route="/a/\\"b\\""} 2' in body
+    assert 'latency_seconds_bucket{route="/a",le="0.5"} 1' in body
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 1' in body
+    assert 'latency_seconds_count{route="/a"} 1' in body
+
+
+def test_timed_pool_records_checkout_wait(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=timed_pool_class(QueuePool), pool_size=2)
+    before = db_pool_checkout_wait_seconds.labels().snapshot()[1]
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+        samples = pool_samples(engine.pool)
+        assert samples["checked_out"] == 1
+        assert samples["saturation"] == 1 / 12
+    assert db_pool_checkout_wait_seconds.labels().snapshot()[1] == before + 1
+    assert pool_samples(engine.pool)["idle"] == 1
+
+
+def test_metrics_endpoint(client, user1_tokens):
+    headers = auth_headers(user1_tokens["access_token"])
+    client.get("/api/v1/workouts/123", headers=headers)
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/api/v1/workouts/{workout_id}",status="404"}' in body
+    assert "http_request_duration_seconds_bucket" in body
+    assert "http_requests_in_flight" in body
+    assert "principal_cache_hits_total" in body
+
+
+def test_request_session_checks_out_nothing_until_first_query():
+    """A request that never queries never takes a connection from the pool."""
+    checkouts = []
+    listener = lambda *args: checkouts.append(1)  # noqa: E731
+    event.listen(app_engine, "checkout", listener)
+    try:
+        async def open_and_close():
+            request = Request({"type": "http", "method": "GET", "path": "/", "headers": []})
+            gen = get_db(request)
+            db = await gen.__anext__()
+            await gen.aclose()
+            return db
+
+        db = asyncio.run(open_and_close())
+        assert checkouts == []
+        assert not db.in_transaction()
+    finally:
+        event.remove(app_engine, "checkout", listener)
+
+
+def test_admin_pool_stats(client, test_db, user1_tokens):
+    """The admin pool endpoint reports occupancy, limits and checkout wait percentiles."""
+    headers = auth_headers(user1_tokens["access_token"])
+    assert client.get("/api/v1/admin/pool", headers=headers).status_code == 403
+
+    user = test_db.query(User).filter(User.email == "user1@test.com").first()
+    user.role = "admin"
+    test_db.commit()
+    db_pool_checkout_wait_seconds.labels().observe(0.002)
+
+    body = client.get("/api/v1/admin/pool", headers=headers).json()
+    assert body["pool_class"] == "TimedQueuePool"
+    assert body["config"]["pool_size"] == body["size"]
+    assert {"checked_out", "idle", "overflow", "saturation"} <= body.keys()
+    assert body["checkouts"] >= 1
+    assert 0 < body["checkout_wait_seconds"]["p50"] <= body["checkout_wait_seconds"]["p99"]
+    assert body["replicas"] == []
@@ -0,0 +1,58 @@
+import asyncio
+import threading
+
+import pytest
+
+from services.auth import PasswordHasherPool, password_hasher
+from domain.exceptions import ServiceUnavailable
+
+
+def test_pool_hashes_and_verifies():
+    pool = PasswordHasherPool(workers=1, max_queue=1)
+    try:
+        async def scenario():
+            hashed = await pool.hash("password123")
+            return await pool.verify("password123", hashed), await pool.verify("nope", hashed)
+
+        ok, bad = asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+    assert ok is True
+    assert bad is False
+    stats = pool.stats()
+    assert stats["completed"] == 3
+    assert stats["in_flight"] == 0
+    assert stats["hash_seconds_max"] > 0
+
+
+def test_pool_rejects_when_queue_is_full():
+    pool = PasswordHasherPool(workers=1, max_queue=0)
+    release = threading.Event()
+
+    async def scenario():
+        blocked = asyncio.ensure_future(pool.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        assert pool.stats()["in_flight"] == 1
+        with pytest.raises(ServiceUnavailable) as exc_info:
+            await pool.run(release.wait, 5)
+        release.set()
+        await blocked
+        return exc_info.value
+
+    try:
+        exc = asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+    assert exc.status_code == 503
+    assert exc.headers["Retry-After"] == "1"
+    assert pool.stats()["rejected"] == 1
+
+
+def test_login_returns_503_when_hasher_is_saturated(client, monkeypatch):
+    client.post("/auth/register", json={"email": "busy@test.com", "password": "password123"})
+    monkeypatch.setattr(password_hasher, "_in_flight", password_hasher.workers + password_hasher.max_queue)
+
+    response = client.post("/auth/login", json={"email": "busy@test.com", "password": "password123"})
+    assert response.status_code == 503
+    assert response.json()["detail"]["code"] == "SERVICE_UNAVAILABLE"
+    assert "retry-after" in response.headers
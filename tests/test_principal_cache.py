@@ -0,0 +1,89 @@
+import time
+
+from tests.conftest import auth_headers
+from app.dependencies.auth import principal_cache
+from app.principal_cache import Principal, PrincipalCache
+from adapters.sqlalchemy.models import User
+from adapters.sqlalchemy.query_counter import QueryCounter
+
+
+def test_cache_hit_and_miss_counters():
+    cache = PrincipalCache(maxsize=10, ttl_seconds=60)
+    assert cache.get("t1") is None
+    cache.put("t1", Principal(id=1, role="user"), time.time() + 60)
+    assert cache.get("t1") == Principal(id=1, role="user")
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["size"] == 1
+
+
+def test_cache_entry_expires_with_token():
+    cache = PrincipalCache(maxsize=10, ttl_seconds=60)
+    cache.put("t1", Principal(id=1, role="user"), time.time() - 1)
+    assert cache.get("t1") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_cache_is_bounded_lru():
+    cache = PrincipalCache(maxsize=2, ttl_seconds=60)
+    exp = time.time() + 60
+    cache.put("a", Principal(id=1, role="user"), exp)
+    cache.put("b", Principal(id=2, role="user"), exp)
+    cache.get("a")
+    cache.put("c", Principal(id=3, role="user"), exp)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_invalidate_user_drops_all_tokens():
+    cache = PrincipalCache(maxsize=10, ttl_seconds=60)
+    exp = time.time() + 60
+    cache.put("a", Principal(id=1, role="user"), exp)
+    cache.put("b", Principal(id=1, role="user"), exp)
+    cache.put("c", Principal(id=2, role="user"), exp)
+    cache.invalidate_user(1)
+    assert cache.get("a") is None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_authenticated_requests_skip_users_lookup(client, test_db, user1_tokens):
+    principal_cache.clear()
+    headers = auth_headers(user1_tokens["access_token"])
+    engine = test_db.get_bind()
+
+    with QueryCounter(engine) as first:
+        assert client.get("/api/v1/exercises", headers=headers).status_code == 200
+    with QueryCounter(engine) as second:
+        assert client.get("/api/v1/exercises", headers=headers).status_code == 200
+
+    assert sum("FROM users" in s for s in first.statements) == 1
+    assert sum("FROM users" in s for s in second.statements) == 0
+
+
+def test_role_change_invalidates_cached_principal(client, test_db, user1_tokens):
+    principal_cache.clear()
+    headers = auth_headers(user1_tokens["access_token"])
+    assert client.get("/api/v1/workouts/admin/all", headers=headers).status_code == 403
+
+    user = test_db.query(User).filter(User.email == "user1@test.com").first()
+    user.role = "admin"
+    test_db.commit()
+
+    assert client.get("/api/v1/workouts/admin/all", headers=headers).status_code == 200
+
+
+def test_principal_cached_between_flush_and_commit_is_dropped(client, test_db, user1_tokens):
+    principal_cache.clear()
+    token = user1_tokens["access_token"]
+    user = test_db.query(User).filter(User.email == "user1@test.com").first()
+    user.role = "admin"
+    test_db.flush()
+    # A concurrent request misses the cache and re-caches the still-committed role
+    principal_cache.put(token, Principal(id=user.id, role="user"), None)
+    test_db.commit()
+
+    assert principal_cache.get(token) is None
@@ -0,0 +1,100 @@
+from datetime import date, timedelta
+
+import pytest
+
+from tests.conftest import auth_headers
+from adapters.sqlalchemy.models import Exercise, Set, User, Workout
+from adapters.sqlalchemy.query_counter import QueryCounter, assert_max_queries
+
+
+def _seed_workouts(db, email: str, count: int, sets_per_workout: int = 3) -> None:
+    user = db.query(User).filter(User.email == email).first()
+    exercise = Exercise(user_id=user.id, name="Squat")
+    db.add(exercise)
+    db.flush()
+    start = date(2020, 1, 1)
+    for i in range(count):
+        workout = Workout(user_id=user.id, date=start + timedelta(days=i))
+        workout.sets = [
+            Set(exercise_id=exercise.id, reps=5, weight_kg=100.0 + j) for j in range(sets_per_workout)
+        ]
+        db.add(workout)
+    db.commit()
+
+
+def test_assert_max_queries_reports_statements(test_db):
+    engine = test_db.get_bind()
+    with pytest.raises(AssertionError, match="at most 1 queries, got 2"):
+        with assert_max_queries(engine, 1):
+            test_db.query(User).all()
+            test_db.query(Workout).all()
+
+
+def test_workout_list_page_has_constant_query_count(client, test_db, user1_tokens):
+    headers = auth_headers(user1_tokens["access_token"])
+    _seed_workouts(test_db, "user1@test.com", 100)
+    engine = test_db.get_bind()
+
+    # principal lookup + data version + page + one batched load of all sets on the page (no COUNT)
+    with assert_max_queries(engine, 4):
+        response = client.get("/api/v1/workouts?limit=100", headers=headers)
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert len(items) == 100
+    assert all(len(w["sets"]) == 3 for w in items)
+
+
+def test_workout_list_query_count_does_not_grow_with_page_size(client, test_db, user1_tokens):
+    headers = auth_headers(user1_tokens["access_token"])
+    _seed_workouts(test_db, "user1@test.com", 50)
+    engine = test_db.get_bind()
+    client.get("/api/v1/workouts?limit=1", headers=headers)
+
+    with QueryCounter(engine) as small:
+        client.get("/api/v1/workouts?limit=1", headers=headers)
+    with QueryCounter(engine) as large:
+        client.get("/api/v1/workouts?limit=50", headers=headers)
+    assert small.count == large.count
+
+
+def test_read_one_workout_loads_sets_eagerly(client, test_db, user1_tokens):
+    headers = auth_headers(user1_tokens["access_token"])
+    _seed_workouts(test_db, "user1@test.com", 1)
+    workout_id = test_db.query(Workout.id).scalar()
+    client.get(f"/api/v1/workouts/{workout_id}", headers=headers)
+
+    with assert_max_queries(test_db.get_bind(), 2):
+        response = client.get(f"/api/v1/workouts/{workout_id}", headers=headers)
+    assert len(response.json()["sets"]) == 3
+
+
+def test_bulk_import_uses_batched_inserts(client, test_db, user1_tokens):
+    headers = auth_headers(user1_tokens["access_token"])
+    exercise_id = client.post("/api/v1/exercises", json={"name": "Bench"}, headers=headers).json()["id"]
+    payload = [
+        {"date": "2024-01-01", "sets": [{"exercise_id": exercise_id, "reps": 5, "weight_kg": 80.0}] * 3}
+    ] * 200
+
+    with QueryCounter(test_db.get_bind()) as counter:
+        response = client.post("/api/v1/workouts/bulk", json=payload, headers=headers)
+    assert response.json()["created"] == 200
+    # Constant in the item count: ownership check, two multi-row INSERTs, then one statement (plus
+    # a first-time savepoint insert) per derived table: stats, rollups, data version, records
+    assert counter.count <= 12
+
+
+def test_list_reads_use_projections_not_entities(test_db, user1_tokens):
+    from services.exercises import list_exercises
+    from services.workouts import list_workouts, read_workout
+
+    _seed_workouts(test_db, "user1@test.com", 5)
+    user = test_db.query(User).filter(User.email == "user1@test.com").first()
+    test_db.expunge_all()
+
+    page = list_workouts(test_db, user.id, 10)
+    one = read_workout(test_db, user.id, page.items[0].id)
+    list_exercises(test_db, user.id, 10)
+
+    assert len(page.items) == 5
+    assert [s.weight_kg for s in one.sets] == [100.0, 101.0, 102.0]
+    assert len(test_db.identity_map) == 0
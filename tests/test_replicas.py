@@ -0,0 +1,116 @@
+import asyncio
+import time
+
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy import create_engine, select, text
+
+from app.dependencies.db import Base
+from adapters.sqlalchemy.models import User
+from adapters.sqlalchemy.replicas import ReplicaSet, RoutingSession, pin_primary
+from app.dependencies.auth import get_current_user, principal_cache
+from app.dependencies.db import recent_writers
+from app.principal_cache import Principal
+
+
+def _engine(path):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def _tagged(tmp_path, *names):
+    """One database per name, each holding a single user whose email says where it lives."""
+    engines = []
+    for name in names:
+        engine = _engine(tmp_path / f"{name}.db")
+        with engine.begin() as conn:
+            conn.execute(User.__table__.insert().values(email=f"{name}@test.com", hashed_password="x"))
+        engines.append(engine)
+    return engines
+
+
+def _session(primary, replicas, read_only=True):
+    return RoutingSession(bind=primary, info={"replicas": replicas, "read_only": read_only})
+
+
+def _where(db):
+    return db.execute(select(User.email)).scalar().split("@")[0]
+
+
+def test_read_only_session_reads_replica_and_writer_reads_primary(tmp_path):
+    """Read-only sessions go to a replica; writer sessions stay on the primary."""
+    primary, replica = _tagged(tmp_path, "primary", "replica")
+    replicas = ReplicaSet([replica])
+    with _session(primary, replicas) as db:
+        assert _where(db) == "replica"
+    with _session(primary, replicas, read_only=False) as db:
+        assert _where(db) == "primary"
+
+
+def test_replicas_round_robin_and_stick_per_session(tmp_path):
+    """Each session keeps one replica; successive sessions rotate through them."""
+    primary, a, b = _tagged(tmp_path, "primary", "a", "b")
+    replicas = ReplicaSet([a, b])
+    seen = []
+    for _ in range(4):
+        with _session(primary, replicas) as db:
+            first = _where(db)
+            assert _where(db) == first
+            seen.append(first)
+    assert seen == ["a", "b", "a", "b"]
+
+
+def test_pinned_and_flushing_sessions_read_primary(tmp_path):
+    """pin_primary and any flush route the rest of the session to the primary."""
+    primary, replica = _tagged(tmp_path, "primary", "replica")
+    replicas = ReplicaSet([replica])
+    with _session(primary, replicas) as db:
+        assert _where(db) == "replica"
+        pin_primary(db)
+        assert _where(db) == "primary"
+    with _session(primary, replicas) as db:
+        db.add(User(email="new@test.com", hashed_password="x"))
+        db.flush()
+        assert db.execute(select(User.id).where(User.email == "new@test.com")).scalar() is not None
+        db.rollback()
+
+
+def test_unreachable_replica_is_ejected(tmp_path):
+    """A replica that cannot connect is ejected and reads fall back to the primary."""
+    primary, = _tagged(tmp_path, "primary")
+    broken = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    replicas = ReplicaSet([broken], eject_seconds=60)
+    with _session(primary, replicas) as db:
+        try:
+            db.execute(text("SELECT 1"))
+        except Exception:
+            pass
+    assert replicas.stats()[0]["healthy"] is False
+    with _session(primary, replicas) as db:
+        assert _where(db) == "primary"
+
+
+def test_reads_after_a_users_write_go_to_primary(tmp_path):
+    """A user's read-only sessions read the primary for a while after their write commits."""
+    primary, replica = _tagged(tmp_path, "primary", "replica")
+    replicas = ReplicaSet([replica])
+    recent_writers.clear()
+    principal_cache.put("writer-token", Principal(id=7, role="user"), time.time() + 60)
+    principal_cache.put("reader-token", Principal(id=8, role="user"), time.time() + 60)
+
+    def request(token, read_only=True):
+        db = _session(primary, replicas, read_only=read_only)
+        asyncio.run(get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token), db))
+        return db
+
+    with request("writer-token") as db:
+        assert _where(db) == "replica"
+    with request("writer-token", read_only=False) as db:
+        db.add(User(email="new@test.com", hashed_password="x"))
+        db.commit()
+    with request("writer-token") as db:
+        assert db.execute(select(User.email).where(User.email == "new@test.com")).scalar() is not None
+    with request("reader-token") as db:
+        assert _where(db) == "replica"
+    recent_writers.clear()
+    principal_cache.clear()
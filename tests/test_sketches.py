@@ -0,0 +1,110 @@
+import random
+
+from tests.conftest import auth_headers
+from adapters.sqlalchemy.models import QuantileSketchBucket, User
+from services.sketches import RELATIVE_ACCURACY, QuantileSketch, rebuild_sketches, sketches
+
+
+def test_quantiles_stay_within_relative_error():
+    """Test every quantile is within RELATIVE_ACCURACY of the exact one."""
+    rng = random.Random(3)
+    values = [rng.lognormvariate(5, 1.5) for _ in range(50_000)] + [0.0] * 100
+    sketch = QuantileSketch()
+    for v in values:
+        sketch.add(v)
+    values.sort()
+    for q in (0.001, 0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99, 0.999):
+        exact = values[int(q * (len(values) - 1))]
+        assert abs(sketch.quantile(q) - exact) <= RELATIVE_ACCURACY * exact
+    assert sketch.quantile(0.0) == 0.0
+    assert abs(sketch.rank(values[len(values) // 2]) - 0.5) < 0.01
+
+
+def test_merge_equals_sketch_of_union():
+    """Test merging two sketches gives exactly the sketch of all their values."""
+    a, b, both = QuantileSketch(), QuantileSketch(), QuantileSketch()
+    for i in range(1, 2000):
+        (a if i % 3 else b).add(i * 0.7)
+        both.add(i * 0.7)
+    a.merge(b)
+    assert {k: c for k, c in a.counts.items() if c} == {k: c for k, c in both.counts.items() if c}
+    assert a.quantile(0.9) == both.quantile(0.9)
+
+
+def _log(client, headers, exercise_id, day, *sets):
+    payload = {"date": day, "sets": [{"exercise_id": exercise_id, "reps": r, "weight_kg": w} for r, w in sets]}
+    return client.post("/api/v1/workouts", json=payload, headers=headers).json()["id"]
+
+
+def _buckets(db):
+    db.expire_all()
+    return sorted((b.exercise_name, b.metric, b.bucket, b.count) for b in db.query(QuantileSketchBucket) if b.count)
+
+
+def test_admin_percentiles_from_flushed_writes(client, test_db, user1_tokens, user2_tokens):
+    """Test writes from every user feed the per-name sketches once committed and flushed."""
+    sketches.reset()
+    h1, h2 = auth_headers(user1_tokens["access_token"]), auth_headers(user2_tokens["access_token"])
+    squat1 = client.post("/api/v1/exercises", json={"name": "Squat"}, headers=h1).json()["id"]
+    squat2 = client.post("/api/v1/exercises", json={"name": "  squat "}, headers=h2).json()["id"]
+    for i in range(10):
+        _log(client, h1, squat1, f"2024-01-{i + 1:02d}", (5, 100.0 + i))
+    _log(client, h2, squat2, "2024-01-01", (5, 60.0), (5, 60.0))
+    gone = _log(client, h2, squat2, "2024-01-02", (1, 500.0))
+    client.delete(f"/api/v1/workouts/{gone}", headers=h2)
+    sketches.flush(test_db)
+
+    url = "/api/v1/admin/percentiles?exercise=SQUAT&metric=weight_kg&q=0&q=0.5&q=1&value=60"
+    assert client.get(url, headers=h1).status_code == 403
+    user = test_db.query(User).filter(User.email == "user1@test.com").first()
+    user.role = "admin"
+    test_db.commit()
+    response = client.get(url, headers=h1)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["count"] == 12
+    low, median, high = (body["quantiles"][k] for k in ("0.0", "0.5", "1.0"))
+    assert abs(low - 60.0) <= 0.6
+    assert abs(median - 103.0) <= 1.03
+    assert abs(high - 109.0) <= 1.09
+    assert abs(body["rank"] - 2 / 12) < 1e-9
+    assert client.get(url.replace("q=1", "q=1.5"), headers=h1).status_code == 400
+
+    incremental = _buckets(test_db)
+    rebuild_sketches(test_db)
+    assert _buckets(test_db) == incremental
+
+
+def test_rolled_back_writes_are_not_sketched(test_db, user1_tokens):
+    """Test deltas staged in a transaction that rolls back never reach the store."""
+    from domain.schemas import SetCreate, WorkoutCreate
+    from adapters.sqlalchemy.models import Exercise
+    from services.workouts import _record_change
+
+    sketches.reset()
+    user = test_db.query(User).filter(User.email == "user1@test.com").first()
+    exercise = Exercise(user_id=user.id, name="Row")
+    test_db.add(exercise)
+    test_db.commit()
+    workout = WorkoutCreate(date="2024-01-01", sets=[SetCreate(exercise_id=exercise.id, reps=5, weight_kg=50)])
+    _record_change(test_db, user.id, workouts=1, added=[(workout.date, workout.sets)])
+    test_db.rollback()
+    assert sketches.pending_keys() == 0
+
+
+def test_rename_moves_samples_to_the_new_name(client, test_db, user1_tokens):
+    """Test renaming an exercise moves its samples, so deleting a workout later nets to zero."""
+    sketches.reset()
+    headers = auth_headers(user1_tokens["access_token"])
+    squat = client.post("/api/v1/exercises", json={"name": "Squat"}, headers=headers).json()["id"]
+    workout = _log(client, headers, squat, "2024-01-01", (5, 100.0), (3, 110.0))
+    sketches.flush(test_db)
+    assert {name for name, *_ in _buckets(test_db)} == {"squat"}
+
+    client.patch(f"/api/v1/exercises/{squat}", json={"name": "Front Squat"}, headers=headers)
+    sketches.flush(test_db)
+    assert {name for name, *_ in _buckets(test_db)} == {"front squat"}
+
+    client.delete(f"/api/v1/workouts/{workout}", headers=headers)
+    sketches.flush(test_db)
+    assert _buckets(test_db) == []
@@ -0,0 +1,85 @@
+import threading
+from datetime import date
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.dependencies.db import Base
+from adapters.sqlalchemy.models import Exercise, User, Workout
+from adapters.sqlalchemy.sqlite import WRITER_OPTION, apply_sqlite_profile
+from domain.schemas import SetCreate, WorkoutCreate
+from services.stats import get_user_stats
+from services.workouts import create_workout
+
+
+def _engine(tmp_path, lane=None):
+    engine = create_engine(f"sqlite:///{tmp_path / 'wal.db'}", connect_args={"check_same_thread": False})
+    apply_sqlite_profile(engine, busy_timeout_ms=2000, writer_lane=lane)
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def test_pragmas_applied_on_connect(tmp_path):
+    engine = _engine(tmp_path)
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 2000
+        assert conn.execute(text("PRAGMA cache_size")).scalar() == -64 * 1024
+
+
+def test_reader_is_not_blocked_by_open_writer(tmp_path):
+    engine = _engine(tmp_path, lane=threading.Lock())
+    writer = engine.execution_options(**{WRITER_OPTION: True})
+    with Session(writer) as w, Session(engine) as r:
+        w.add(User(email="a@test.com", hashed_password="x"))
+        w.flush()
+        # the writer holds the write lock; WAL readers still see the last committed state
+        assert r.query(User).count() == 0
+        w.commit()
+        r.rollback()
+        assert r.query(User).count() == 1
+
+
+def test_concurrent_writers_are_serialized_without_lock_errors(tmp_path):
+    engine = _engine(tmp_path, lane=threading.Lock())
+    writer = engine.execution_options(**{WRITER_OPTION: True})
+    with Session(engine) as db:
+        user = User(email="a@test.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        db.add(Exercise(user_id=user.id, name="Squat"))
+        db.commit()
+        user_id, exercise_id = user.id, db.query(Exercise.id).scalar()
+
+    payload = WorkoutCreate(date=date(2024, 1, 1), sets=[SetCreate(exercise_id=exercise_id, reps=5, weight_kg=100)])
+    errors = []
+
+    def work():
+        for _ in range(20):
+            try:
+                # read first, then write: a deferred transaction would fail with "database is locked"
+                with Session(writer) as db:
+                    db.query(Workout).filter(Workout.user_id == user_id).count()
+                    create_workout(db, user_id, payload)
+            except Exception as exc:  # pragma: no cover - reported below
+                errors.append(exc)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert errors == []
+    with Session(engine) as db:
+        assert get_user_stats(db, user_id)["total_workouts"] == 80
+        assert get_user_stats(db, user_id)["total_sets"] == 80
+
+
+def test_background_writers_use_the_writer_engine():
+    from app.dependencies.db import AsyncWriterSessionLocal, get_writer_session_factory, writer_engine
+
+    if AsyncWriterSessionLocal is None:
+        assert get_writer_session_factory().kw["bind"] is writer_engine
+
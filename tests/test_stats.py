@@ -195,3 +195,230 @@ def test_stats_response_format(client, user1_tokens):
     assert data["total_sets"] >= 0
     if data["avg_reps"] is not None:
         assert data["avg_reps"] >= 0
+
+
+def test_stats_follow_workout_deletion(client, user1_tokens):
+    """Test aggregates are decremented when a workout is deleted"""
+    headers = auth_headers(user1_tokens["access_token"])
+    exercise_id = client.post("/api/v1/exercises", json={"name": "Squat"}, headers=headers).json()["id"]
+    keep = {"date": "2024-01-01", "sets": [{"exercise_id": exercise_id, "reps": 5, "weight_kg": 100.0}]}
+    drop = {"date": "2024-01-02", "sets": [{"exercise_id": exercise_id, "reps": 3, "weight_kg": 120.0}] * 2}
+    client.post("/api/v1/workouts", json=keep, headers=headers)
+    workout_id = client.post("/api/v1/workouts", json=drop, headers=headers).json()["id"]
+
+    data = client.get("/api/v1/stats", headers=headers).json()
+    assert data["total_workouts"] == 2
+    assert data["total_sets"] == 3
+    assert data["total_volume_kg"] == 500.0 + 720.0
+
+    client.delete(f"/api/v1/workouts/{workout_id}", headers=headers)
+    data = client.get("/api/v1/stats", headers=headers).json()
+    assert data["total_workouts"] == 1
+    assert data["total_sets"] == 1
+    assert data["avg_reps"] == 5.0
+    assert data["total_volume_kg"] == 500.0
+
+
+def test_rebuild_stats_detects_and_repairs_drift(client, test_db, user1_tokens):
+    """Test the rebuild command recomputes aggregates from workouts and sets"""
+    from adapters.sqlalchemy.models import UserStats
+    from services.stats import rebuild_user_stats
+
+    headers = auth_headers(user1_tokens["access_token"])
+    exercise_id = client.post("/api/v1/exercises", json={"name": "Row"}, headers=headers).json()["id"]
+    workout = {"date": "2024-01-01", "sets": [{"exercise_id": exercise_id, "reps": 10, "weight_kg": 50.0}]}
+    client.post("/api/v1/workouts", json=workout, headers=headers)
+
+    assert rebuild_user_stats(test_db, check_only=True) == []
+
+    row = test_db.query(UserStats).one()
+    row.set_count = 42
+    test_db.commit()
+
+    drift = rebuild_user_stats(test_db, check_only=True)
+    assert len(drift) == 1
+    assert drift[0].actual == (1, 1, 10, 500.0)
+
+    rebuild_user_stats(test_db)
+    assert rebuild_user_stats(test_db, check_only=True) == []
+    assert client.get("/api/v1/stats", headers=headers).json()["total_sets"] == 1
+
+
+def test_exercise_progression_series(client, user1_tokens, user2_tokens):
+    """Test the progression endpoint computes per-session volume, 1RM estimates and PRs"""
+    headers = auth_headers(user1_tokens["access_token"])
+    squat = client.post("/api/v1/exercises", json={"name": "Squat"}, headers=headers).json()["id"]
+    other = client.post("/api/v1/exercises", json={"name": "Row"}, headers=headers).json()["id"]
+    sessions = [
+        ("2024-01-01", [(5, 100.0), (3, 110.0)]),
+        ("2024-01-08", [(1, 120.0), (0, 130.0)]),
+        ("2024-01-15", [(5, 90.0), (40, 20.0)]),
+    ]
+    for day, sets in sessions:
+        payload = {"date": day, "sets": [{"exercise_id": squat, "reps": r, "weight_kg": w} for r, w in sets]}
+        payload["sets"].append({"exercise_id": other, "reps": 10, "weight_kg": 999.0})
+        client.post("/api/v1/workouts", json=payload, headers=headers)
+
+    response = client.get(f"/api/v1/stats/exercises/{squat}/progression", headers=headers)
+    assert response.status_code == 200
+    assert response.headers["etag"]
+    data = response.json()
+    assert data["sessions"] == 3
+    assert data["dates"] == ["2024-01-01", "2024-01-08", "2024-01-15"]
+    assert data["set_count"] == [2, 2, 2]
+    assert data["volume_kg"] == [830.0, 120.0, 1250.0]
+    assert data["top_weight_kg"] == [110.0, 130.0, 90.0]
+    # Epley: 100 * (1 + 5/30) beats 110 * (1 + 3/30); a single is its own max; zero reps lift nothing
+    assert data["best_e1rm_epley_kg"] == [121.0, 120.0, 105.0]
+    assert data["best_e1rm_brzycki_kg"] == [116.47, 120.0, 101.25]
+    assert data["rolling_best_e1rm_kg"] == [121.0, 121.0, 121.0]
+    assert data["is_pr"] == [True, False, False]
+    assert data["e1rm_trend_kg_per_week"] == -8.0
+
+    cached = client.get(
+        f"/api/v1/stats/exercises/{squat}/progression",
+        headers={**headers, "If-None-Match": response.headers["etag"]},
+    )
+    assert cached.status_code == 304
+
+    other_user = auth_headers(user2_tokens["access_token"])
+    assert client.get(f"/api/v1/stats/exercises/{squat}/progression", headers=other_user).status_code == 403
+    assert client.get("/api/v1/stats/exercises/9999/progression", headers=headers).status_code == 404
+
+
+def test_exercise_progression_without_sets(client, user1_tokens):
+    """Test the progression of an exercise with no sets is a set of empty series"""
+    headers = auth_headers(user1_tokens["access_token"])
+    exercise_id = client.post("/api/v1/exercises", json={"name": "Dip"}, headers=headers).json()["id"]
+    data = client.get(f"/api/v1/stats/exercises/{exercise_id}/progression", headers=headers).json()
+    assert data["sessions"] == 0
+    assert data["volume_kg"] == []
+    assert data["e1rm_trend_kg_per_week"] is None
+
+
+def test_timeseries_reads_maintained_rollups(client, test_db, user1_tokens):
+    """Test weekly/monthly rollups follow creates, date moves and deletes, and match a rebuild"""
+    from adapters.sqlalchemy.models import ExerciseRollup
+    from adapters.sqlalchemy.query_counter import QueryCounter
+    from services.rollups import rebuild_rollups
+
+    headers = auth_headers(user1_tokens["access_token"])
+    squat = client.post("/api/v1/exercises", json={"name": "Squat"}, headers=headers).json()["id"]
+    bench = client.post("/api/v1/exercises", json={"name": "Bench"}, headers=headers).json()["id"]
+
+    def log(day, *sets):
+        payload = {"date": day, "sets": [{"exercise_id": e, "reps": r, "weight_kg": w} for e, r, w in sets]}
+        return client.post("/api/v1/workouts", json=payload, headers=headers).json()["id"]
+
+    log("2024-01-29", (squat, 5, 100.0), (squat, 5, 100.0), (bench, 8, 50.0))  # Monday
+    log("2024-02-02", (squat, 3, 120.0))  # Friday, same ISO week, next month
+    moved = log("2024-02-05", (squat, 1, 150.0))
+    deleted = log("2024-02-06", (bench, 10, 40.0))
+
+    assert client.patch(f"/api/v1/workouts/{moved}", json={"date": "2024-01-30"}, headers=headers).status_code == 200
+    client.delete(f"/api/v1/workouts/{deleted}", headers=headers)
+
+    with QueryCounter(test_db.get_bind()) as counter:
+        response = client.get("/api/v1/stats/timeseries?granularity=week&from=2024-01-31&to=2024-02-29", headers=headers)
+    assert response.status_code == 200
+    assert not any("FROM sets" in s or "FROM workouts" in s for s in counter.statements)
+    points = [(p["bucket_start"], p["exercise_id"], p["set_count"], p["reps_sum"], p["volume_kg"], p["workout_count"])
+              for p in response.json()["points"]]
+    assert points == [
+        ("2024-01-29", squat, 4, 14, 1510.0, 3),
+        ("2024-01-29", bench, 1, 8, 400.0, 1),
+    ]
+
+    monthly = client.get(f"/api/v1/stats/timeseries?granularity=month&exercise_id={squat}", headers=headers).json()
+    assert [(p["bucket_start"], p["set_count"]) for p in monthly["points"]] == [("2024-01-01", 3), ("2024-02-01", 1)]
+
+    def snapshot():
+        test_db.expire_all()
+        return sorted(
+            (r.granularity, r.bucket_start, r.exercise_id, r.set_count, r.reps_sum, r.volume_kg, r.workout_count)
+            for r in test_db.query(ExerciseRollup)
+        )
+
+    incremental = snapshot()
+    assert rebuild_rollups(test_db, users_per_chunk=1) == len(incremental)
+    assert snapshot() == incremental
+
+    bad = client.get("/api/v1/stats/timeseries?from=2024-02-01&to=2024-01-01", headers=headers)
+    assert bad.status_code == 400
+
+
+def test_personal_records_follow_creates_and_deletes(client, test_db, user1_tokens):
+    """Test PRs are reported on create, listed from the index and recomputed when their workout goes"""
+    from adapters.sqlalchemy.query_counter import QueryCounter
+
+    headers = auth_headers(user1_tokens["access_token"])
+    squat = client.post("/api/v1/exercises", json={"name": "Squat"}, headers=headers).json()["id"]
+
+    def log(day, *sets):
+        payload = {"date": day, "sets": [{"exercise_id": squat, "reps": r, "weight_kg": w} for r, w in sets]}
+        response = client.post("/api/v1/workouts", json=payload, headers=headers)
+        assert response.status_code == 201
+        return response.json()
+
+    first = log("2024-01-01", (5, 100.0), (3, 110.0))
+    assert {(r["kind"], r["weight_kg"], r["value"], r["previous"]) for r in first["new_records"]} == {
+        ("max_weight", None, 110.0, None),
+        ("reps_at_weight", 100.0, 5.0, None),
+        ("reps_at_weight", 110.0, 3.0, None),
+        ("session_volume", None, 830.0, None),
+    }
+    assert log("2024-01-03", (5, 100.0))["new_records"] == []  # ties don't count
+    second = log("2024-01-05", (8, 100.0), (1, 120.0), (0, 150.0))
+    assert [(r["kind"], r["value"], r["previous"]) for r in second["new_records"]] == [
+        ("max_weight", 120.0, 110.0),  # the missed 150 kg single isn't a lift
+        ("reps_at_weight", 8.0, 5.0),
+        ("reps_at_weight", 1.0, None),
+        ("session_volume", 920.0, 830.0),
+    ]
+
+    with QueryCounter(test_db.get_bind()) as counter:
+        records = client.get("/api/v1/stats/records", headers=headers).json()["records"]
+    assert not any("FROM sets" in s or "FROM workouts" in s for s in counter.statements)
+    best = {(r["kind"], r["weight_kg"]): (r["value"], r["achieved_on"]) for r in records}
+    assert best[("max_weight", None)] == (120.0, "2024-01-05")
+    assert best[("reps_at_weight", 100.0)] == (8.0, "2024-01-05")
+
+    assert client.delete(f"/api/v1/workouts/{second['id']}", headers=headers).status_code == 204
+    records = client.get(f"/api/v1/stats/records?exercise_id={squat}", headers=headers).json()["records"]
+    assert {(r["kind"], r["weight_kg"]): (r["value"], r["workout_id"]) for r in records} == {
+        ("max_weight", None): (110.0, first["id"]),
+        ("reps_at_weight", 100.0): (5.0, first["id"]),
+        ("reps_at_weight", 110.0): (3.0, first["id"]),
+        ("session_volume", None): (830.0, first["id"]),
+    }
+
+
+def test_redated_workout_takes_a_tied_record(client, user1_tokens):
+    """Test moving a workout before an equal-best one credits it with the tied records"""
+    headers = auth_headers(user1_tokens["access_token"])
+    squat = client.post("/api/v1/exercises", json={"name": "Squat"}, headers=headers).json()["id"]
+    ids = [
+        client.post(
+            "/api/v1/workouts",
+            json={"date": day, "sets": [{"exercise_id": squat, "reps": 5, "weight_kg": 100.0}]},
+            headers=headers,
+        ).json()["id"]
+        for day in ("2024-01-01", "2024-01-10")
+    ]
+
+    def holders():
+        records = client.get(f"/api/v1/stats/records?exercise_id={squat}", headers=headers).json()["records"]
+        return {(r["kind"], r["workout_id"], r["achieved_on"]) for r in records}
+
+    assert holders() == {
+        ("max_weight", ids[0], "2024-01-01"),
+        ("reps_at_weight", ids[0], "2024-01-01"),
+        ("session_volume", ids[0], "2024-01-01"),
+    }
+    response = client.patch(f"/api/v1/workouts/{ids[1]}", json={"date": "2023-12-20"}, headers=headers)
+    assert response.status_code == 200
+    assert holders() == {
+        ("max_weight", ids[1], "2023-12-20"),
+        ("reps_at_weight", ids[1], "2023-12-20"),
+        ("session_volume", ids[1], "2023-12-20"),
+    }
@@ -112,7 +112,7 @@ def test_list_own_workouts(client, user1_tokens):
     response = client.get("/api/v1/workouts?limit=10&offset=0", headers=headers)
     assert response.status_code == 200
     data = response.json()
-    assert data["total"] >= 3
+    assert data["total"] is None  # only counted when asked for
     assert len(data["items"]) >= 3
 
 
@@ -256,10 +256,185 @@ def test_pagination(client, user1_tokens):
         )
     
     # Test pagination
-    response = client.get("/api/v1/workouts?limit=2&offset=0", headers=headers)
+    response = client.get("/api/v1/workouts?limit=2&offset=0&include_total=true", headers=headers)
     assert response.status_code == 200
     data = response.json()
     assert data["limit"] == 2
     assert data["offset"] == 0
     assert data["total"] >= 5
     assert len(data["items"]) == 2
+
+
+def test_cursor_pagination_walks_all_workouts(client, user1_tokens):
+    """Test keyset pagination returns every workout once, newest first, without total"""
+    headers = auth_headers(user1_tokens["access_token"])
+
+    # Two workouts share a date so the id tiebreaker is exercised
+    dates = ["2024-01-01", "2024-01-02", "2024-01-02", "2024-01-03", "2024-01-04"]
+    for d in dates:
+        client.post("/api/v1/workouts", json={"date": d}, headers=headers)
+
+    first = client.get("/api/v1/workouts?limit=2", headers=headers).json()
+    assert first["total"] is None
+    seen = [w["id"] for w in first["items"]]
+    cursor = first["next_cursor"]
+    while cursor:
+        page = client.get(f"/api/v1/workouts?limit=2&cursor={cursor}", headers=headers).json()
+        assert page["total"] is None
+        seen += [w["id"] for w in page["items"]]
+        cursor = page["next_cursor"]
+
+    assert len(seen) == 5
+    assert len(set(seen)) == 5
+
+    full = client.get("/api/v1/workouts?limit=10", headers=headers).json()
+    assert full["next_cursor"] is None
+    assert [w["id"] for w in full["items"]] == seen
+    assert [w["date"] for w in full["items"]] == sorted(dates, reverse=True)
+
+
+def test_cursor_pagination_total_is_opt_in(client, user1_tokens):
+    """Test include_total adds the count in cursor mode"""
+    headers = auth_headers(user1_tokens["access_token"])
+    for i in range(3):
+        client.post("/api/v1/workouts", json={"date": f"2024-01-0{i+1}"}, headers=headers)
+
+    cursor = client.get("/api/v1/workouts?limit=1", headers=headers).json()["next_cursor"]
+    data = client.get(f"/api/v1/workouts?limit=1&cursor={cursor}&include_total=true", headers=headers).json()
+    assert data["total"] == 3
+
+
+def test_invalid_cursor(client, user1_tokens):
+    """Test malformed cursor returns 400"""
+    headers = auth_headers(user1_tokens["access_token"])
+    response = client.get("/api/v1/workouts?cursor=not-a-cursor", headers=headers)
+    assert response.status_code == 400
+    assert response.json()["detail"]["code"] == "BAD_REQUEST"
+
+
+def test_bulk_import_json_array(client, user1_tokens, user2_tokens):
+    """Test bulk import reports per-item results and only inserts valid, owned workouts"""
+    headers = auth_headers(user1_tokens["access_token"])
+    other_headers = auth_headers(user2_tokens["access_token"])
+    own = client.post("/api/v1/exercises", json={"name": "Squat"}, headers=headers).json()["id"]
+    foreign = client.post("/api/v1/exercises", json={"name": "Squat"}, headers=other_headers).json()["id"]
+
+    payload = [
+        {"date": "2024-01-01", "sets": [{"exercise_id": own, "reps": 5, "weight_kg": 100.0}]},
+        {"date": "2999-01-01"},
+        {"date": "2024-01-02", "sets": [{"exercise_id": foreign, "reps": 5, "weight_kg": 100.0}]},
+        {"date": "2024-01-03", "note": "no sets"},
+    ]
+    response = client.post("/api/v1/workouts/bulk", json=payload, headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 2
+    assert data["failed"] == 2
+    assert [i["status"] for i in data["items"]] == ["created", "error", "error", "created"]
+    assert "Exercise not found" in data["items"][2]["errors"][0]["msg"]
+
+    created_id = data["items"][0]["id"]
+    workout = client.get(f"/api/v1/workouts/{created_id}", headers=headers).json()
+    assert workout["sets"][0]["reps"] == 5
+
+    stats = client.get("/api/v1/stats", headers=headers).json()
+    assert stats["total_workouts"] == 2
+    assert stats["total_sets"] == 1
+
+
+def test_bulk_import_ndjson(client, user1_tokens):
+    """Test bulk import accepts an NDJSON stream"""
+    headers = auth_headers(user1_tokens["access_token"])
+    body = "\n".join(
+        [f'{{"date": "2024-02-0{i + 1}", "note": "w{i}"}}' for i in range(3)] + ["not json", ""]
+    )
+    response = client.post(
+        "/api/v1/workouts/bulk",
+        content=body.encode(),
+        headers={**headers, "Content-Type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 3
+    assert data["failed"] == 1
+    assert data["items"][3]["status"] == "error"
+
+    listed = client.get("/api/v1/workouts", headers=headers).json()
+    assert len(listed["items"]) == 3
+
+
+def test_bulk_import_rejects_non_array(client, user1_tokens):
+    """Test bulk import requires a JSON array or NDJSON"""
+    headers = auth_headers(user1_tokens["access_token"])
+    response = client.post("/api/v1/workouts/bulk", json={"date": "2024-01-01"}, headers=headers)
+    assert response.status_code == 400
+
+
+def test_list_is_typed_and_serialized_once(client, user1_tokens):
+    """Test list pages keep their typed schema when serialized straight to bytes"""
+    headers = auth_headers(user1_tokens["access_token"])
+    exercise_id = client.post("/api/v1/exercises", json={"name": "Row"}, headers=headers).json()["id"]
+    client.post(
+        "/api/v1/workouts",
+        json={"date": "2024-01-01", "note": "easy", "sets": [{"exercise_id": exercise_id, "reps": 8, "weight_kg": 60.5}]},
+        headers=headers,
+    )
+    response = client.get("/api/v1/workouts", headers=headers)
+    assert response.headers["content-type"] == "application/json"
+    assert "etag" in response.headers
+    body = response.json()
+    assert body["items"][0]["date"] == "2024-01-01"
+    assert body["items"][0]["sets"][0]["weight_kg"] == 60.5
+
+    schema = client.get("/openapi.json").json()["components"]["schemas"]
+    items = schema["PaginatedResponse_WorkoutRead_"]["properties"]["items"]
+    assert items["items"]["$ref"].endswith("/WorkoutRead")
+
+
+def test_workout_summary_view_skips_sets(client, test_db, user1_tokens):
+    """Test view=summary returns maintained per-workout totals without reading sets"""
+    from adapters.sqlalchemy.query_counter import QueryCounter
+
+    headers = auth_headers(user1_tokens["access_token"])
+    squat = client.post("/api/v1/exercises", json={"name": "Squat"}, headers=headers).json()["id"]
+    bench = client.post("/api/v1/exercises", json={"name": "Bench"}, headers=headers).json()["id"]
+    sets = [
+        {"exercise_id": squat, "reps": 5, "weight_kg": 100.0},
+        {"exercise_id": squat, "reps": 5, "weight_kg": 110.0},
+        {"exercise_id": bench, "reps": 8, "weight_kg": 60.0},
+    ]
+    client.post("/api/v1/workouts", json={"date": "2024-01-02", "note": "heavy", "sets": sets}, headers=headers)
+    client.post("/api/v1/workouts/bulk", json=[{"date": "2024-01-01", "sets": sets[:1]}], headers=headers)
+
+    with QueryCounter(test_db.get_bind()) as counter:
+        response = client.get("/api/v1/workouts?view=summary", headers=headers)
+    assert response.status_code == 200
+    assert not any("FROM sets" in s for s in counter.statements)
+    items = response.json()["items"]
+    assert [(i["date"], i["set_count"], i["total_reps"], i["total_volume_kg"], i["exercise_count"]) for i in items] == [
+        ("2024-01-02", 3, 18, 1530.0, 2),
+        ("2024-01-01", 1, 5, 500.0, 1),
+    ]
+    assert items[0]["note"] == "heavy"
+    assert "sets" not in items[0]
+
+
+def test_rebuild_workout_summaries_repairs_drift(client, test_db, user1_tokens):
+    """Test the summary rebuild recomputes columns from sets"""
+    from adapters.sqlalchemy.models import Workout
+    from services.workouts import rebuild_workout_summaries
+
+    headers = auth_headers(user1_tokens["access_token"])
+    exercise_id = client.post("/api/v1/exercises", json={"name": "Row"}, headers=headers).json()["id"]
+    sets = [{"exercise_id": exercise_id, "reps": 10, "weight_kg": 50.0}]
+    workout_id = client.post("/api/v1/workouts", json={"date": "2024-01-01", "sets": sets}, headers=headers).json()["id"]
+    assert rebuild_workout_summaries(test_db, check_only=True) == []
+
+    test_db.get(Workout, workout_id).total_reps = 0
+    test_db.commit()
+    assert rebuild_workout_summaries(test_db, check_only=True) == [workout_id]
+
+    rebuild_workout_summaries(test_db)
+    test_db.expire_all()
+    assert test_db.get(Workout, workout_id).total_reps == 10
+    assert rebuild_workout_summaries(test_db, check_only=True) == []
@@ -0,0 +1,82 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+# Scripts run in a fresh interpreter: the WAL profile is chosen from settings at import time
+PRELUDE = """
+import asyncio, json
+import anyio.to_thread, httpx
+from app.main import app
+from app.dependencies.db import init_db
+
+async def login(client):
+    await client.post("/auth/register", json={"email": "a@test.com", "password": "password123"})
+    response = await client.post("/auth/login", json={"email": "a@test.com", "password": "password123"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+"""
+
+CONCURRENT_WRITES = PRELUDE + """
+async def main():
+    await init_db()
+    anyio.to_thread.current_default_thread_limiter().total_tokens = 4
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        headers = await login(client)
+        posts = [client.post("/api/v1/exercises", json={"name": f"E{i}"}, headers=headers) for i in range(16)]
+        responses = await asyncio.wait_for(asyncio.gather(*posts), 30)
+        print(sorted(r.status_code for r in responses))
+
+asyncio.run(main())
+"""
+
+WRITE_DURING_IMPORT = PRELUDE + """
+async def main():
+    await init_db()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        headers = await login(client)
+        squat = (await client.post("/api/v1/exercises", json={"name": "Squat"}, headers=headers)).json()["id"]
+        more = asyncio.Event()
+
+        async def body():
+            for day in ("2024-01-01", "2024-01-02"):
+                sets = [{"exercise_id": squat, "reps": 5, "weight_kg": 100}]
+                yield json.dumps({"date": day, "sets": sets}).encode() + b"\\n"
+                await more.wait()
+
+        bulk = asyncio.create_task(client.post(
+            "/api/v1/workouts/bulk", content=body(),
+            headers={**headers, "Content-Type": "application/x-ndjson"},
+        ))
+        await asyncio.sleep(0.5)  # the import is now waiting for the rest of its body
+        other = await asyncio.wait_for(client.post("/api/v1/exercises", json={"name": "Row"}, headers=headers), 10)
+        more.set()
+        print(other.status_code, (await bulk).json()["created"])
+
+asyncio.run(main())
+"""
+
+
+def _run(script, tmp_path):
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{tmp_path / 'lane.db'}",
+        "SQLITE_PROFILE": "wal",
+        "PYTHONPATH": str(SRC),
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=tmp_path, env=env, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    return result.stdout.splitlines()[-1]
+
+
+def test_concurrent_writes_with_few_threads_do_not_deadlock(tmp_path):
+    """Test more concurrent writer requests than threadpool workers all complete under the WAL profile"""
+    assert _run(CONCURRENT_WRITES, tmp_path) == str([201] * 16)
+
+
+def test_writes_proceed_while_a_bulk_import_streams(tmp_path):
+    """Test another write completes while a bulk import is still waiting for its body"""
+    assert _run(WRITE_DURING_IMPORT, tmp_path) == "201 2"